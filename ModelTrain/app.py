@@ -3,6 +3,8 @@
 from ModelTrain.scripts.car_price_prediction import training_and_save_prediction_model
 from ModelTrain.scripts.car_price_segmentation import training_and_save_segmentation_models
 from ModelTrain.scripts.car_price_clusterization import training_and_save_clusterization_models
+from ModelTrain.handlers.export_onnx import export_onnx_models
+from ModelTrain.handlers.model_bundle import write_bundles
 
 import pathlib
 
@@ -31,6 +33,12 @@ def train_models():
     #* Entrenar y guardar modelos de clusterización
     training_and_save_clusterization_models(DATASET_PATH, BASE_SAVE_PATH)
 
+    #* Exportar los estimadores a ONNX (backend de onnxruntime, opcional por familia en el backend)
+    export_onnx_models(BASE_SAVE_PATH)
+
+    #* Empaquetar cada familia en un archivo versionado con manifiesto y checksums (models_cars/bundles)
+    write_bundles(BASE_SAVE_PATH)
+
 #! predeccion multiple datos 
 def multiply_test_model():
     new_cars = [
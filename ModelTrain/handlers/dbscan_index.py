@@ -0,0 +1,65 @@
+"""
+Índice de muestras núcleo de DBSCAN para asignar autos nuevos a un cluster sin reajustar el modelo.
+
+DBSCAN no tiene `predict`: llamar a `fit_predict` sobre un solo auto reajusta el modelo con
+un único punto y siempre retorna ruido (-1). En su lugar se guarda un KD-tree con las muestras
+núcleo (`components_`) y sus etiquetas; en el backend un auto nuevo recibe el cluster de la
+muestra núcleo más cercana si está a una distancia <= `eps`, y -1 en caso contrario.
+
+El índice se guarda con joblib en un diccionario con el formato "dbscan-core-index/v1".
+
+Uso desde la línea de comandos, para exportar el índice de artefactos ya entrenados:
+    python -m ModelTrain.handlers.dbscan_index models_cars
+"""
+
+import os
+import pathlib
+import sys
+
+import joblib
+import numpy as np
+from sklearn.neighbors import KDTree
+
+from ModelTrain.utils.logger import logger
+
+INDEX_FORMAT = "dbscan-core-index/v1"
+
+
+def build_dbscan_index(dbscan, leaf_size=40):
+    """
+    Construye el índice de muestras núcleo de un `DBSCAN` ajustado.
+
+    Retorna:
+        dict: KD-tree de las muestras núcleo, su etiqueta de cluster y `eps`,
+        en el formato "dbscan-core-index/v1".
+    """
+    if dbscan.metric != "euclidean":
+        raise ValueError(f"Métrica no soportada por el índice: {dbscan.metric}")
+    core_labels = np.asarray(dbscan.labels_[dbscan.core_sample_indices_], dtype=np.int64)
+    return {
+        "format": INDEX_FORMAT,
+        "tree": KDTree(np.asarray(dbscan.components_, dtype=np.float64), leaf_size=leaf_size),
+        "core_labels": core_labels,
+        "eps": float(dbscan.eps),
+    }
+
+
+def save_dbscan_index(index, path):
+    """Guarda el índice con joblib."""
+    joblib.dump(index, path)
+    logger.info(f"✅ Índice DBSCAN guardado en {path} ({len(index['core_labels'])} muestras núcleo)")
+
+
+def export_dbscan_index(base_save_path="models_cars"):
+    """Construye `dbscan_index.pkl` a partir de un `dbscan_cluster.pkl` ya guardado."""
+    clustering_dir = os.path.join(base_save_path, "model_car_clusterization")
+    dbscan_path = os.path.join(clustering_dir, "dbscan_cluster.pkl")
+    if not os.path.exists(dbscan_path):
+        logger.warning(f"No se encontró {dbscan_path}")
+        return
+    index = build_dbscan_index(joblib.load(dbscan_path))
+    save_dbscan_index(index, os.path.join(clustering_dir, "dbscan_index.pkl"))
+
+
+if __name__ == "__main__":
+    export_dbscan_index(pathlib.Path(sys.argv[1]) if len(sys.argv) > 1 else "models_cars")
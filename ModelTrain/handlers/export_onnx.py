@@ -0,0 +1,145 @@
+"""
+Exportador de los estimadores entrenados a ONNX para el backend de onnxruntime.
+
+Cada estimador se guarda junto a su `.pkl` con el mismo nombre y extensión `.onnx`. Todos
+reciben una sola entrada `X` (float32, `[n_filas, n_columnas]`) con la matriz ya codificada y
+escalada (o proyectada con PCA, para K-Means), igual que sus versiones de sklearn:
+
+- Random Forest y XGBoost de precios → salida `variable` (precio, `[n, 1]`).
+- DNN de precios → construida desde los pesos "dense-network/v1" (`dnn_weights.pkl`) con
+  MatMul/Add y activaciones de ONNX, sin pasar por TensorFlow.
+- Random Forest, SVM y MLP de segmentación → salida `label` (segmento codificado).
+- K-Means de clusterización → salida `label` (cluster).
+
+DBSCAN no tiene `predict` y sigue resolviéndose con el índice de muestras núcleo.
+
+Uso desde la línea de comandos, para exportar artefactos ya entrenados:
+    python -m ModelTrain.handlers.export_onnx models_cars
+"""
+
+import pathlib
+import sys
+
+import joblib
+import numpy as np
+
+from ModelTrain.utils.logger import logger
+
+# Versión del conjunto de operadores de ONNX usada por todos los modelos exportados
+TARGET_OPSET = 15
+TARGET_IR_VERSION = 8
+
+# Estimadores exportados: (subdirectorio, artefacto de sklearn/xgboost)
+ESTIMATORS = (
+    ("model_cars_prediction_prices", "random_forest_model.pkl"),
+    ("model_cars_prediction_prices", "xgboost_model.pkl"),
+    ("model_car_segmentation", "rf_classifier.pkl"),
+    ("model_car_segmentation", "svm_classifier.pkl"),
+    ("model_car_segmentation", "mlp_classifier.pkl"),
+    ("model_car_clusterization", "kmeans_cluster.pkl"),
+)
+
+
+def _n_features(model):
+    if hasattr(model, "n_features_in_"):
+        return int(model.n_features_in_)
+    return int(model.get_booster().num_features())
+
+
+def convert_estimator(model):
+    """
+    Convierte un estimador de sklearn o XGBoost a un `onnx.ModelProto` con entrada `X`.
+    Los clasificadores no incluyen el ZipMap de probabilidades (salidas `label` y `probabilities`).
+    """
+    from skl2onnx.common.data_types import FloatTensorType
+
+    initial_types = [("X", FloatTensorType([None, _n_features(model)]))]
+    if type(model).__module__.startswith("xgboost"):
+        from onnxmltools import convert_xgboost
+        from onnxmltools.convert.common.data_types import FloatTensorType as XgbFloatTensorType
+        return convert_xgboost(model, initial_types=[("X", XgbFloatTensorType([None, _n_features(model)]))],
+                               target_opset=TARGET_OPSET)
+
+    from skl2onnx import convert_sklearn
+    options = {id(model): {"zipmap": False}} if hasattr(model, "classes_") else None
+    return convert_sklearn(model, initial_types=initial_types, options=options, target_opset=TARGET_OPSET)
+
+
+def convert_dense_network(export):
+    """
+    Construye una red densa de ONNX a partir de los pesos "dense-network/v1" (regresión).
+    Salida `variable`, `[n, 1]`.
+    """
+    from onnx import TensorProto, helper, numpy_helper
+
+    activations = {"relu": "Relu", "sigmoid": "Sigmoid", "tanh": "Tanh", "logistic": "Sigmoid"}
+    nodes, initializers = [], []
+    current = "X"
+    for i, (weights, bias, activation) in enumerate(zip(export["weights"], export["biases"], export["activations"])):
+        initializers.append(numpy_helper.from_array(np.asarray(weights, dtype=np.float32), f"W{i}"))
+        initializers.append(numpy_helper.from_array(np.asarray(bias, dtype=np.float32), f"B{i}"))
+        nodes.append(helper.make_node("MatMul", [current, f"W{i}"], [f"matmul{i}"]))
+        nodes.append(helper.make_node("Add", [f"matmul{i}", f"B{i}"], [f"dense{i}"]))
+        current = f"dense{i}"
+        if activation in activations:
+            nodes.append(helper.make_node(activations[activation], [current], [f"act{i}"]))
+            current = f"act{i}"
+        elif activation not in ("linear", "identity"):
+            raise ValueError(f"Activación no soportada en ONNX: {activation}")
+    nodes.append(helper.make_node("Identity", [current], ["variable"]))
+
+    n_features = np.asarray(export["weights"][0]).shape[0]
+    graph = helper.make_graph(
+        nodes, "dense_network",
+        inputs=[helper.make_tensor_value_info("X", TensorProto.FLOAT, [None, n_features])],
+        outputs=[helper.make_tensor_value_info("variable", TensorProto.FLOAT, [None, 1])],
+        initializer=initializers,
+    )
+    # Versión de IR fija (la de `TARGET_OPSET`) para que lo carguen también versiones anteriores de onnxruntime
+    return helper.make_model(graph, opset_imports=[helper.make_opsetid("", TARGET_OPSET)], ir_version=TARGET_IR_VERSION)
+
+
+def save_onnx(model, path):
+    """Guarda un modelo ONNX."""
+    with open(path, "wb") as fs:
+        fs.write(model.SerializeToString())
+    logger.info(f"✅ Modelo ONNX exportado en {path}")
+
+
+def export_onnx_models(base_save_path="models_cars"):
+    """
+    Exporta a ONNX los estimadores ya guardados en `base_save_path`. Los artefactos que no
+    existan (o no se puedan convertir) se registran y se omiten: el backend usa entonces el
+    estimador nativo para ese modelo.
+    """
+    try:
+        import onnx, skl2onnx  # noqa: F401  (convertidores opcionales del entrenamiento)
+    except ImportError:
+        logger.warning("onnx/skl2onnx no están instalados; no se exportan los modelos ONNX.")
+        return
+    base_save_path = pathlib.Path(base_save_path)
+    for subdir, name in ESTIMATORS:
+        path = base_save_path / subdir / name
+        if not path.exists():
+            logger.warning(f"No se encontró {path}")
+            continue
+        try:
+            save_onnx(convert_estimator(joblib.load(path)), path.with_suffix(".onnx"))
+        except Exception:
+            logger.exception(f"No se pudo exportar {path} a ONNX")
+
+    prediction_dir = base_save_path / "model_cars_prediction_prices"
+    weights_path = prediction_dir / "dnn_weights.pkl"
+    if weights_path.exists():
+        save_onnx(convert_dense_network(joblib.load(weights_path)), prediction_dir / "dnn_model.onnx")
+    elif (prediction_dir / "dnn_model.h5").exists():
+        from tensorflow import keras
+        from ModelTrain.handlers.export_weights import export_keras_dense
+        dnn = keras.models.load_model(prediction_dir / "dnn_model.h5", compile=False)
+        save_onnx(convert_dense_network(export_keras_dense(dnn)), prediction_dir / "dnn_model.onnx")
+    else:
+        logger.warning(f"No se encontró {weights_path}")
+
+
+if __name__ == "__main__":
+    export_onnx_models(pathlib.Path(sys.argv[1]) if len(sys.argv) > 1 else "models_cars")
@@ -0,0 +1,188 @@
+"""
+Exportador de pesos para los motores de inferencia NumPy del backend.
+
+- Redes densas (`backend/app/utils/numpy_inference.py`): extrae una sola vez los pesos de la
+  DNN de precios (Keras) y del MLP de segmentación (sklearn) en el formato "dense-network/v1".
+- Random Forest (`backend/app/utils/tree_inference.py`): concatena los nodos de todos los
+  árboles en arreglos contiguos en el formato "flat-forest/v1", que el backend mapea en
+  memoria sin copias (joblib sin compresión + `mmap_mode="r"`).
+- SVM aproximado (`backend/app/utils/kernel_approx.py`): fusiona la normalización de Nystroem
+  con los coeficientes del clasificador lineal en el formato "nystroem-linear/v1".
+
+Uso desde la línea de comandos, para exportar artefactos ya entrenados:
+    python -m ModelTrain.handlers.export_weights models_cars
+"""
+
+import os
+import pathlib
+import sys
+
+import joblib
+import numpy as np
+
+from ModelTrain.utils.logger import logger
+
+EXPORT_FORMAT = "dense-network/v1"
+FLAT_FOREST_FORMAT = "flat-forest/v1"
+NYSTROEM_LINEAR_FORMAT = "nystroem-linear/v1"
+
+
+def export_keras_dense(model):
+    """
+    Extrae los pesos de un modelo Keras secuencial formado solo por capas `Dense`.
+
+    Retorna:
+        dict: Pesos, sesgos y activaciones en el formato "dense-network/v1".
+    """
+    weights, biases, activations = [], [], []
+    for layer in model.layers:
+        if type(layer).__name__ == "InputLayer":
+            continue
+        if type(layer).__name__ != "Dense":
+            raise ValueError(f"Capa no soportada por el motor NumPy: {type(layer).__name__}")
+        kernel, bias = layer.get_weights()
+        weights.append(np.ascontiguousarray(kernel))
+        biases.append(np.ascontiguousarray(bias))
+        activations.append(layer.activation.__name__)
+    return {
+        "format": EXPORT_FORMAT,
+        "task": "regression",
+        "weights": weights,
+        "biases": biases,
+        "activations": activations,
+        "classes": None,
+    }
+
+
+def export_mlp_classifier(mlp):
+    """
+    Extrae los pesos de un `MLPClassifier` ajustado.
+
+    Retorna:
+        dict: Pesos, sesgos, activaciones y clases en el formato "dense-network/v1".
+    """
+    n_layers = len(mlp.coefs_)
+    return {
+        "format": EXPORT_FORMAT,
+        "task": "classification",
+        "weights": [np.ascontiguousarray(w) for w in mlp.coefs_],
+        "biases": [np.ascontiguousarray(b) for b in mlp.intercepts_],
+        "activations": [mlp.activation] * (n_layers - 1) + [mlp.out_activation_],
+        "classes": np.asarray(mlp.classes_),
+    }
+
+
+def export_flat_forest(forest):
+    """
+    Compila un `RandomForestRegressor` o `RandomForestClassifier` ajustado (una sola salida)
+    en arreglos contiguos. En las hojas ambos hijos apuntan a la propia hoja.
+
+    Retorna:
+        dict: Arreglos de nodos en el formato "flat-forest/v1".
+    """
+    is_classifier = hasattr(forest, "classes_")
+    features, thresholds, lefts, rights, values, roots = [], [], [], [], [], []
+    offset, max_depth = 0, 0
+    for estimator in forest.estimators_:
+        tree = estimator.tree_
+        node_ids = np.arange(offset, offset + tree.node_count)
+        is_leaf = tree.children_left == -1
+        features.append(np.where(is_leaf, 0, tree.feature))
+        thresholds.append(np.where(is_leaf, 0.0, tree.threshold))
+        lefts.append(np.where(is_leaf, node_ids, tree.children_left + offset))
+        rights.append(np.where(is_leaf, node_ids, tree.children_right + offset))
+        if is_classifier:
+            counts = tree.value[:, 0, :]
+            totals = counts.sum(axis=1, keepdims=True)
+            totals[totals == 0.0] = 1.0
+            values.append(counts / totals)
+        else:
+            values.append(tree.value[:, 0, 0])
+        roots.append(offset)
+        offset += tree.node_count
+        max_depth = max(max_depth, tree.max_depth)
+    return {
+        "format": FLAT_FOREST_FORMAT,
+        "feature": np.concatenate(features).astype(np.intp),
+        "threshold": np.concatenate(thresholds).astype(np.float64),
+        "left": np.concatenate(lefts).astype(np.intp),
+        "right": np.concatenate(rights).astype(np.intp),
+        "value": np.ascontiguousarray(np.concatenate(values)),
+        "roots": np.asarray(roots, dtype=np.intp),
+        "max_depth": int(max_depth),
+        "classes": np.asarray(forest.classes_) if is_classifier else None,
+    }
+
+
+def export_nystroem_linear(pipeline):
+    """
+    Compila un pipeline `Nystroem(kernel="rbf") -> clasificador lineal` ajustado. Como ambas
+    etapas son lineales después del kernel, `normalization_.T @ coef_.T` se precalcula en una
+    sola matriz `(componentes, clases)`.
+
+    Retorna:
+        dict: Componentes, gamma, pesos fusionados, sesgos y clases en el formato "nystroem-linear/v1".
+    """
+    nystroem, linear = pipeline[0], pipeline[-1]
+    if nystroem.kernel != "rbf":
+        raise ValueError(f"Kernel no soportado por el motor NumPy: {nystroem.kernel}")
+    gamma = nystroem.gamma if nystroem.gamma is not None else 1.0 / nystroem.components_.shape[1]
+    return {
+        "format": NYSTROEM_LINEAR_FORMAT,
+        "components": np.ascontiguousarray(nystroem.components_),
+        "gamma": float(gamma),
+        "weights": np.ascontiguousarray(nystroem.normalization_.T @ linear.coef_.T),
+        "intercept": np.ascontiguousarray(np.atleast_1d(linear.intercept_)),
+        "classes": np.asarray(linear.classes_),
+    }
+
+
+def save_exported_weights(export, path):
+    """Guarda los pesos exportados con joblib."""
+    joblib.dump(export, path)
+    logger.info(f"✅ Pesos exportados en {path}")
+
+
+def export_trained_models(base_save_path="models_cars"):
+    """
+    Exporta los pesos de la DNN, del MLP, de los Random Forest y del SVM aproximado a partir de
+    artefactos ya guardados (`dnn_model.h5`, `mlp_classifier.pkl`, `random_forest_model.pkl`,
+    `rf_classifier.pkl` y `svm_approx_classifier.pkl`).
+    """
+    prediction_dir = os.path.join(base_save_path, "model_cars_prediction_prices")
+    segmentation_dir = os.path.join(base_save_path, "model_car_segmentation")
+
+    dnn_path = os.path.join(prediction_dir, "dnn_model.h5")
+    if os.path.exists(dnn_path):
+        from tensorflow import keras
+        dnn = keras.models.load_model(dnn_path, compile=False)
+        save_exported_weights(export_keras_dense(dnn), os.path.join(prediction_dir, "dnn_weights.pkl"))
+    else:
+        logger.warning(f"No se encontró {dnn_path}")
+
+    forests = (
+        (os.path.join(prediction_dir, "random_forest_model.pkl"), os.path.join(prediction_dir, "random_forest_flat.pkl")),
+        (os.path.join(segmentation_dir, "rf_classifier.pkl"), os.path.join(segmentation_dir, "rf_classifier_flat.pkl")),
+    )
+    for forest_path, flat_path in forests:
+        if os.path.exists(forest_path):
+            save_exported_weights(export_flat_forest(joblib.load(forest_path)), flat_path)
+        else:
+            logger.warning(f"No se encontró {forest_path}")
+
+    mlp_path = os.path.join(segmentation_dir, "mlp_classifier.pkl")
+    if os.path.exists(mlp_path):
+        mlp = joblib.load(mlp_path)
+        save_exported_weights(export_mlp_classifier(mlp), os.path.join(segmentation_dir, "mlp_weights.pkl"))
+    else:
+        logger.warning(f"No se encontró {mlp_path}")
+
+    # El SVM aproximado es opcional (`training_and_save_segmentation_models(svm_approx=...)`)
+    svm_approx_path = os.path.join(segmentation_dir, "svm_approx_classifier.pkl")
+    if os.path.exists(svm_approx_path):
+        save_exported_weights(export_nystroem_linear(joblib.load(svm_approx_path)),
+                              os.path.join(segmentation_dir, "svm_approx_weights.pkl"))
+
+
+if __name__ == "__main__":
+    export_trained_models(pathlib.Path(sys.argv[1]) if len(sys.argv) > 1 else "models_cars")
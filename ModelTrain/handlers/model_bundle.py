@@ -0,0 +1,216 @@
+"""
+Empaquetado de los artefactos de cada familia en un único archivo versionado.
+
+Cada familia (predicción, segmentación y clusterización) se guarda como un `tar` sin
+comprimir con el manifiesto como primer miembro:
+
+    manifest.json
+    {
+        "format": "model-bundle/v1",
+        "family": "prediction",
+        "version": "<sha256 de los archivos>"[:16],
+        "created_at": "2025-01-01T00:00:00+00:00",
+        "features": [...],             # columnas de entrada, en el orden del backend
+        "model_features": [...],       # columnas de la matriz que recibe el escalador
+        "vocabularies": {col: [...]},  # categorías conocidas por los codificadores
+        "libraries": {"python": ..., "numpy": ..., "scikit-learn": ..., "xgboost": ..., "joblib": ...},
+        "files": {nombre: {"sha256": ..., "size": ...}},
+    }
+
+seguido de los artefactos (`.pkl` sin comprimir, `.h5`, ...). El backend lo lee de una sola
+pasada secuencial y verifica cada checksum (ver `backend/app/utils/model_bundle.py`).
+
+El paquete se escribe como `<familia>-<versión>.tar` y el enlace `<familia>.tar` se
+reemplaza de forma atómica para apuntar a él: un despliegue nunca deja a la vista un
+paquete a medio escribir, y las versiones anteriores quedan disponibles para volver atrás.
+
+Uso desde la línea de comandos, para empaquetar artefactos ya entrenados:
+    python -m ModelTrain.handlers.model_bundle models_cars
+"""
+
+import hashlib
+import io
+import json
+import os
+import pathlib
+import platform
+import sys
+import tarfile
+import time
+from datetime import datetime, timezone
+
+import joblib
+
+from ModelTrain.utils.logger import logger
+
+BUNDLE_FORMAT = "model-bundle/v1"
+MANIFEST_NAME = "manifest.json"
+
+# Subdirectorio de artefactos de cada familia (relativo a `models_cars`)
+FAMILY_DIRS = {
+    "prediction": "model_cars_prediction_prices",
+    "segmentation": "model_car_segmentation",
+    "clusterization": "model_car_clusterization",
+}
+
+# Columnas de entrada, en el orden en que el backend construye la matriz
+FEATURE_COLUMNS = ["Brand", "Model", "Year", "Engine_Size", "Fuel_Type", "Transmission",
+                   "Mileage", "Doors", "Owner_Count"]
+
+
+def file_sha256(path, chunk_size=1 << 20):
+    """Retorna el sha256 (hex) de un archivo leyéndolo por bloques."""
+    digest = hashlib.sha256()
+    with open(path, "rb") as fs:
+        for chunk in iter(lambda: fs.read(chunk_size), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def library_versions():
+    """Versiones de las librerías con las que se serializaron los artefactos."""
+    versions = {"python": platform.python_version(), "joblib": joblib.__version__}
+    for name, module in (("numpy", "numpy"), ("scikit-learn", "sklearn"), ("xgboost", "xgboost")):
+        try:
+            versions[name] = __import__(module).__version__
+        except ImportError:
+            versions[name] = None
+    return versions
+
+
+def _classes(encoder):
+    return [value.item() if hasattr(value, "item") else value for value in encoder.classes_]
+
+
+def family_schema(family, directory):
+    """
+    Retorna el orden de columnas de la matriz y los vocabularios de los codificadores de una familia.
+
+    Retorna:
+        tuple: (model_features, vocabularies)
+    """
+    directory = pathlib.Path(directory)
+    vocabularies = {}
+    if family == "clusterization":
+        scaler = joblib.load(directory / "scaler_cluster.pkl")
+        encoder = joblib.load(directory / "encoder.pkl")
+        columns = getattr(encoder, "feature_names_in_", ["Brand", "Fuel_Type", "Transmission"])
+        for col, categories in zip(columns, encoder.categories_):
+            vocabularies[str(col)] = [str(category) for category in categories]
+        vocabularies["Model"] = _classes(joblib.load(directory / "encoder_model.pkl"))
+    else:
+        scaler_name = "scaler.pkl" if family == "prediction" else "scaler_classifier.pkl"
+        scaler = joblib.load(directory / scaler_name)
+        for col, encoder in joblib.load(directory / "label_encoders.pkl").items():
+            vocabularies[str(col)] = _classes(encoder)
+        if family == "segmentation":
+            vocabularies["Price_Segment"] = _classes(joblib.load(directory / "labelencoder_price_segment.pkl"))
+
+    model_features = [str(col) for col in getattr(scaler, "feature_names_in_", FEATURE_COLUMNS)]
+    return model_features, vocabularies
+
+
+def build_manifest(family, directory):
+    """
+    Construye el manifiesto de una familia a partir de su directorio de artefactos.
+    La versión es un hash del contenido: dos entrenamientos idénticos producen la misma.
+    """
+    directory = pathlib.Path(directory)
+    paths = sorted(p for p in directory.iterdir() if p.is_file() and not p.name.startswith("."))
+    if not paths:
+        raise FileNotFoundError(f"No hay artefactos en {directory}")
+
+    files = {path.name: {"sha256": file_sha256(path), "size": path.stat().st_size} for path in paths}
+    version = hashlib.sha256(
+        "".join(f"{name}:{info['sha256']};" for name, info in files.items()).encode("utf-8")
+    ).hexdigest()[:16]
+    model_features, vocabularies = family_schema(family, directory)
+    return {
+        "format": BUNDLE_FORMAT,
+        "family": family,
+        "version": version,
+        "created_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "features": list(FEATURE_COLUMNS),
+        "model_features": model_features,
+        "vocabularies": vocabularies,
+        "libraries": library_versions(),
+        "files": files,
+    }
+
+
+def _replace_link(link_path, target_name):
+    """Apunta `link_path` a `target_name` (mismo directorio) reemplazándolo de forma atómica."""
+    tmp_link = link_path.with_name(f".{link_path.name}.{os.getpid()}.tmp")
+    try:
+        os.symlink(target_name, tmp_link)
+    except (OSError, NotImplementedError):
+        # Sin soporte de enlaces simbólicos (p. ej. Windows sin permisos): copia completa
+        with open(link_path.with_name(target_name), "rb") as src, open(tmp_link, "wb") as dst:
+            while chunk := src.read(1 << 20):
+                dst.write(chunk)
+    os.replace(tmp_link, link_path)
+
+
+def write_bundle(family, directory, output_dir):
+    """
+    Empaqueta los artefactos de una familia en `<output_dir>/<familia>-<versión>.tar` y
+    actualiza el enlace `<output_dir>/<familia>.tar`.
+
+    Parámetros:
+        family (str): "prediction", "segmentation" o "clusterization".
+        directory: Directorio con los artefactos de la familia.
+        output_dir: Directorio de los paquetes.
+
+    Retorna:
+        pathlib.Path: Ruta del paquete versionado.
+    """
+    directory = pathlib.Path(directory)
+    output_dir = pathlib.Path(output_dir)
+    output_dir.mkdir(parents=True, exist_ok=True)
+
+    manifest = build_manifest(family, directory)
+    bundle_path = output_dir / f"{family}-{manifest['version']}.tar"
+    tmp_path = output_dir / f".{bundle_path.name}.{os.getpid()}.tmp"
+
+    manifest_bytes = json.dumps(manifest, indent=2, ensure_ascii=False).encode("utf-8")
+    mtime = time.time()
+    with tarfile.open(tmp_path, "w", format=tarfile.PAX_FORMAT) as tar:
+        # El manifiesto va primero: el backend lo lee antes que cualquier artefacto
+        info = tarfile.TarInfo(MANIFEST_NAME)
+        info.size, info.mtime = len(manifest_bytes), mtime
+        tar.addfile(info, io.BytesIO(manifest_bytes))
+        for name in manifest["files"]:
+            info = tar.gettarinfo(directory / name, arcname=name)
+            info.uid = info.gid = 0
+            info.uname = info.gname = ""
+            with open(directory / name, "rb") as fs:
+                tar.addfile(info, fs)
+    os.replace(tmp_path, bundle_path)
+    _replace_link(output_dir / f"{family}.tar", bundle_path.name)
+
+    logger.info(f"✅ Paquete de '{family}' versión {manifest['version']} guardado en {bundle_path}")
+    return bundle_path
+
+
+def write_bundles(base_save_path="models_cars", output_dir=None):
+    """
+    Empaqueta las tres familias de `base_save_path` en `output_dir` (por defecto `<base_save_path>/bundles`).
+
+    Retorna:
+        dict: {familia: ruta del paquete versionado}
+    """
+    base_save_path = pathlib.Path(base_save_path)
+    output_dir = pathlib.Path(output_dir) if output_dir is not None else base_save_path / "bundles"
+    bundles = {}
+    for family, subdir in FAMILY_DIRS.items():
+        directory = base_save_path / subdir
+        if not directory.is_dir():
+            logger.warning(f"No se encontró {directory}; no se empaqueta '{family}'")
+            continue
+        bundles[family] = write_bundle(family, directory, output_dir)
+    return bundles
+
+
+if __name__ == "__main__":
+    write_bundles(pathlib.Path(sys.argv[1]) if len(sys.argv) > 1 else "models_cars",
+                  sys.argv[2] if len(sys.argv) > 2 else None)
@@ -9,6 +9,7 @@ from sklearn.preprocessing import StandardScaler, OneHotEncoder, LabelEncoder
 from sklearn.decomposition import PCA
 from sklearn.cluster import KMeans, DBSCAN
 from ModelTrain.utils.logger import logger
+from ModelTrain.handlers.dbscan_index import build_dbscan_index, save_dbscan_index
 
 def load_data(data_path):
     logger.info("Cargando dataset para clusterización...")
@@ -68,6 +69,8 @@ def train_clustering_models(df, base_save_path="models_cars"):
     pathlib.Path(clustering_dir).mkdir(parents=True, exist_ok=True)
     joblib.dump(kmeans, os.path.join(clustering_dir, "kmeans_cluster.pkl"))
     joblib.dump(dbscan, os.path.join(clustering_dir, "dbscan_cluster.pkl"))
+    # Índice de muestras núcleo para asignar autos nuevos sin reajustar DBSCAN
+    save_dbscan_index(build_dbscan_index(dbscan), os.path.join(clustering_dir, "dbscan_index.pkl"))
     joblib.dump(scaler, os.path.join(clustering_dir, "scaler_cluster.pkl"))
     joblib.dump(pca, os.path.join(clustering_dir, "pca_cluster.pkl"))
     joblib.dump(encoder, os.path.join(clustering_dir, "encoder.pkl"))
@@ -11,6 +11,7 @@ import tensorflow as tf
 from tensorflow import keras
 from sklearn.metrics import r2_score
 from ModelTrain.utils.logger  import logger
+from ModelTrain.handlers.export_weights import export_flat_forest, export_keras_dense, save_exported_weights
 
 def load_data(file_path):
     logger.info("Cargando dataset...")
@@ -77,8 +78,12 @@ def save_models(models, scaler, label_encoders, base_save_path):
     pathlib.Path(save_dir).mkdir(parents=True, exist_ok=True)
     
     joblib.dump(models['rf'], os.path.join(save_dir, "random_forest_model.pkl"))
+    # Arreglos del Random Forest para el motor compilado del backend (se mapean en memoria)
+    save_exported_weights(export_flat_forest(models['rf']), os.path.join(save_dir, "random_forest_flat.pkl"))
     joblib.dump(models['xgb'], os.path.join(save_dir, "xgboost_model.pkl"))
     models['dnn'].save(os.path.join(save_dir, "dnn_model.h5"))
+    # Pesos de la DNN para el motor NumPy del backend (evita importar TensorFlow al servir)
+    save_exported_weights(export_keras_dense(models['dnn']), os.path.join(save_dir, "dnn_weights.pkl"))
     joblib.dump(scaler, os.path.join(save_dir, "scaler.pkl"))
     joblib.dump(label_encoders, os.path.join(save_dir, "label_encoders.pkl"))
     logger.info("✅ Modelos guardados exitosamente.")
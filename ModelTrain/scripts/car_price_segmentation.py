@@ -2,14 +2,25 @@ import pandas as pd
 import os
 os.environ["LOKY_MAX_CPU_COUNT"] = "2"
 import pathlib
+import json
+import time
 import joblib
 from sklearn.model_selection import train_test_split
 from sklearn.preprocessing import StandardScaler, LabelEncoder
 from sklearn.ensemble import RandomForestClassifier
-from sklearn.svm import SVC
+from sklearn.svm import SVC, LinearSVC
+from sklearn.kernel_approximation import Nystroem
+from sklearn.pipeline import make_pipeline
 from sklearn.neural_network import MLPClassifier
 from sklearn.metrics import accuracy_score
 from ModelTrain.utils.logger import logger
+from ModelTrain.handlers.export_weights import (
+    export_flat_forest, export_mlp_classifier, export_nystroem_linear, save_exported_weights
+)
+
+# Número de componentes del mapa de características aproximado del SVM (costo de inferencia y
+# de entrenamiento lineal en este valor, no en el número de vectores de soporte)
+SVM_APPROX_COMPONENTS = 500
 
 
 def load_data(file_path):
@@ -61,6 +72,50 @@ def train_svm(X_train, y_train):
     model.fit(X_train, y_train)
     return model
 
+def train_svm_approx(X_train, y_train, n_components=SVM_APPROX_COMPONENTS):
+    """
+    Variante aproximada del SVM: mapa de características RBF de Nystroem seguido de un
+    clasificador lineal. Usa el mismo `gamma` que `SVC(gamma='scale')`.
+    """
+    logger.info(f"Entrenando SVM aproximado (Nystroem, {n_components} componentes) para segmentación...")
+    gamma = 1.0 / (X_train.shape[1] * X_train.var())
+    model = make_pipeline(
+        Nystroem(kernel='rbf', gamma=gamma, n_components=n_components, random_state=42),
+        LinearSVC(C=10, max_iter=10000, random_state=42),
+    )
+    model.fit(X_train, y_train)
+    return model
+
+def _latency_ms(model, X, repeat=200):
+    """Latencia promedio de `predict` en milisegundos."""
+    model.predict(X)  # calentamiento
+    start = time.perf_counter()
+    for _ in range(repeat):
+        model.predict(X)
+    return (time.perf_counter() - start) / repeat * 1000
+
+def svm_variants_report(models, fit_seconds, X_test, y_test):
+    """
+    Compara el SVM exacto y el aproximado: exactitud en el conjunto de prueba, tiempo de
+    entrenamiento, evaluaciones de kernel por fila y latencia de `predict` de sklearn (1 fila y
+    lote de 256). La latencia del motor que sirve el backend se mide con
+    `python -m benchmarks.bench_svm_variants`.
+    """
+    report = {}
+    for name in ('svm_classifier', 'svm_approx_classifier'):
+        if name not in models:
+            continue
+        model = models[name]
+        kernel_evaluations = int(model.n_support_.sum()) if hasattr(model, 'n_support_') else int(model[0].n_components)
+        report[name] = {
+            "accuracy": round(float(accuracy_score(y_test, model.predict(X_test))), 4),
+            "fit_seconds": round(fit_seconds[name], 3),
+            "kernel_evaluations_per_row": kernel_evaluations,
+            "sklearn_latency_ms_1_row": round(_latency_ms(model, X_test[:1]), 4),
+            "sklearn_latency_ms_256_rows": round(_latency_ms(model, X_test[:256], repeat=20), 4),
+        }
+    return report
+
 def train_mlp(X_train, y_train):
     logger.info("Entrenando MLP para segmentación...")
     model = MLPClassifier(hidden_layer_sizes=(128, 128), max_iter=500, activation='relu', solver='adam', random_state=42)
@@ -72,28 +127,54 @@ def save_segmentation_models(models, scaler, label_encoders, le_segment, base_sa
     segmentation_dir = os.path.join(base_save_path, "model_car_segmentation")
     pathlib.Path(segmentation_dir).mkdir(parents=True, exist_ok=True)
     joblib.dump(models['rf_classifier'], os.path.join(segmentation_dir, "rf_classifier.pkl"))
+    # Arreglos del Random Forest para el motor compilado del backend (se mapean en memoria)
+    save_exported_weights(export_flat_forest(models['rf_classifier']), os.path.join(segmentation_dir, "rf_classifier_flat.pkl"))
     joblib.dump(models['svm_classifier'], os.path.join(segmentation_dir, "svm_classifier.pkl"))
+    if 'svm_approx_classifier' in models:
+        joblib.dump(models['svm_approx_classifier'], os.path.join(segmentation_dir, "svm_approx_classifier.pkl"))
+        # Mapa de Nystroem y clasificador lineal fusionados para el motor NumPy del backend
+        save_exported_weights(export_nystroem_linear(models['svm_approx_classifier']),
+                              os.path.join(segmentation_dir, "svm_approx_weights.pkl"))
     joblib.dump(models['mlp_classifier'], os.path.join(segmentation_dir, "mlp_classifier.pkl"))
+    # Pesos del MLP para el motor NumPy del backend
+    save_exported_weights(export_mlp_classifier(models['mlp_classifier']), os.path.join(segmentation_dir, "mlp_weights.pkl"))
     joblib.dump(scaler, os.path.join(segmentation_dir, "scaler_classifier.pkl"))
     joblib.dump(label_encoders, os.path.join(segmentation_dir, "label_encoders.pkl"))
     # Guardar el encoder para Price_Segment
     joblib.dump(le_segment, os.path.join(segmentation_dir, "labelencoder_price_segment.pkl"))
     logger.info("✅ Modelos de segmentación guardados exitosamente.")
 
-def training_and_save_segmentation_models(data_path, base_save_path="models_cars"):
+def training_and_save_segmentation_models(data_path, base_save_path="models_cars", svm_approx=True):
+    """
+    Entrena y guarda los modelos de segmentación. Con `svm_approx=True` entrena también la
+    variante aproximada del SVM (`svm_approx_classifier.pkl`) y guarda la comparación de
+    exactitud y latencia de ambas variantes en `svm_variants_report.json`.
+    """
     df = load_data(data_path)
     df, label_encoders = preprocess_data(df)
     le_segment = create_price_segment_encoder(df)
     X_train, X_test, y_train, y_test, scaler = prepare_classification_data(df)
-    models = {
-        'rf_classifier': train_random_forest(X_train, y_train),
-        'svm_classifier': train_svm(X_train, y_train),
-        'mlp_classifier': train_mlp(X_train, y_train)
+    trainers = {
+        'rf_classifier': train_random_forest,
+        'svm_classifier': train_svm,
+        'mlp_classifier': train_mlp,
     }
+    if svm_approx:
+        trainers['svm_approx_classifier'] = train_svm_approx
+    models, fit_seconds = {}, {}
+    for name, train in trainers.items():
+        start = time.perf_counter()
+        models[name] = train(X_train, y_train)
+        fit_seconds[name] = time.perf_counter() - start
     for name, model in models.items():
         acc = accuracy_score(y_test, model.predict(X_test))
         logger.info(f"{name} Accuracy: {acc:.4f}")
     save_segmentation_models(models, scaler, label_encoders, le_segment, base_save_path)
+    if svm_approx:
+        report = svm_variants_report(models, fit_seconds, X_test, y_test)
+        with open(os.path.join(base_save_path, "model_car_segmentation", "svm_variants_report.json"), "w") as fs:
+            json.dump(report, fs, indent=2)
+        logger.info(f"Comparación de variantes del SVM: {report}")
     logger.info("✅ Modelos de segmentación entrenados y guardados correctamente.")
 
 # Ejemplo de uso (para pruebas locales)
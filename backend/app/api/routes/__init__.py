@@ -2,8 +2,10 @@
 # Importamos los routers de los diferentes módulos de la API
 from .auth import AUTH_ROUTER  # Router para la autenticación de usuarios
 from .predict import PREDICT_ROUTER  # Router para manejar predicciones de modelos
+from .models import MODELS_ROUTER  # Router para consultar el estado de los modelos cargados
 from .user import USER_ROUTER  # Router para gestionar operaciones sobre usuarios
+from .health import HEALTH_ROUTER  # Router para las sondas de liveness y readiness
 
 # Definimos __all__ para controlar qué elementos son exportados cuando se importa este módulo
-__all__ = ["AUTH_ROUTER", "PREDICT_ROUTER", "USER_ROUTER"]
+__all__ = ["AUTH_ROUTER", "PREDICT_ROUTER", "MODELS_ROUTER", "USER_ROUTER", "HEALTH_ROUTER"]
 # Solo se exportan los routers para su uso en otros módulos de la aplicación
\ No newline at end of file
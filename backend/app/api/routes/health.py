@@ -0,0 +1,32 @@
+from fastapi import APIRouter
+from fastapi.responses import JSONResponse
+# 📌 Importa `APIRouter` para definir las rutas de salud y `JSONResponse` para responder 503 sin lanzar errores.
+
+from app.utils.warmup import READINESS
+# 📌 Importa el estado de disponibilidad del worker (listo cuando termina el calentamiento de los modelos).
+
+# 📌 Se define un enrutador para las sondas de salud (liveness / readiness) del worker.
+HEALTH_ROUTER = APIRouter()
+
+
+# 🟢 Endpoint de liveness: el proceso está vivo y atiende peticiones.
+@HEALTH_ROUTER.get("/health/live")
+async def health_live():
+    """Responde 200 mientras el worker atienda peticiones (aunque aún se esté calentando)."""
+    return {"status": "ok"}
+
+
+# 🟢 Endpoint de readiness: el worker terminó el calentamiento y puede recibir tráfico.
+@HEALTH_ROUTER.get("/health/ready")
+async def health_ready():
+    """
+    Responde 200 cuando los modelos están cargados y calentados, y 503 mientras tanto
+    (o mientras el worker se apaga), para que el balanceador no envíe tráfico a workers fríos.
+
+    Retorna:
+    - `ready`: Si el worker está listo.
+    - `startup_seconds`: Tiempo desde el arranque hasta quedar listo.
+    - `warmup`: Tiempos del calentamiento por familia y tamaño de lote (ms).
+    """
+    status = READINESS.status()
+    return JSONResponse(status, status_code=200 if status["ready"] else 503)
@@ -0,0 +1,140 @@
+import hmac
+from typing import Optional
+
+from fastapi import APIRouter, Header, HTTPException, Query, status
+from fastapi.concurrency import run_in_threadpool
+# 📌 Importa `APIRouter` para definir las rutas de administración de modelos, `Header`/`Query` para
+# los parámetros de la recarga y `run_in_threadpool` para recargar sin bloquear el event loop.
+
+from app.core import settings
+from app.utils import MODEL_REGISTRY
+# 📌 Importa la configuración y el registro de modelos residentes en el proceso.
+
+from app.utils.model_reload import reload_models
+# 📌 Importa la recarga en caliente (carga, calentamiento e intercambio atómico de cada familia).
+
+from app.utils.process_memory import process_memory
+# 📌 Importa la medición de memoria única y compartida del proceso (Linux).
+
+from app.api.services.prediction_service import (deduplication_stats,
+                                                 inference_executor_stats,
+                                                 micro_batching_stats,
+                                                 result_cache_stats,
+                                                 shadow_report)
+# 📌 Importa las métricas del ejecutor de inferencia, de los micro-batchers, de la caché de resultados,
+# de la deduplicación de predicciones repetidas y de la evaluación en sombra.
+
+# 📌 Se define un enrutador para las rutas relacionadas con los modelos cargados.
+MODELS_ROUTER = APIRouter()
+
+
+# 🟢 Endpoint para consultar el estado del registro de modelos.
+@MODELS_ROUTER.get("/models/status")
+async def models_status():
+    """
+    Retorna, por cada familia de modelos, la versión cargada, el tiempo de carga y la
+    memoria residente que ocupó. Las familias aún no cargadas aparecen como `null`.
+    """
+    return MODEL_REGISTRY.report()
+
+
+# 🟢 Endpoint para recargar los modelos sin reiniciar el worker.
+@MODELS_ROUTER.post("/models/reload")
+async def models_reload(
+    families: Optional[str] = Query(None, description="Familias a recargar separadas por coma "
+                                                      "(prediction, segmentation, clusterization); por defecto todas."),
+    warm: bool = Query(settings.HOT_RELOAD_WARM, description="Calentar la versión nueva antes del intercambio."),
+    x_admin_token: Optional[str] = Header(None),
+):
+    """
+    Carga la versión de los artefactos publicada en disco, la calienta y la intercambia con la
+    vigente. Las peticiones en curso terminan con la versión anterior, que se libera al drenarse.
+
+    Solo recarga el worker que atiende la petición (en el modo pre-fork, ver `hot_reload.watch`).
+    Exige la cabecera `X-Admin-Token` igual a `MODELS_ADMIN_TOKEN`; sin token configurado la
+    ruta queda deshabilitada (403).
+
+    Retorna, por familia: versiones anterior y nueva, `load_seconds`, `warmup`, `swap_ms`,
+    memoria durante la transición (`overlap_mb`) y el estado del drenaje (ver `GET /models/reload`).
+    """
+    # 🚨 Sin token configurado la recarga queda cerrada: cualquiera podría forzar la carga de modelos
+    if not settings.MODELS_ADMIN_TOKEN:
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN,
+                            detail="Recarga deshabilitada: defina MODELS_ADMIN_TOKEN.")
+    # 🚨 Comparación en tiempo constante para no filtrar el token por diferencias de tiempo
+    if not hmac.compare_digest((x_admin_token or "").encode(), settings.MODELS_ADMIN_TOKEN.encode()):
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Token de administración inválido.")
+
+    selected = [family.strip() for family in families.split(",") if family.strip()] if families else None
+    try:
+        return await run_in_threadpool(
+            reload_models, selected, warm,
+            dataset_path=settings.WARMUP_DATASET_PATH,
+            sample_rows=settings.WARMUP_SAMPLE_ROWS,
+            batch_sizes=settings.WARMUP_BATCH_SIZES,
+            repeats=settings.WARMUP_REPEATS,
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+
+
+# 🟢 Endpoint para consultar la última recarga de cada familia.
+@MODELS_ROUTER.get("/models/reload")
+async def models_reload_report():
+    """
+    Retorna el reporte de la última recarga de cada familia; `drained` indica si la versión
+    anterior ya se liberó (`drain_seconds` después del intercambio, con `rss_after_drain_mb`).
+    """
+    return MODEL_REGISTRY.reload_report()
+
+
+# 🟢 Endpoint para consultar las métricas de inferencia.
+@MODELS_ROUTER.get("/models/metrics")
+async def models_metrics():
+    """
+    Retorna las métricas de inferencia del proceso:
+
+    - `inference_executor`: tareas pendientes, rechazos y tiempos de espera en la cola del
+      ejecutor que saca la inferencia del event loop.
+    - `micro_batching`: profundidad de cola, histograma de tamaños de lote y tiempos de espera
+      de cada micro-batcher (`model1`, `model2`, `model3`).
+    - `result_cache`: entradas, aciertos, fallos, desalojos, expiraciones e invalidaciones
+      de la caché de resultados.
+    - `deduplication`: aciertos de la búsqueda del resultado guardado antes de inferir y
+      peticiones que compartieron una inferencia en curso (single-flight).
+    """
+    return {
+        "inference_executor": inference_executor_stats(),
+        "micro_batching": micro_batching_stats(),
+        "result_cache": result_cache_stats(),
+        "deduplication": deduplication_stats(),
+    }
+
+
+# 🟢 Endpoint para consultar la evaluación en sombra de la versión candidata.
+@MODELS_ROUTER.get("/models/shadow")
+async def models_shadow():
+    """
+    Compara la versión candidata con la vigente sobre la muestra de tráfico evaluada en sombra
+    por el worker actual. Retorna `null` si `shadow.enabled` es false.
+
+    Por familia: versiones, muestras, errores, `latency_ms` de cada versión (avg, p50, p99 y
+    `speedup` = vigente / candidata) y, por estimador, la diferencia de precio (`prediction`)
+    o la proporción de coincidencias (`segmentation`, `clusterization`).
+    """
+    return shadow_report()
+
+
+# 🟢 Endpoint para consultar la memoria del worker que atiende la petición.
+@MODELS_ROUTER.get("/models/memory")
+async def models_memory():
+    """
+    Retorna la memoria del worker actual a partir de `/proc/self/smaps_rollup`:
+    `unique_mb` (páginas privadas), `shared_mb` (páginas compartidas, p. ej. los modelos
+    heredados del padre en el modo pre-fork), `rss_mb` y `pss_mb`.
+    Retorna `null` si el sistema no expone smaps_rollup.
+    """
+    try:
+        return process_memory()
+    except OSError:
+        return None
@@ -1,24 +1,63 @@
-from fastapi import APIRouter, HTTPException, Depends
-# 📌 Importa `APIRouter` para definir rutas, `HTTPException` para manejar errores HTTP y `Depends` para la inyección de dependencias.
+import asyncio
+# 📌 Importa `asyncio` para ejecutar varias familias de modelos a la vez.
+
+from fastapi import APIRouter, HTTPException, Depends, Query
+from typing import List, Optional
+# 📌 Importa `APIRouter` para definir rutas, `HTTPException` para manejar errores HTTP, `Depends` para la inyección de dependencias
+# y `Query` para documentar el parámetro `members`.
 
 from sqlalchemy.orm import Session
 # 📌 Importa `Session` de SQLAlchemy para interactuar con la base de datos.
 
-from app.api.schemas.prediction_schema import PredictionRequest, PredictionResponse
+from app.api.schemas.prediction_schema import (AllPredictionsResponse,
+                                               BatchPredictionResponse,
+                                               PredictionRequest,
+                                               PredictionResponse)
 # 📌 Importa los esquemas `PredictionRequest` y `PredictionResponse` para validar las solicitudes y respuestas.
+# 📌 `AllPredictionsResponse` define la respuesta con las tres familias de modelos.
+# 📌 `BatchPredictionResponse` define la respuesta de la predicción por lotes.
 
 #from app.api.services.prediction_service import predict
 # 📌 (Comentado) Importaría la función `predict`, que realizaría una predicción basada en un modelo.
 
-from app.api.services.prediction_service import save_prediction
-# 📌 Importa `save_prediction`, que guarda la predicción en la base de datos.
+from fastapi.concurrency import run_in_threadpool
+# 📌 Importa `run_in_threadpool` para ejecutar el trabajo síncrono de la base de datos fuera del event loop.
+
+from app.api.services.prediction_service import (INFERENCE_EXECUTOR,
+                                                 MODEL_FUNCTIONS,
+                                                 find_persisted_result,
+                                                 find_persisted_results,
+                                                 parse_members,
+                                                 persist_all_predictions,
+                                                 persist_prediction,
+                                                 predict_batch,
+                                                 run_model_shared)
+# 📌 Importa `run_model_shared`, que ejecuta el modelo (con caché) fuera del event loop, en el
+# micro-batcher o en el ejecutor de inferencia, compartiendo la tarea con las peticiones idénticas
+# en curso, `persist_prediction`, que guarda la predicción en la base de datos, `predict_batch`,
+# que predice un lote de autos sin persistirlo, y el ejecutor de inferencia que saca los modelos
+# del event loop.
+# 📌 `find_persisted_result` y `find_persisted_results` buscan el resultado ya guardado antes de inferir.
+# 📌 `persist_all_predictions` guarda los resultados de varios modelos en una sola transacción.
+# 📌 `parse_members` convierte el parámetro `members` ("rf,xgb") en la lista de estimadores a evaluar.
+
+from app.utils.inference_executor import ExecutorSaturatedError
+# 📌 Excepción lanzada cuando la cola del ejecutor de inferencia está llena.
 
-from app.core import get_db
-# 📌 Importa `get_db` para obtener la sesión de la base de datos en cada solicitud.
+from app.core import get_db, settings
+# 📌 Importa `get_db` para obtener la sesión de la base de datos en cada solicitud
+# y `settings` para los límites configurables.
 
 # 📌 Se define un enrutador para las rutas relacionadas con predicciones.
 PREDICT_ROUTER = APIRouter()
 
+# 📌 Parámetro común: estimadores del modelo a evaluar (los demás no se ejecutan ni se cargan).
+MEMBERS_QUERY = Query(
+    None,
+    description="Estimadores a evaluar separados por coma, p. ej. 'rf' o 'rf,xgb'. "
+                "model1: rf, xgb, dnn · model2: rf, svm, mlp · model3: kmeans, dbscan. Por defecto, todos.",
+)
+
 """ @PREDICT_ROUTER.post("/predict/{model_name}", response_model=PredictionResponse)
 async def predict_endpoint(model_name: str, request: PredictionRequest):
     try:
@@ -30,18 +69,70 @@ async def predict_endpoint(model_name: str, request: PredictionRequest):
         raise HTTPException(status_code=500, detail=f"Error interno: {str(e)}") """
     
 
+# 🟢 Endpoint para realizar la predicción con las tres familias de modelos y guardarla en la base de datos.
+# Se declara antes de `/predict/save/{model_name}/{user_id}` para que "all" no se tome como nombre de modelo.
+@PREDICT_ROUTER.post("/predict/save/all/{user_id}", response_model=AllPredictionsResponse)
+async def predict_all_endpoint(user_id: str,
+                               request: PredictionRequest,
+                               db: Session = Depends(get_db)):
+    """
+    Realiza la predicción con los tres modelos (precio, segmentación y clusterización) en una sola
+    petición y guarda la predicción y sus tres resultados en una única transacción.
+    Los modelos cuyo resultado ya está guardado para el usuario no se ejecutan de nuevo.
+
+    - **user_id**: ID del usuario que realiza la predicción.
+    - **request**: Datos de entrada requeridos para la predicción (se validan una sola vez).
+    - **db**: Sesión de la base de datos inyectada.
+
+    Retorna:
+    - `model1`, `model2`, `model3`: Resultado guardado de cada modelo.
+    """
+    try:
+        # 🔄 Busca primero los resultados ya guardados (reenvíos del mismo auto)
+        persisted = {}
+        if settings.DEDUP_PERSISTED_LOOKUP:
+            persisted = await run_in_threadpool(find_persisted_results, user_id, request, db)
+        model_names = [model_name for model_name in MODEL_FUNCTIONS if model_name not in persisted]
+        if not model_names:
+            return persisted
+
+        # 🔄 Ejecuta a la vez, fuera del event loop, las familias que faltan
+        data = request.model_dump()
+        outputs = await asyncio.gather(*(run_model_shared(model_name, data) for model_name in model_names))
+
+        # 🔄 Una sola búsqueda de duplicados y un solo commit para la predicción y sus resultados
+        results = dict(zip(model_names, outputs))
+        saved = await run_in_threadpool(persist_all_predictions, user_id, request, db, results)
+        return {**persisted, **saved}
+
+    except ValueError as e:
+        # 🚨 Manejo de error cuando los datos de entrada no son válidos.
+        raise HTTPException(status_code=400, detail=str(e))
+
+    except ExecutorSaturatedError as e:
+        # 🚨 Demasiadas inferencias pendientes: el cliente puede reintentar.
+        raise HTTPException(status_code=503, detail=str(e))
+
+    except Exception as e:
+        # 🚨 Manejo de error interno del servidor.
+        raise HTTPException(status_code=500, detail=f"Error interno: {str(e)}")
+
+
 # 🟢 Endpoint para realizar una predicción y guardarla en la base de datos.
 @PREDICT_ROUTER.post("/predict/save/{model_name}/{user_id}", response_model=PredictionResponse)
 async def predict_endpoint(model_name: str, 
                            user_id: str, 
                            request: PredictionRequest, 
+                           members: Optional[str] = MEMBERS_QUERY,
                            db: Session = Depends(get_db)):
     """
     Realiza una predicción utilizando un modelo específico y guarda el resultado en la base de datos.
+    Si el resultado ya está guardado para el usuario (reenvío del mismo auto), se retorna sin ejecutar el modelo.
 
     - **model_name**: Nombre del modelo a utilizar.
     - **user_id**: ID del usuario que realiza la predicción.
     - **request**: Datos de entrada requeridos para la predicción.
+    - **members**: Estimadores a evaluar (opcional); los no seleccionados se guardan y retornan como null.
     - **db**: Sesión de la base de datos inyectada.
 
     Retorna:
@@ -49,8 +140,19 @@ async def predict_endpoint(model_name: str,
     - `prediction`: Información de la predicción almacenada en la base de datos.
     """
     try:
-        # 🔄 Guarda la predicción en la base de datos
-        prediction_db = save_prediction(user_id, request, db, model_name)
+        selected = parse_members(members)
+
+        # 🔄 Busca primero el resultado ya guardado: un acierto evita la inferencia
+        if settings.DEDUP_PERSISTED_LOOKUP:
+            persisted = await run_in_threadpool(find_persisted_result, user_id, request, db, model_name, selected)
+            if persisted is not None:
+                return {"model": model_name, "prediction": persisted}
+
+        # 🔄 Ejecuta el modelo fuera del event loop (micro-batcher o ejecutor de inferencia)
+        result = await run_model_shared(model_name, request.model_dump(), selected)
+
+        # 🔄 Guarda la predicción en la base de datos desde el pool de hilos de Starlette
+        prediction_db = await run_in_threadpool(persist_prediction, user_id, request, db, model_name, result)
 
         # 📌 Retorna la respuesta con el modelo y la predicción guardada.
         return {
@@ -61,8 +163,47 @@ async def predict_endpoint(model_name: str,
     except ValueError as e:
         # 🚨 Manejo de error cuando los datos de entrada no son válidos.
         raise HTTPException(status_code=400, detail=str(e))
+
+    except ExecutorSaturatedError as e:
+        # 🚨 Demasiadas inferencias pendientes: el cliente puede reintentar.
+        raise HTTPException(status_code=503, detail=str(e))
     
     except Exception as e:
         # 🚨 Manejo de error interno del servidor.
         raise HTTPException(status_code=500, detail=f"Error interno: {str(e)}")
 
+
+# 🟢 Endpoint para predecir un lote de autos con una sola llamada por modelo.
+@PREDICT_ROUTER.post("/predict/batch/{model_name}", response_model=BatchPredictionResponse)
+async def predict_batch_endpoint(model_name: str, requests: List[PredictionRequest],
+                                 members: Optional[str] = MEMBERS_QUERY):
+    """
+    Realiza la predicción de un lote de autos con la familia de modelos indicada.
+    El resultado no se guarda en la base de datos.
+
+    - **model_name**: Nombre del modelo a utilizar (`model1`, `model2` o `model3`).
+    - **requests**: Lista de autos a predecir.
+    - **members**: Estimadores a evaluar (opcional); por defecto, todos los de la familia.
+
+    Retorna:
+    - `model`: Nombre del modelo utilizado.
+    - `unique_rows`: Número de filas distintas calculadas (las repetidas se calculan una vez).
+    - `results`: Un resultado por fila; las filas con valores desconocidos incluyen `error`.
+    """
+    if len(requests) > settings.BATCH_MAX_ROWS:
+        raise HTTPException(status_code=413, detail=f"El lote excede el máximo de {settings.BATCH_MAX_ROWS} autos.")
+    try:
+        batch = await INFERENCE_EXECUTOR.run(predict_batch, model_name, requests, parse_members(members))
+        return {"model": model_name, **batch}
+
+    except ValueError as e:
+        # 🚨 Manejo de error cuando los datos de entrada no son válidos.
+        raise HTTPException(status_code=400, detail=str(e))
+
+    except ExecutorSaturatedError as e:
+        # 🚨 Demasiadas inferencias pendientes: el cliente puede reintentar.
+        raise HTTPException(status_code=503, detail=str(e))
+
+    except Exception as e:
+        # 🚨 Manejo de error interno del servidor.
+        raise HTTPException(status_code=500, detail=f"Error interno: {str(e)}")
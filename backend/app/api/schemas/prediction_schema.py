@@ -1,5 +1,5 @@
 from pydantic import BaseModel, Field, ConfigDict
-from typing import Dict, Optional, Union
+from typing import Dict, List, Optional, Union
 
 # 📌 Importaciones:
 # - `BaseModel`: Clase base de Pydantic para la validación de datos.
@@ -52,13 +52,14 @@ class PredictionRequest(BaseModel):
 class PricesClusterResult(BaseModel):
     """
     Modelo para representar los resultados de la predicción basada en clustering.
+    Los modelos que no se seleccionaron en la petición (`members`) quedan en None.
     
     Atributos:
     - kmeans_cluster (int): Etiqueta del clúster asignado por el modelo K-Means.
     - dbscan_cluster (int): Etiqueta del clúster asignado por el modelo DBSCAN.
     """
-    kmeans_cluster: int
-    dbscan_cluster: int
+    kmeans_cluster: Optional[int] = None
+    dbscan_cluster: Optional[int] = None
 
     model_config = ConfigDict(from_attributes=True)
 
@@ -67,15 +68,16 @@ class PricesClusterResult(BaseModel):
 class PricesSegmentationResult(BaseModel):
     """
     Modelo para representar los resultados de la predicción basada en segmentación.
+    Los modelos que no se seleccionaron en la petición (`members`) quedan en None.
     
     Atributos:
     - rf_prediction (str): Predicción realizada por Random Forest.
     - svm_prediction (str): Predicción realizada por Support Vector Machine (SVM).
     - mlp_prediction (str): Predicción realizada por Multi-Layer Perceptron (MLP).
     """
-    rf_prediction: str
-    svm_prediction: str
-    mlp_prediction: str
+    rf_prediction: Optional[str] = None
+    svm_prediction: Optional[str] = None
+    mlp_prediction: Optional[str] = None
 
     model_config = ConfigDict(from_attributes=True)
 
@@ -84,15 +86,16 @@ class PricesSegmentationResult(BaseModel):
 class PricesPredictionResult(BaseModel):
     """
     Modelo para representar los resultados de la predicción basada en estimación de precios.
+    Los modelos que no se seleccionaron en la petición (`members`) quedan en None.
     
     Atributos:
     - rf_prediction (float): Predicción de precio realizada por Random Forest.
     - xgb_prediction (float): Predicción de precio realizada por XGBoost.
     - dnn_prediction (float): Predicción de precio realizada por una red neuronal profunda (DNN).
     """
-    rf_prediction: float
-    xgb_prediction: float
-    dnn_prediction: float
+    rf_prediction: Optional[float] = None
+    xgb_prediction: Optional[float] = None
+    dnn_prediction: Optional[float] = None
 
     model_config = ConfigDict(from_attributes=True)
 
@@ -111,3 +114,49 @@ class PredictionResponse(BaseModel):
     prediction: Union[PricesClusterResult, PricesSegmentationResult, PricesPredictionResult]
 
     model_config = ConfigDict(from_attributes=True)
+
+
+# 🔹 Esquema para la respuesta de la predicción con las tres familias de modelos.
+class AllPredictionsResponse(BaseModel):
+    """
+    Modelo que define la respuesta de una predicción con todas las familias de modelos.
+
+    Atributos:
+    - model1 (PricesPredictionResult): Estimación de precio (RF, XGBoost, DNN).
+    - model2 (PricesSegmentationResult): Segmento de precio (RF, SVM, MLP).
+    - model3 (PricesClusterResult): Clústeres asignados (K-Means, DBSCAN).
+    """
+    model1: PricesPredictionResult
+    model2: PricesSegmentationResult
+    model3: PricesClusterResult
+
+
+
+# 🔹 Esquema para cada fila del resultado de una predicción por lotes.
+class BatchPredictionItem(BaseModel):
+    """
+    Resultado de una fila dentro de una predicción por lotes.
+
+    Atributos:
+    - index (int): Posición de la fila en la petición.
+    - prediction (dict, opcional): Predicción de cada modelo de la familia (None si hubo error).
+    - error (str, opcional): Motivo por el que la fila no se pudo predecir (p. ej. valores desconocidos).
+    """
+    index: int
+    prediction: Optional[Dict[str, Union[float, int, str, None]]] = None
+    error: Optional[str] = None
+
+
+# 🔹 Esquema para la respuesta de una predicción por lotes.
+class BatchPredictionResponse(BaseModel):
+    """
+    Modelo que define la respuesta de una predicción por lotes.
+
+    Atributos:
+    - model (str): Nombre del modelo utilizado.
+    - unique_rows (int): Número de filas distintas que realmente se calcularon.
+    - results (List[BatchPredictionItem]): Un resultado por fila, en el orden de la petición.
+    """
+    model: str
+    unique_rows: int
+    results: List[BatchPredictionItem]
@@ -1,4 +1,6 @@
-from typing import Dict
+from typing import Dict, List, Optional
+import asyncio
+import threading
 import uuid
 from app.api.schemas.prediction_schema import (PredictionRequest,
                                                PricesClusterResult, 
@@ -6,8 +8,23 @@ from app.api.schemas.prediction_schema import (PredictionRequest,
                                                PricesPredictionResult)
 from app.utils import (prices_clusterization, 
                        prices_prediction, 
-                       prices_segmentation)
-from sqlalchemy.orm import Session
+                       prices_segmentation,
+                       prices_clusterization_batch,
+                       prices_prediction_batch,
+                       prices_segmentation_batch)
+from app.utils import logger, MODEL_REGISTRY
+from app.utils.model_registry import PATH_DIR, ModelRegistry
+from app.utils.shadow import ShadowEvaluator
+from app.utils.features import canonical_key, deduplicate_rows, input_fingerprint
+from app.utils.micro_batcher import MicroBatcher
+from app.utils.result_cache import create_cache_backend
+from app.utils.inference_executor import InferenceExecutor
+from app.utils.single_flight import SingleFlight
+from app.core import settings
+from sqlalchemy import and_, func, or_, select
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session, joinedload
 
 
 # Importar modelos de base de datos
@@ -18,30 +35,129 @@ from app.models import (
     PricesSegmentation,
 )
 
+# 🔹 Mapeo entre modelos y funciones de predicción por lotes
+BATCH_FUNCTIONS = {
+    "model1": prices_prediction_batch,
+    "model2": prices_segmentation_batch,
+    "model3": prices_clusterization_batch,
+}
+
+# 🔹 Micro-batchers: agrupan las peticiones individuales concurrentes en una sola llamada por modelo
+MICRO_BATCHERS = {
+    model_name: MicroBatcher(
+        model_name,
+        batch_func,
+        window_ms=settings.MICRO_BATCHING_WINDOW_MS,
+        max_batch_size=settings.MICRO_BATCHING_MAX_BATCH_SIZE,
+    )
+    for model_name, batch_func in BATCH_FUNCTIONS.items()
+}
+
+# 🔹 Ejecutor de inferencia: las rutas async envían aquí los modelos para no bloquear el event loop
+INFERENCE_EXECUTOR = InferenceExecutor(
+    "predict",
+    kind=settings.INFERENCE_EXECUTOR_KIND,
+    max_workers=settings.INFERENCE_EXECUTOR_MAX_WORKERS,
+    max_queue=settings.INFERENCE_EXECUTOR_MAX_QUEUE,
+)
+
+# 🔹 Los procesos del pool tienen su propia copia de los modelos: al recargar una familia se
+# reemplazan por procesos nuevos, creados a partir del registro ya actualizado
+if INFERENCE_EXECUTOR.kind == "process":
+    MODEL_REGISTRY.subscribe(lambda family: INFERENCE_EXECUTOR.recycle())
+
+# 🔹 Evaluación en sombra: una muestra de las predicciones se evalúa también con la versión
+# candidata en un hilo aparte (se inicia en el `lifespan`, ver `shadow` en config.yaml)
+def create_shadow_evaluator() -> Optional[ShadowEvaluator]:
+    """
+    Crea el evaluador en sombra según `shadow` en config.yaml, o retorna None si está desactivado.
+    Sin `base_dir`, los artefactos candidatos se buscan desde la raíz del proyecto (`models_path`).
+    """
+    if not settings.SHADOW_ENABLED:
+        return None
+    base_dir = PATH_DIR / settings.SHADOW_BASE_DIR if settings.SHADOW_BASE_DIR else PATH_DIR
+    return ShadowEvaluator(
+        ModelRegistry(
+            base_dir=base_dir,
+            mmap_mode=settings.ARTIFACTS_MMAP_MODE,
+            bundles=settings.SHADOW_MODELS_PATH or settings.MODELS_PATH,
+            source=settings.ARTIFACTS_SOURCE,
+            precision=settings.INFERENCE_PRECISION,
+        ),
+        sample_rate=settings.SHADOW_SAMPLE_RATE,
+        max_queue=settings.SHADOW_MAX_QUEUE,
+    )
+
+SHADOW_EVALUATOR = create_shadow_evaluator()
+
+def shadow_report() -> Optional[Dict]:
+    """Retorna la comparación acumulada de la versión candidata, o None si la evaluación está desactivada."""
+    return SHADOW_EVALUATOR.report() if SHADOW_EVALUATOR is not None else None
+
+def inference_executor_stats() -> Dict:
+    """Retorna la longitud de la cola y los tiempos de espera del ejecutor de inferencia."""
+    return INFERENCE_EXECUTOR.stats()
+
+def micro_batching_stats() -> Dict:
+    """Retorna las métricas (cola, tamaños de lote y esperas) de cada micro-batcher."""
+    return {
+        "enabled": settings.MICRO_BATCHING_ENABLED,
+        "models": {model_name: batcher.stats() for model_name, batcher in MICRO_BATCHERS.items()},
+    }
+
+def use_micro_batching(members: Optional[List[str]] = None) -> bool:
+    """
+    Indica si la fila pasa por el micro-batcher. Con `members` (subconjunto de estimadores) no,
+    porque el micro-batcher agrupa peticiones que evalúan todos los estimadores de la familia.
+    Con el ejecutor de procesos tampoco: cada proceso atiende una tarea a la vez, así que sus
+    lotes serían siempre de una fila y solo sumarían la espera de la ventana.
+    """
+    return settings.MICRO_BATCHING_ENABLED and not members and INFERENCE_EXECUTOR.kind == "thread"
+
+def _batched_result(model_name: str, output: Dict) -> Optional[Dict]:
+    """
+    Resultado de una fila del micro-batcher. La clusterización retorna None en cada estimador si
+    la fila no se pudo evaluar (igual que `prices_clusterization`).
+    """
+    result = output["result"]
+    if model_name == "model3" and result is None:
+        return {"kmeans": None, "dbscan": None}
+    return result
+
 # 🔹 Funciones de predicción
-def predict_clusterization(data: Dict) -> Dict:
+def predict_clusterization(data: Dict, members: Optional[List[str]] = None) -> Dict:
     """
     Ejecuta la función de clusterización de precios.
     Modelo 3: devuelve un diccionario con los resultados de clusterización, por ejemplo:
     {"kmeans": valor, "dbscan": valor}
     """
-    return prices_clusterization(data)
+    if not use_micro_batching(members):
+        return prices_clusterization(data, members)
+    try:
+        return _batched_result("model3", MICRO_BATCHERS["model3"](data))
+    except Exception as e:
+        logger.error(f"Error en prices_clusterization: {e}")
+        return {"kmeans": None, "dbscan": None}
 
-def predict_segmentation(data: Dict) -> Dict:
+def predict_segmentation(data: Dict, members: Optional[List[str]] = None) -> Dict:
     """
     Ejecuta la función de segmentación de precios.
     Modelo 2: devuelve un diccionario con los resultados de segmentación, por ejemplo:
     {"rf": valor, "svm": valor, "mlp": valor}
     """
-    return prices_segmentation(data)
+    if not use_micro_batching(members):
+        return prices_segmentation(data, members)
+    return _batched_result("model2", MICRO_BATCHERS["model2"](data))
 
-def predict_prices(data: Dict) -> Dict:
+def predict_prices(data: Dict, members: Optional[List[str]] = None) -> Dict:
     """
     Ejecuta la función de predicción de precios.
     Modelo 1: devuelve un diccionario con los resultados de predicción, por ejemplo:
     {"rf": valor, "xgb": valor, "dnn": valor}
     """
-    return prices_prediction(data)
+    if not use_micro_batching(members):
+        return prices_prediction(data, members)
+    return _batched_result("model1", MICRO_BATCHERS["model1"](data))
 
 # 🔹 Mapeo entre modelos y funciones
 MODEL_FUNCTIONS = {
@@ -50,123 +166,512 @@ MODEL_FUNCTIONS = {
     "model3": predict_clusterization,
 }
 
-def is_duplicated_prediction(db: Session, user_id: str, request: PredictionRequest):
+# 🔹 Familia de artefactos de cada modelo (la versión de la familia forma parte de la llave de caché)
+MODEL_FAMILIES = {
+    "model1": "prediction",
+    "model2": "segmentation",
+    "model3": "clusterization",
+}
+
+# 🔹 Tabla, esquema de respuesta y relación en `Prediction` de los resultados de cada modelo
+# (en `Prediction` la numeración de las relaciones es distinta: `model1_result` es la clusterización)
+RESULT_MODELS = {
+    "model1": (PricesPrediction, PricesPredictionResult, "model3_result"),
+    "model2": (PricesSegmentation, PricesSegmentationResult, "model2_result"),
+    "model3": (PricesCluster, PricesClusterResult, "model1_result"),
+}
+
+# 🔹 Columna de la tabla de resultados donde se guarda cada estimador del modelo
+RESULT_COLUMNS = {
+    "model1": {"rf": "rf_prediction", "xgb": "xgb_prediction", "dnn": "dnn_prediction"},
+    "model2": {"rf": "rf_prediction", "svm": "svm_prediction", "mlp": "mlp_prediction"},
+    "model3": {"kmeans": "kmeans_cluster", "dbscan": "dbscan_cluster"},
+}
+
+# 🔹 Caché de resultados por combinación de características; se invalida al recargar una familia
+# (backend "memory" por proceso o "sqlite" compartido entre los workers del host)
+RESULT_CACHE = create_cache_backend(
+    settings.RESULT_CACHE_BACKEND,
+    max_entries=settings.RESULT_CACHE_MAX_ENTRIES,
+    ttl_seconds=settings.RESULT_CACHE_TTL_SECONDS,
+    sqlite_path=settings.RESULT_CACHE_SQLITE_PATH,
+)
+# 🔹 Las llaves incluyen la versión del modelo: solo una recarga deja entradas obsoletas
+MODEL_REGISTRY.subscribe_reload(RESULT_CACHE.model_reloaded)
+
+def result_cache_stats() -> Dict:
+    """Retorna el tamaño y los contadores (aciertos, fallos, desalojos) de la caché de resultados."""
+    return {"enabled": settings.RESULT_CACHE_ENABLED, **RESULT_CACHE.stats()}
+
+def parse_members(members: Optional[str]) -> Optional[List[str]]:
+    """Convierte el parámetro `members` de las rutas ("rf,xgb") en una lista, o None si está vacío."""
+    if not members:
+        return None
+    return [member.strip() for member in members.split(",") if member.strip()] or None
+
+def select_members(model_name: str, members: Optional[List[str]] = None) -> Optional[List[str]]:
     """
-    Devuelve la predicción existente (si la hay) o None.
-    Se compara la información de entrada y el user_id.
+    Valida la selección de estimadores de un modelo.
+    Retorna None si se seleccionan todos (ejecución normal de la familia completa).
+
+    Lanza:
+        ValueError: Si el modelo no existe o algún estimador no le pertenece.
     """
-    return db.query(Prediction).filter(
+    if model_name not in MODEL_FAMILIES:
+        raise ValueError(f"Modelo '{model_name}' no es válido. Debe ser 'model1', 'model2' o 'model3'.")
+    family = MODEL_FAMILIES[model_name]
+    selected = MODEL_REGISTRY.select_members(family, members)
+    return None if selected == MODEL_REGISTRY.select_members(family) else list(selected)
+
+def run_model(model_name: str, data: Dict, members: Optional[List[str]] = None) -> Dict:
+    """
+    Ejecuta el modelo indicado pasando antes por la caché de resultados.
+    Con `members` solo se evalúan (y cargan) esos estimadores del modelo.
+    Un acierto evita la inferencia; solo se guardan resultados completos (sin valores None).
+    """
+    members = select_members(model_name, members)
+    _submit_shadow(model_name, data, members)
+    key = _result_cache_key(model_name, data, members)
+    cached = RESULT_CACHE.get(key) if key is not None else None
+    if cached is not None:
+        return cached
+
+    result = MODEL_FUNCTIONS[model_name](data, members)
+    _cache_result(key, result)
+    return result
+
+async def run_model_async(model_name: str, data: Dict, members: Optional[List[str]] = None) -> Dict:
+    """
+    Versión para las rutas async de `run_model`. La caché de resultados y la evaluación en sombra
+    se resuelven en el proceso del worker; fuera del event loop solo se ejecuta la inferencia.
+    Si la fila pasa por el micro-batcher, se encola desde el event loop y solo el lote se ejecuta
+    en el hilo del micro-batcher: así ningún hilo del ejecutor queda bloqueado esperando la
+    ventana y los lotes pueden llegar a `max_batch_size` filas. En otro caso, la función del
+    modelo se ejecuta en el ejecutor de inferencia (con `kind: process`, en otro proceso, que
+    no ve la caché en memoria ni la cola de la evaluación en sombra del worker).
+
+    Lanza:
+        ValueError: Si el modelo o los estimadores no son válidos.
+        ExecutorSaturatedError: Si la cola del ejecutor está llena.
+    """
+    members = select_members(model_name, members)
+    # La consulta a la caché es local (memoria o SQLite del host), igual que el resto del camino rápido
+    _submit_shadow(model_name, data, members)
+    key = _result_cache_key(model_name, data, members)
+    cached = RESULT_CACHE.get(key) if key is not None else None
+    if cached is not None:
+        return cached
+
+    if use_micro_batching(members):
+        output = await asyncio.wrap_future(MICRO_BATCHERS[model_name].submit(data))
+        result = _batched_result(model_name, output)
+    else:
+        result = await INFERENCE_EXECUTOR.run(MODEL_FUNCTIONS[model_name], data, members)
+    _cache_result(key, result)
+    return result
+
+def _submit_shadow(model_name: str, data: Dict, members: Optional[List[str]]) -> None:
+    """Encola la fila en la evaluación en sombra (si sale sorteada); la evaluación corre fuera de la petición."""
+    if SHADOW_EVALUATOR is not None and members is None:
+        SHADOW_EVALUATOR.submit(MODEL_FAMILIES[model_name], data)
+
+def _result_cache_key(model_name: str, data: Dict, members: Optional[List[str]]):
+    """Llave de la caché de resultados, o None si la caché está desactivada o no hay modelos cargados."""
+    if not settings.RESULT_CACHE_ENABLED:
+        return None
+    family = MODEL_FAMILIES[model_name]
+    try:
+        version = MODEL_REGISTRY.get(family).version
+    except RuntimeError:
+        # Sin modelos cargados no hay versión con la que indexar: la función reporta el error
+        return None
+    return RESULT_CACHE.make_key(family, version, data, members)
+
+def _cache_result(key, result: Optional[Dict]) -> None:
+    """Guarda en la caché solo resultados completos (sin valores None)."""
+    if key is not None and result and all(value is not None for value in result.values()):
+        RESULT_CACHE.put(key, result)
+
+def predict_batch(model_name: str, requests: List[PredictionRequest], members: Optional[List[str]] = None) -> Dict:
+    """
+    Ejecuta la predicción de un lote de autos con la familia de modelos indicada.
+    Cada estimador seleccionado (todos por defecto) se ejecuta una sola vez sobre todas
+    las filas distintas del lote.
+    Retorna un diccionario con el número de filas distintas y un resultado por fila.
+    """
+    members = select_members(model_name, members)
+    func = BATCH_FUNCTIONS[model_name]
+
+    rows = [request.model_dump() for request in requests]
+    unique_rows, _ = deduplicate_rows(rows)
+    outputs = func(rows, members) if rows else []
+    return {
+        "unique_rows": len(unique_rows),
+        "results": [
+            {"index": index, "prediction": output["result"], "error": output["error"]}
+            for index, output in enumerate(outputs)
+        ],
+    }
+
+def _prediction_filters(user_id: str, request: PredictionRequest) -> List:
+    """
+    Condiciones que identifican la predicción de un usuario: el user_id y el hash de los datos
+    de entrada, resueltas con el índice único `ix_predictions_user_fingerprint`.
+    """
+    return [
         Prediction.user_id == user_id,
-        Prediction.brand == request.Brand,
-        Prediction.model == request.Model,
-        Prediction.year == request.Year,
-        Prediction.engine_size == request.Engine_Size,
-        Prediction.fuel_type == request.Fuel_Type,
-        Prediction.transmission == request.Transmission,
-        Prediction.mileage == request.Mileage,
-        Prediction.doors == request.Doors,
-        Prediction.owner_count == request.Owner_Count
-    ).first()
+        Prediction.fingerprint == input_fingerprint(request.model_dump()),
+    ]
+
+def is_duplicated_prediction(db: Session, user_id: str, request: PredictionRequest, with_results: bool = False):
+    """
+    Devuelve la predicción existente (si la hay) o None.
+    Se compara el user_id y el hash de la información de entrada (`input_fingerprint`).
+    Con `with_results=True` los resultados de los tres modelos se cargan en la misma consulta.
+    """
+    query = db.query(Prediction)
+    if with_results:
+        query = query.options(*(joinedload(getattr(Prediction, attribute))
+                                for _, _, attribute in RESULT_MODELS.values()))
+    return query.filter(*_prediction_filters(user_id, request)).first()
+
+# 🔹 Búsqueda del resultado guardado antes de la inferencia: un reenvío del mismo auto por el
+# mismo usuario se responde desde la base de datos sin ejecutar el modelo
+_LOOKUP_LOCK = threading.Lock()
+_LOOKUP_COUNTS = {"hits": 0, "misses": 0}
+
+def _count_lookup(hit: bool) -> None:
+    with _LOOKUP_LOCK:
+        _LOOKUP_COUNTS["hits" if hit else "misses"] += 1
 
-def save_prediction(user_id: str, request: PredictionRequest, db: Session, model_name: str) -> Dict:
+def _complete_result(row, model_name: str, members: Optional[List[str]] = None) -> bool:
+    """True si la fila de resultados tiene valor en todas las columnas de los estimadores seleccionados."""
+    if row is None:
+        return False
+    columns = RESULT_COLUMNS[model_name]
+    return all(getattr(row, columns[member]) is not None for member in (members or columns))
+
+def find_persisted_result(user_id: str, request: PredictionRequest, db: Session, model_name: str,
+                          members: Optional[List[str]] = None) -> Optional[Dict]:
     """
-    Guarda la predicción y el resultado del modelo en la base de datos.
+    Busca, con una sola consulta, el resultado guardado del modelo para la predicción del usuario.
+    Retorna la respuesta guardada si tiene valor para todos los estimadores seleccionados
+    (`members`, por defecto todos), o None si hay que ejecutar el modelo.
+
+    Lanza:
+        ValueError: Si el modelo no existe o algún estimador no le pertenece.
+    """
+    members = select_members(model_name, members)
+    table, schema, _ = RESULT_MODELS[model_name]
+    row = (db.query(table)
+           .join(Prediction, table.prediction_id == Prediction.id)
+           .filter(*_prediction_filters(user_id, request))
+           .first())
+    hit = _complete_result(row, model_name, members)
+    _count_lookup(hit)
+    return schema.model_validate(row).model_dump() if hit else None
+
+def find_persisted_results(user_id: str, request: PredictionRequest, db: Session) -> Dict[str, Dict]:
+    """
+    Busca, con una sola consulta, los resultados guardados de los tres modelos para la predicción
+    del usuario. Retorna {nombre del modelo: respuesta guardada} solo con los modelos cuyo
+    resultado está completo; los que falten deben ejecutarse.
+    """
+    prediction_db = is_duplicated_prediction(db, user_id, request, with_results=True)
+    found = {}
+    for model_name, (_, schema, attribute) in RESULT_MODELS.items():
+        row = getattr(prediction_db, attribute) if prediction_db is not None else None
+        hit = _complete_result(row, model_name)
+        _count_lookup(hit)
+        if hit:
+            found[model_name] = schema.model_validate(row).model_dump()
+    return found
+
+# 🔹 Inferencias en curso: las peticiones concurrentes con el mismo auto, modelo y estimadores
+# esperan la misma tarea del ejecutor en lugar de encolar otra
+SINGLE_FLIGHT = SingleFlight("predict")
+
+async def run_model_shared(model_name: str, data: Dict, members: Optional[List[str]] = None) -> Dict:
+    """
+    Ejecuta `run_model_async` compartiendo la tarea con las peticiones concurrentes idénticas
+    (ver `deduplication.single_flight`). El resultado es compartido: no debe modificarse.
+
+    Lanza:
+        ValueError: Si el modelo, los estimadores o los datos de entrada no son válidos.
+        ExecutorSaturatedError: Si la cola del ejecutor está llena.
+    """
+    members = select_members(model_name, members)
+    if not settings.DEDUP_SINGLE_FLIGHT:
+        return await run_model_async(model_name, data, members)
+    key = (model_name, tuple(members) if members else None, canonical_key(data))
+    return await SINGLE_FLIGHT.run(key, lambda: run_model_async(model_name, data, members))
+
+def deduplication_stats() -> Dict:
+    """Retorna los aciertos de la búsqueda previa en la base de datos y las métricas del single-flight."""
+    with _LOOKUP_LOCK:
+        lookups = dict(_LOOKUP_COUNTS)
+    total = lookups["hits"] + lookups["misses"]
+    return {
+        "persisted_lookup": {
+            "enabled": settings.DEDUP_PERSISTED_LOOKUP,
+            **lookups,
+            "hit_ratio": round(lookups["hits"] / total, 4) if total else 0.0,
+        },
+        "single_flight": {"enabled": settings.DEDUP_SINGLE_FLIGHT, **SINGLE_FLIGHT.stats()},
+    }
+
+def _prediction_values(user_id: str, input_data: Dict) -> Dict:
+    """Columnas de la fila de `Prediction` con los datos de entrada del auto."""
+    return {
+        "id": uuid.uuid4(),
+        "user_id": user_id,
+        "brand": input_data.get("Brand"),
+        "model": input_data.get("Model"),
+        "year": input_data.get("Year"),
+        "engine_size": input_data.get("Engine_Size"),
+        "fuel_type": input_data.get("Fuel_Type"),
+        "transmission": input_data.get("Transmission"),
+        "mileage": input_data.get("Mileage"),
+        "doors": input_data.get("Doors"),
+        "owner_count": input_data.get("Owner_Count"),
+        "fingerprint": input_fingerprint(input_data),
+    }
+
+def _new_prediction(user_id: str, input_data: Dict) -> Prediction:
+    """Crea (sin guardar) la fila de `Prediction` con los datos de entrada del auto."""
+    return Prediction(**_prediction_values(user_id, input_data))
+
+def _retry_on_conflict(db: Session, persist, *args) -> Dict:
+    """
+    Ejecuta `persist(db, ...)` y, si una petición concurrente guardó antes la misma predicción o el
+    mismo resultado (violación de `ix_predictions_user_fingerprint` o de `prediction_id`), deshace
+    la transacción y lo intenta una vez más: el segundo intento encuentra las filas ya guardadas.
+    """
+    try:
+        return persist(db, *args)
+    except IntegrityError:
+        db.rollback()
+        logger.info("Predicción guardada por una petición concurrente; se reutilizan las filas existentes.")
+        return persist(db, *args)
+
+def _check_result(model_name: str, result_predic: Optional[Dict]) -> None:
+    """
+    Verifica que el modelo haya podido evaluar el auto antes de guardarlo. En la base de datos,
+    NULL significa solo "estimador no seleccionado": un resultado None (o con todos los
+    estimadores seleccionados en None) se debe a categorías que los modelos no conocen.
+
+    Lanza:
+        ValueError: Si el resultado es None o todos sus valores son None.
+    """
+    if not result_predic or all(value is None for value in result_predic.values()):
+        raise ValueError(f"El modelo '{model_name}' no pudo evaluar el auto: contiene valores "
+                         "desconocidos (categorías que no se vieron en el entrenamiento).")
+
+def _new_result(model_name: str, prediction_id, result_predic: Dict):
+    """
+    Crea (sin guardar) la fila de resultados del modelo indicado.
+    Los estimadores que no se seleccionaron quedan en NULL.
+    """
+    table = RESULT_MODELS[model_name][0]
+    columns = {column: result_predic.get(member) for member, column in RESULT_COLUMNS[model_name].items()}
+    return table(id=uuid.uuid4(), prediction_id=prediction_id, **columns)
+
+def _fill_missing_results(row, model_name: str, result_predic: Dict) -> bool:
+    """
+    Completa en una fila existente las columnas vacías (estimadores no seleccionados antes)
+    con los valores nuevos de `result_predic`. Retorna True si se modificó la fila.
+    """
+    changed = False
+    for member, column in RESULT_COLUMNS[model_name].items():
+        if getattr(row, column) is None and result_predic.get(member) is not None:
+            setattr(row, column, result_predic[member])
+            changed = True
+    return changed
+
+# 🔹 Escritura con upsert: `INSERT ... ON CONFLICT ... RETURNING` resuelve en la misma sentencia
+# la búsqueda del duplicado, la inserción y la lectura del resultado guardado
+UPSERT_DIALECTS = {
+    "postgresql": postgresql.insert,
+    "sqlite": sqlite.insert,
+}
+
+def _upsert_insert(db: Session):
+    """Retorna la función `insert` con `on_conflict_do_update` del dialecto de la sesión, o None si no la hay."""
+    if not settings.PERSISTENCE_UPSERT:
+        return None
+    return UPSERT_DIALECTS.get(db.get_bind().dialect.name)
+
+def _upsert_prediction(db: Session, insert, user_id: str, input_data: Dict):
+    """
+    Inserta la predicción o, si el usuario ya la tiene (`ix_predictions_user_fingerprint`),
+    retorna el id de la existente. Con DO NOTHING la fila existente no se reescribe (un reenvío
+    no genera una versión muerta ni tráfico de WAL); como entonces RETURNING no devuelve nada,
+    el id se lee con una búsqueda por el mismo índice.
+    """
+    values = _prediction_values(user_id, input_data)
+    statement = insert(Prediction).values(**values).on_conflict_do_nothing(
+        index_elements=[Prediction.user_id, Prediction.fingerprint],
+    ).returning(Prediction.id)
+    prediction_id = db.execute(statement).scalar_one_or_none()
+    if prediction_id is not None:
+        return prediction_id
+    return db.execute(select(Prediction.id).where(
+        Prediction.user_id == user_id, Prediction.fingerprint == values["fingerprint"],
+    )).scalar_one()
+
+def _upsert_result(db: Session, insert, model_name: str, prediction_id, result_predic: Dict) -> Dict:
+    """
+    Inserta el resultado del modelo o, si la predicción ya lo tiene (`prediction_id` único), completa
+    solo sus columnas vacías (COALESCE conserva los valores guardados). La actualización solo se
+    ejecuta si llena alguna columna vacía; si no, la fila no se reescribe y se lee con una
+    búsqueda por `prediction_id`. Retorna la fila guardada.
+    """
+    table, schema, _ = RESULT_MODELS[model_name]
+    columns = [getattr(table, column) for column in RESULT_COLUMNS[model_name].values()]
+    values = {column: result_predic.get(member) for member, column in RESULT_COLUMNS[model_name].items()}
+    statement = insert(table).values(id=uuid.uuid4(), prediction_id=prediction_id, **values)
+    excluded = [getattr(statement.excluded, column.key) for column in columns]
+    statement = statement.on_conflict_do_update(
+        index_elements=[table.prediction_id],
+        set_={column.key: func.coalesce(column, new) for column, new in zip(columns, excluded)},
+        where=or_(*(and_(column.is_(None), new.is_not(None)) for column, new in zip(columns, excluded))),
+    ).returning(*columns)
+    row = db.execute(statement).one_or_none()
+    if row is None:
+        row = db.execute(select(*columns).where(table.prediction_id == prediction_id)).one()
+    return schema.model_validate(dict(row._mapping)).model_dump()
+
+def _upsert_predictions(db: Session, insert, user_id: str, request: PredictionRequest, results: Dict[str, Dict]) -> Dict[str, Dict]:
+    """
+    Guarda la predicción y los resultados con una sentencia por tabla y un solo commit, sin
+    consultas previas; solo las filas que ya existían y no cambian se leen después. Las
+    peticiones concurrentes se resuelven en la propia base de datos (ON CONFLICT), así que no
+    hace falta reintentar.
+    """
+    try:
+        prediction_id = _upsert_prediction(db, insert, user_id, request.model_dump())
+        response = {model_name: _upsert_result(db, insert, model_name, prediction_id, result_predic)
+                    for model_name, result_predic in results.items()}
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
+    return response
+
+def persist_all_predictions(user_id: str, request: PredictionRequest, db: Session, results: Dict[str, Dict]) -> Dict[str, Dict]:
+    """
+    Guarda en una sola transacción la predicción y los resultados ya calculados de varios modelos.
+    La predicción duplicada se busca una sola vez (junto con sus resultados); solo se insertan la
+    predicción si no existe y los resultados que falten (o sus columnas vacías), y se confirma todo
+    con un único commit. Si una petición concurrente guarda la misma predicción antes, se reutiliza.
+    Con `persistence.upsert` (PostgreSQL o SQLite) se usa `_upsert_predictions` en su lugar.
+    Retorna un diccionario {nombre del modelo: resultado guardado}.
+    """
+    unknown = [model_name for model_name in results if model_name not in RESULT_MODELS]
+    if unknown:
+        raise ValueError(f"Modelos no válidos: {unknown}. Deben ser 'model1', 'model2' o 'model3'.")
+    for model_name, result_predic in results.items():
+        _check_result(model_name, result_predic)
+    insert = _upsert_insert(db)
+    if insert is not None:
+        return _upsert_predictions(db, insert, user_id, request, results)
+    return _retry_on_conflict(db, _persist_all_predictions, user_id, request, results)
+
+def _persist_all_predictions(db: Session, user_id: str, request: PredictionRequest, results: Dict[str, Dict]) -> Dict[str, Dict]:
+    """Un intento de `persist_all_predictions` (una búsqueda y un commit)."""
+    prediction_db = is_duplicated_prediction(db, user_id, request, with_results=True)
+    is_new = prediction_db is None
+    if is_new:
+        prediction_db = _new_prediction(user_id, request.model_dump())
+        db.add(prediction_db)
+
+    response = {}
+    try:
+        for model_name, result_predic in results.items():
+            _, schema, attribute = RESULT_MODELS[model_name]
+            row = None if is_new else getattr(prediction_db, attribute)
+            if row is None:
+                row = _new_result(model_name, prediction_db.id, result_predic)
+                db.add(row)
+            else:
+                _fill_missing_results(row, model_name, result_predic)
+            # La respuesta se arma antes del commit para no recargar cada fila después
+            response[model_name] = schema.model_validate(row).model_dump()
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
+    return response
+
+def save_prediction(user_id: str, request: PredictionRequest, db: Session, model_name: str,
+                    members: Optional[List[str]] = None) -> Dict:
+    """
+    Ejecuta el modelo (solo los estimadores de `members`, si se indican) y guarda la predicción
+    y su resultado en la base de datos.
+    Primero busca el resultado ya guardado (`find_persisted_result`); el modelo solo se ejecuta
+    si no existe o le faltan estimadores. Después equivale a `run_model` seguido de
+    `persist_prediction` (ver ambas).
+    Retorna un diccionario resultado del modelo.
+    """
+    if settings.DEDUP_PERSISTED_LOOKUP:
+        persisted = find_persisted_result(user_id, request, db, model_name, members)
+        if persisted is not None:
+            return persisted
+
+    # Ejecutar la predicción (o tomarla de la caché de resultados) para obtener el resultado del modelo
+    result_predic = run_model(model_name, request.model_dump(), members)
+    return persist_prediction(user_id, request, db, model_name, result_predic)
+
+def persist_prediction(user_id: str, request: PredictionRequest, db: Session, model_name: str, result_predic: Dict) -> Dict:
+    """
+    Guarda la predicción y el resultado ya calculado del modelo en la base de datos.
     Si ya existe una predicción con los mismos datos para el mismo user_id, no se guarda de nuevo.
     Además, si ya existe un registro del resultado para el modelo en esa predicción, no se guarda duplicado,
-    sino que se devuelve el registro existente.
+    sino que se devuelve el registro existente, completando las columnas de los estimadores que
+    no se habían seleccionado antes (`members`) con los valores nuevos.
+    Si una petición concurrente guarda la misma predicción antes, se reutiliza su registro.
+    Con `persistence.upsert` (PostgreSQL o SQLite) se guarda con `_upsert_predictions`: dos
+    sentencias y un commit en lugar de hasta dos commits y dos recargas.
     Retorna un diccionario resultado del modelo.
     """
-    func = MODEL_FUNCTIONS.get(model_name)
-    if not func:
+    if model_name not in RESULT_MODELS:
         raise ValueError(f"Modelo '{model_name}' no es válido. Debe ser 'model1', 'model2' o 'model3'.")
+    _check_result(model_name, result_predic)
+    insert = _upsert_insert(db)
+    if insert is not None:
+        return _upsert_predictions(db, insert, user_id, request, {model_name: result_predic})[model_name]
+    return _retry_on_conflict(db, _persist_prediction, user_id, request, model_name, result_predic)
 
-    # Ejecutar la predicción para obtener el resultado del modelo
-    result_predic = func(request.model_dump())
-    input_data = request.model_dump()
+def _persist_prediction(db: Session, user_id: str, request: PredictionRequest, model_name: str, result_predic: Dict) -> Dict:
+    """Un intento de `persist_prediction`."""
+    table, schema, _ = RESULT_MODELS[model_name]
 
     # Verificar si ya existe una predicción con los mismos datos para ese usuario
     existing_prediction = is_duplicated_prediction(db, user_id, request)
     
     if existing_prediction:
         # La predicción ya existe, consultamos si ya se guardó el resultado del modelo
-        if model_name == "model1":
-            existing_result = db.query(PricesPrediction).filter(PricesPrediction.prediction_id == existing_prediction.id).first()
-            if existing_result:
-                response = PricesPredictionResult.model_validate(existing_result)
-                return response.model_dump()
-        elif model_name == "model2":
-            existing_result = db.query(PricesSegmentation).filter(PricesSegmentation.prediction_id == existing_prediction.id).first()
-            if existing_result:
-                response = PricesSegmentationResult.model_validate(existing_result)
-                return response.model_dump()
-        elif model_name == "model3":
-            existing_result = db.query(PricesCluster).filter(PricesCluster.prediction_id == existing_prediction.id).first()
-            if existing_result:
-                response = PricesClusterResult.model_validate(existing_result)
-                return response.model_dump()
+        existing_result = db.query(table).filter(table.prediction_id == existing_prediction.id).first()
+        if existing_result:
+            if _fill_missing_results(existing_result, model_name, result_predic):
+                db.commit()
+                db.refresh(existing_result)
+            return schema.model_validate(existing_result).model_dump()
         # Si la predicción existe pero no hay resultado del modelo, usaremos la predicción existente para guardar el nuevo resultado.
         prediction_db = existing_prediction
     else:
         # No existe la predicción: se crea una nueva
-        prediction_db = Prediction(
-            id=uuid.uuid4(),  # Generamos un UUID para la predicción
-            user_id=user_id,  # Id del usuario que realizó la predicción
-            brand=input_data.get("Brand"),
-            model=input_data.get("Model"),
-            year=input_data.get("Year"),
-            engine_size=input_data.get("Engine_Size"),
-            fuel_type=input_data.get("Fuel_Type"),
-            transmission=input_data.get("Transmission"),
-            mileage=input_data.get("Mileage"),
-            doors=input_data.get("Doors"),
-            owner_count=input_data.get("Owner_Count")
-        )
+        prediction_db = _new_prediction(user_id, request.model_dump())
         db.add(prediction_db)
         db.commit()
         db.refresh(prediction_db)
 
-    # Según el modelo, se guarda el resultado solo si no existe ya.
-    if model_name == "model1":
-        new_result = PricesPrediction(
-            id=uuid.uuid4(),
-            prediction_id=prediction_db.id,
-            rf_prediction=result_predic.get("rf"),
-            xgb_prediction=result_predic.get("xgb"),
-            dnn_prediction=result_predic.get("dnn")
-        )
-        db.add(new_result)
-        db.commit()
-        db.refresh(new_result)
-        response = PricesPredictionResult.model_validate(new_result)
-       
-    elif model_name == "model2":
-        new_result = PricesSegmentation(
-            id=uuid.uuid4(),
-            prediction_id=prediction_db.id,
-            rf_prediction=result_predic.get("rf"),
-            svm_prediction=result_predic.get("svm"),
-            mlp_prediction=result_predic.get("mlp")
-        )
-        db.add(new_result)
-        db.commit()
-        db.refresh(new_result)
-        response = PricesSegmentationResult.model_validate(new_result)
-        
-    elif model_name == "model3":
-        new_result = PricesCluster(
-            id=uuid.uuid4(),
-            prediction_id=prediction_db.id,
-            kmeans_cluster=result_predic.get("kmeans"),
-            dbscan_cluster=result_predic.get("dbscan")
-        )
-        db.add(new_result)
-        db.commit()
-        db.refresh(new_result)
-        response = PricesClusterResult.model_validate(new_result)
-    # Ejecutar la predicción para obtener el resultado del modelo
-    #result_predic = func(request.model_dump())
-    
-    return response.model_dump()
+    # Se guarda el resultado del modelo (solo llega aquí si no existía)
+    new_result = _new_result(model_name, prediction_db.id, result_predic)
+    db.add(new_result)
+    db.commit()
+    db.refresh(new_result)
+    return schema.model_validate(new_result).model_dump()
 
 
 
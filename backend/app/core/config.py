@@ -2,7 +2,7 @@ import os
 from pydantic_settings import BaseSettings
 import yaml
 from dotenv import load_dotenv
-from typing import Dict
+from typing import Dict, List, Optional
 
 # Cargar variables de entorno desde el archivo .env
 DOTENV_PATH = os.path.join(os.path.dirname(__file__), ".env")  # Ruta al archivo .env
@@ -27,6 +27,7 @@ class Settings(BaseSettings):
     POSTGRES_HOST: str = os.getenv("POSTGRES_HOST")  # Host de la base de datos
     POSTGRES_PORT: int = int(os.getenv("POSTGRES_PORT", 5432))  # Puerto de la base de datos (por defecto 5432)
     SECRET_KEY: str = os.getenv("SECRET_KEY")  # Clave secreta para autenticación
+    MODELS_ADMIN_TOKEN: Optional[str] = os.getenv("MODELS_ADMIN_TOKEN")  # Token para recargar modelos (sin token, recarga deshabilitada)
 
     # Variables cargadas desde config.yaml (seguridad)
     ALGORITHM: str = CONFIG_YAML["security"]["algorithm"]  # Algoritmo de cifrado
@@ -35,7 +36,68 @@ class Settings(BaseSettings):
 
     # Configuración de modelos de predicción desde config.yaml
     MODELS_NAME_PREDICT: Dict[str, str] = CONFIG_YAML["models_name_predict"]  # Nombres de los modelos de predicción
-    MODELS_PATH: Dict[str, str] = CONFIG_YAML["models_path"]  # Rutas de los modelos de predicción
+    MODELS_PATH: Dict[str, str] = CONFIG_YAML["models_path"]  # Paquete versionado de cada familia de modelos
+
+    # Predicción por lotes desde config.yaml
+    BATCH_MAX_ROWS: int = CONFIG_YAML["batch_prediction"]["max_rows"]  # Máximo de autos por lote
+
+    # Carga de artefactos desde config.yaml
+    ARTIFACTS_MMAP_MODE: Optional[str] = CONFIG_YAML["artifacts"]["mmap_mode"]  # Modo de mmap de joblib ("r" o None)
+    ARTIFACTS_PRELOAD_MEMBERS: bool = CONFIG_YAML["artifacts"]["preload_members"]  # Cargar todos los estimadores al iniciar
+    ARTIFACTS_SOURCE: str = CONFIG_YAML["artifacts"]["source"]  # "auto", "bundle" o "directory"
+    ARTIFACTS_BUNDLE_CACHE_DIR: Optional[str] = CONFIG_YAML["artifacts"].get("bundle_cache_dir")  # Extracción de paquetes
+
+    # Recarga de modelos en caliente desde config.yaml
+    HOT_RELOAD_WATCH: bool = CONFIG_YAML["hot_reload"]["watch"]  # Vigilar los artefactos y recargar al cambiar
+    HOT_RELOAD_POLL_SECONDS: float = CONFIG_YAML["hot_reload"]["poll_seconds"]  # Intervalo del vigilante
+    HOT_RELOAD_WARM: bool = CONFIG_YAML["hot_reload"]["warm"]  # Calentar la versión nueva antes de publicarla
+
+    # Evaluación en sombra desde config.yaml
+    SHADOW_ENABLED: bool = CONFIG_YAML["shadow"]["enabled"]  # Evaluar una versión candidata con tráfico real
+    SHADOW_SAMPLE_RATE: float = CONFIG_YAML["shadow"]["sample_rate"]  # Proporción de peticiones evaluadas
+    SHADOW_MAX_QUEUE: int = CONFIG_YAML["shadow"]["max_queue"]  # Muestras pendientes máximas
+    SHADOW_BASE_DIR: Optional[str] = CONFIG_YAML["shadow"].get("base_dir")  # Raíz de los artefactos candidatos
+    SHADOW_MODELS_PATH: Optional[Dict[str, str]] = CONFIG_YAML["shadow"].get("models_path")  # Paquetes candidatos
+
+    # Motores de inferencia desde config.yaml
+    TREE_ENGINE: str = CONFIG_YAML["inference"]["tree_engine"]  # "flat" o "sklearn" para los Random Forest
+    FLAT_FOREST_MAX_ROWS: int = CONFIG_YAML["inference"]["flat_forest_max_rows"]  # Umbral de lote para volver a sklearn
+    INFERENCE_BACKENDS: Dict[str, str] = CONFIG_YAML["inference"].get("backend", {})  # "native" u "onnx" por familia
+    ONNX_INTRA_OP_THREADS: int = CONFIG_YAML["inference"].get("onnx_intra_op_threads", 1)  # Hilos por operador
+    ONNX_INTER_OP_THREADS: int = CONFIG_YAML["inference"].get("onnx_inter_op_threads", 1)  # Hilos entre operadores
+    INFERENCE_PRECISION: str = CONFIG_YAML["inference"].get("precision", "float64")  # "float64" o "float32"
+    SVM_VARIANT: str = CONFIG_YAML["inference"].get("svm_variant", "exact")  # "exact" o "approx" para el SVM de segmentación
+
+    # Calentamiento de los modelos desde config.yaml
+    WARMUP_ENABLED: bool = CONFIG_YAML["warmup"]["enabled"]  # Ejecutar inferencia sintética antes de estar listo
+    WARMUP_BATCH_SIZES: List[int] = CONFIG_YAML["warmup"]["batch_sizes"]  # Tamaños de lote del calentamiento
+    WARMUP_REPEATS: int = CONFIG_YAML["warmup"]["repeats"]  # Ejecuciones por tamaño de lote
+    WARMUP_DATASET_PATH: Optional[str] = CONFIG_YAML["warmup"].get("dataset_path")  # CSV con autos de ejemplo
+    WARMUP_SAMPLE_ROWS: int = CONFIG_YAML["warmup"]["sample_rows"]  # Filas tomadas del dataset
+
+    # Ejecutor de inferencia desde config.yaml
+    INFERENCE_EXECUTOR_KIND: str = CONFIG_YAML["inference_executor"]["kind"]  # "thread" o "process"
+    INFERENCE_EXECUTOR_MAX_WORKERS: int = CONFIG_YAML["inference_executor"]["max_workers"]  # Tamaño del pool
+    INFERENCE_EXECUTOR_MAX_QUEUE: int = CONFIG_YAML["inference_executor"]["max_queue"]  # Tareas pendientes máximas
+
+    # Caché de resultados de predicción desde config.yaml
+    RESULT_CACHE_ENABLED: bool = CONFIG_YAML["result_cache"]["enabled"]  # Activa la caché
+    RESULT_CACHE_BACKEND: str = CONFIG_YAML["result_cache"]["backend"]  # "memory" o "sqlite"
+    RESULT_CACHE_SQLITE_PATH: Optional[str] = CONFIG_YAML["result_cache"].get("sqlite_path")  # Archivo compartido
+    RESULT_CACHE_MAX_ENTRIES: int = CONFIG_YAML["result_cache"]["max_entries"]  # Tamaño máximo
+    RESULT_CACHE_TTL_SECONDS: float = CONFIG_YAML["result_cache"]["ttl_seconds"]  # Expiración
+
+    # Deduplicación de predicciones repetidas desde config.yaml
+    DEDUP_PERSISTED_LOOKUP: bool = CONFIG_YAML["deduplication"]["persisted_lookup"]  # Consulta la BD antes de inferir
+    DEDUP_SINGLE_FLIGHT: bool = CONFIG_YAML["deduplication"]["single_flight"]  # Comparte inferencias en curso
+
+    # Escritura de predicciones desde config.yaml
+    PERSISTENCE_UPSERT: bool = CONFIG_YAML["persistence"]["upsert"]  # Upsert con RETURNING en lugar del ORM
+
+    # Micro-batching de peticiones individuales desde config.yaml
+    MICRO_BATCHING_ENABLED: bool = CONFIG_YAML["micro_batching"]["enabled"]  # Activa la agrupación
+    MICRO_BATCHING_WINDOW_MS: float = CONFIG_YAML["micro_batching"]["window_ms"]  # Ventana de espera en ms
+    MICRO_BATCHING_MAX_BATCH_SIZE: int = CONFIG_YAML["micro_batching"]["max_batch_size"]  # Filas por lote
 
     # Endpoints de la aplicación desde config.yaml
     PREDICTIONS: Dict[str, str] = CONFIG_YAML["endpoints"]["predictions"]  # Endpoints de predicciones
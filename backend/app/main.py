@@ -1,13 +1,57 @@
+import asyncio
 from fastapi import FastAPI
 from app.api import routes
 from fastapi.middleware.cors import CORSMiddleware
-from app.core import init_db 
+from app.core import init_db, settings
+from app.utils import MODEL_REGISTRY, logger
+from app.api.services.prediction_service import INFERENCE_EXECUTOR, SHADOW_EVALUATOR
+from app.utils.warmup import READINESS, warm_up_and_mark_ready
+from app.utils.model_reload import ArtifactWatcher
 from contextlib import asynccontextmanager  # ✅ Import necesario para lifespan
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     print("La aplicación se ha iniciado.")  # ✅ Reemplazo de @app.on_event("startup")
+    # ✅ Carga todas las familias de modelos una sola vez; las peticiones reutilizan estas instancias
+    report = MODEL_REGISTRY.load_all()
+    logger.info(f"Registro de modelos inicializado: {report}")
+    # ✅ Calienta cada familia en segundo plano: /health/live responde de inmediato y
+    # /health/ready devuelve 503 hasta que termine el calentamiento
+    warmup_task = None
+    if settings.WARMUP_ENABLED:
+        warmup_task = asyncio.create_task(asyncio.to_thread(
+            warm_up_and_mark_ready,
+            settings.WARMUP_DATASET_PATH,
+            settings.WARMUP_SAMPLE_ROWS,
+            settings.WARMUP_BATCH_SIZES,
+            settings.WARMUP_REPEATS,
+        ))
+    else:
+        READINESS.mark_ready()
+    # ✅ Recarga automática de las familias cuyos artefactos cambian en disco
+    watcher = None
+    if settings.HOT_RELOAD_WATCH:
+        watcher = ArtifactWatcher(
+            settings.HOT_RELOAD_POLL_SECONDS,
+            warm=settings.HOT_RELOAD_WARM,
+            dataset_path=settings.WARMUP_DATASET_PATH,
+            sample_rows=settings.WARMUP_SAMPLE_ROWS,
+            batch_sizes=settings.WARMUP_BATCH_SIZES,
+            repeats=settings.WARMUP_REPEATS,
+        ).start()
+    # ✅ Evaluación en sombra de la versión candidata (la carga y la evaluación corren en otro hilo)
+    if SHADOW_EVALUATOR is not None:
+        SHADOW_EVALUATOR.start()
     yield  # Permite que la API corra normalmente
+    READINESS.mark_not_ready()
+    if watcher is not None:
+        await asyncio.to_thread(watcher.stop)
+    if SHADOW_EVALUATOR is not None:
+        await asyncio.to_thread(SHADOW_EVALUATOR.stop)
+    if warmup_task is not None and not warmup_task.done():
+        await warmup_task  # No se liberan los modelos mientras el calentamiento los usa
+    INFERENCE_EXECUTOR.shutdown()
+    MODEL_REGISTRY.clear()
     print("La aplicación se está apagando.")  # ✅ Reemplazo de @app.on_event("shutdown")
 
 
@@ -34,6 +78,8 @@ app.add_middleware(
 app.include_router(routes.USER_ROUTER, prefix="/api", tags=["users"])
 app.include_router(routes.PREDICT_ROUTER, prefix="/api", tags=["predictions"])
 app.include_router(routes.AUTH_ROUTER, prefix="/api", tags=["auth"])
+app.include_router(routes.MODELS_ROUTER, prefix="/api", tags=["models"])
+app.include_router(routes.HEALTH_ROUTER, prefix="/api", tags=["health"])
 
 
 init_db()
@@ -18,32 +18,35 @@ CREATE TABLE predictions (
     mileage INTEGER NOT NULL,
     doors INTEGER NOT NULL,
     owner_count INTEGER NOT NULL,
+    fingerprint VARCHAR(64),
     created_at TIMESTAMPTZ DEFAULT NOW(),
     FOREIGN KEY (user_id) REFERENCES users(id) ON DELETE CASCADE
 );
 
+CREATE UNIQUE INDEX ix_predictions_user_fingerprint ON predictions (user_id, fingerprint);
+
 CREATE TABLE prices_cluster (
     id UUID PRIMARY KEY DEFAULT gen_random_uuid(),
     prediction_id UUID NOT NULL UNIQUE,
-    kmeans_cluster INTEGER NOT NULL,
-    dbscan_cluster INTEGER NOT NULL,
+    kmeans_cluster INTEGER,
+    dbscan_cluster INTEGER,
     FOREIGN KEY (prediction_id) REFERENCES predictions(id) ON DELETE CASCADE
 );
 
 CREATE TABLE prices_segmentation (
     id UUID PRIMARY KEY DEFAULT gen_random_uuid(),
     prediction_id UUID NOT NULL UNIQUE,
-    rf_prediction VARCHAR(100) NOT NULL,
-    svm_prediction VARCHAR(100) NOT NULL,
-    mlp_prediction VARCHAR(100) NOT NULL,
+    rf_prediction VARCHAR(100),
+    svm_prediction VARCHAR(100),
+    mlp_prediction VARCHAR(100),
     FOREIGN KEY (prediction_id) REFERENCES predictions(id) ON DELETE CASCADE
 );
 
 CREATE TABLE prices_prediction (
     id UUID PRIMARY KEY DEFAULT gen_random_uuid(),
     prediction_id UUID NOT NULL UNIQUE,
-    rf_prediction FLOAT NOT NULL,
-    xgb_prediction FLOAT NOT NULL,
-    dnn_prediction FLOAT NOT NULL,
+    rf_prediction FLOAT,
+    xgb_prediction FLOAT,
+    dnn_prediction FLOAT,
     FOREIGN KEY (prediction_id) REFERENCES predictions(id) ON DELETE CASCADE
 );
@@ -0,0 +1,22 @@
+-- Permite guardar resultados parciales cuando la petición selecciona solo algunos
+-- estimadores del modelo (parámetro `members`): las columnas de los no seleccionados quedan en NULL.
+-- Aplicar sobre una base creada con una versión anterior de init.sql:
+--   psql -U postgres -d FastAPI_DB -f backend/app/models/migrations/001_nullable_member_results.sql
+
+BEGIN;
+
+ALTER TABLE prices_cluster
+    ALTER COLUMN kmeans_cluster DROP NOT NULL,
+    ALTER COLUMN dbscan_cluster DROP NOT NULL;
+
+ALTER TABLE prices_segmentation
+    ALTER COLUMN rf_prediction DROP NOT NULL,
+    ALTER COLUMN svm_prediction DROP NOT NULL,
+    ALTER COLUMN mlp_prediction DROP NOT NULL;
+
+ALTER TABLE prices_prediction
+    ALTER COLUMN rf_prediction DROP NOT NULL,
+    ALTER COLUMN xgb_prediction DROP NOT NULL,
+    ALTER COLUMN dnn_prediction DROP NOT NULL;
+
+COMMIT;
@@ -0,0 +1,117 @@
+"""
+Agrega `predictions.fingerprint` (hash de los datos de entrada, ver `input_fingerprint`) con el
+índice único `(user_id, fingerprint)` y lo calcula para las filas existentes por lotes.
+
+La búsqueda de predicciones duplicadas pasa a usar ese índice en lugar de comparar las nueve
+columnas del auto. El hash se calcula en Python (el mismo código que usa el backend) porque la
+representación textual de los FLOAT en PostgreSQL no coincide con la de Python.
+
+Pasos (cada uno se puede repetir sin efecto si ya se aplicó):
+1. `ALTER TABLE ... ADD COLUMN IF NOT EXISTS fingerprint` (instantáneo: columna NULL).
+2. `CREATE UNIQUE INDEX CONCURRENTLY`, sin bloquear las escrituras.
+3. Relleno por lotes de `--batch-size` filas ordenadas por `id` (un commit por lote). Si un
+   usuario tiene predicciones repetidas de antes de la migración, solo una recibe el hash; las
+   demás quedan en NULL (el índice único admite varios NULL) y se reportan al final.
+
+Aplicar antes de desplegar la versión del backend que escribe la columna:
+    cd backend && python app/models/migrations/002_prediction_fingerprint.py [--batch-size N] [--database-url URL]
+"""
+
+import argparse
+import pathlib
+import sys
+
+sys.path.insert(0, str(pathlib.Path(__file__).resolve().parents[3]))
+from sqlalchemy import create_engine, text
+from sqlalchemy.exc import IntegrityError
+
+from app.utils.features import input_fingerprint
+
+INDEX_NAME = "ix_predictions_user_fingerprint"
+
+# Paginación por `id` (keyset): cada lote es una lectura del índice de la llave primaria
+SELECT_BATCH = """
+    SELECT id::text AS id, user_id::text AS user_id, brand, model, year, engine_size, fuel_type,
+           transmission, mileage, doors, owner_count
+    FROM predictions
+    WHERE fingerprint IS NULL {after}
+    ORDER BY predictions.id
+    LIMIT :batch_size
+"""
+FIRST_BATCH = text(SELECT_BATCH.format(after=""))
+NEXT_BATCH = text(SELECT_BATCH.format(after="AND predictions.id > CAST(:last_id AS UUID)"))
+
+# Con el índice ya creado, la subconsulta es una búsqueda puntual; los duplicados se omiten
+UPDATE_ROW = text("""
+    UPDATE predictions SET fingerprint = :fingerprint
+    WHERE id = CAST(:id AS UUID) AND NOT EXISTS (
+        SELECT 1 FROM predictions WHERE user_id = CAST(:user_id AS UUID) AND fingerprint = :fingerprint
+    )
+""")
+
+
+def add_column_and_index(engine) -> None:
+    """Pasos 1 y 2: columna NULL e índice único, creado sin bloquear las escrituras."""
+    with engine.begin() as connection:
+        connection.execute(text("ALTER TABLE predictions ADD COLUMN IF NOT EXISTS fingerprint VARCHAR(64)"))
+    # CREATE INDEX CONCURRENTLY no puede ejecutarse dentro de una transacción
+    with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as connection:
+        connection.execute(text(f"CREATE UNIQUE INDEX CONCURRENTLY IF NOT EXISTS {INDEX_NAME} "
+                                "ON predictions (user_id, fingerprint)"))
+
+
+def _fingerprint_params(row) -> dict:
+    return {
+        "id": row.id,
+        "user_id": row.user_id,
+        "fingerprint": input_fingerprint({
+            "Brand": row.brand, "Model": row.model, "Year": row.year, "Engine_Size": row.engine_size,
+            "Fuel_Type": row.fuel_type, "Transmission": row.transmission, "Mileage": row.mileage,
+            "Doors": row.doors, "Owner_Count": row.owner_count,
+        }),
+    }
+
+
+def backfill(engine, batch_size: int) -> int:
+    """Paso 3: calcula el hash de las filas sin él, un lote por transacción. Retorna las filas leídas."""
+    last_id, processed = None, 0
+    while True:
+        with engine.connect() as connection:
+            if last_id is None:
+                rows = connection.execute(FIRST_BATCH, {"batch_size": batch_size}).fetchall()
+            else:
+                rows = connection.execute(NEXT_BATCH, {"last_id": last_id, "batch_size": batch_size}).fetchall()
+        if not rows:
+            return processed
+        params = [_fingerprint_params(row) for row in rows]
+        try:
+            with engine.begin() as connection:
+                connection.execute(UPDATE_ROW, params)
+        except IntegrityError:
+            # El backend guardó la misma predicción durante el lote: al repetirlo, NOT EXISTS la ve
+            with engine.begin() as connection:
+                connection.execute(UPDATE_ROW, params)
+        last_id = rows[-1].id
+        processed += len(rows)
+        print(f"  {processed} filas procesadas")
+
+
+def main(database_url: str, batch_size: int) -> None:
+    engine = create_engine(database_url)
+    add_column_and_index(engine)
+    print(f"Columna `fingerprint` e índice `{INDEX_NAME}` listos; rellenando en lotes de {batch_size}...")
+    backfill(engine, batch_size)
+    with engine.connect() as connection:
+        duplicates = connection.execute(text("SELECT COUNT(*) FROM predictions WHERE fingerprint IS NULL")).scalar()
+    print(f"Listo. Predicciones repetidas sin hash (anteriores a la migración): {duplicates}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--batch-size", type=int, default=5000, help="Filas por transacción")
+    parser.add_argument("--database-url", default=None, help="URL de la base (por defecto, la de config.yaml)")
+    args = parser.parse_args()
+    if args.database_url is None:
+        from app.core.config import settings
+        args.database_url = settings.DATABASE_URL
+    main(args.database_url, args.batch_size)
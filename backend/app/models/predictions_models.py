@@ -1,5 +1,5 @@
 from __future__ import annotations
-from sqlalchemy import Column, String, Integer, Float, ForeignKey, TIMESTAMP
+from sqlalchemy import Column, String, Integer, Float, ForeignKey, Index, TIMESTAMP
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
@@ -23,6 +23,7 @@ class Prediction(Base):
         mileage (int): Kilometraje del vehículo.
         doors (int): Número de puertas del vehículo.
         owner_count (int): Número de dueños previos del vehículo.
+        fingerprint (str): Hash de los datos de entrada (`input_fingerprint`), único por usuario.
         created_at (TIMESTAMP): Fecha de creación de la predicción.
         
         user (relationship): Relación con el usuario propietario de la predicción.
@@ -33,6 +34,12 @@ class Prediction(Base):
 
     __tablename__ = "predictions"
 
+    # La búsqueda de duplicados usa este índice en lugar de comparar las nueve columnas del auto;
+    # además impide que dos peticiones concurrentes guarden la misma predicción dos veces
+    __table_args__ = (
+        Index("ix_predictions_user_fingerprint", "user_id", "fingerprint", unique=True),
+    )
+
     # Identificador único de la predicción
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4, unique=True, nullable=False)
     
@@ -50,6 +57,9 @@ class Prediction(Base):
     doors = Column(Integer, nullable=False)  # Número de puertas
     owner_count = Column(Integer, nullable=False)  # Número de dueños previos
 
+    # Hash de los datos de entrada; NULL solo en duplicados anteriores a la migración 002
+    fingerprint = Column(String(64), nullable=True)
+
     # Fecha de creación de la predicción
     created_at = Column(TIMESTAMP(timezone=True), server_default=func.now())
 
@@ -16,6 +16,8 @@ class PricesCluster(Base):
         kmeans_cluster (int): Identificador del clúster asignado por KMeans.
         dbscan_cluster (int): Identificador del clúster asignado por DBSCAN.
         prediction (relationship): Relación con la tabla `Prediction`.
+
+    Las columnas de los modelos quedan en NULL si la petición no los seleccionó (`members`).
     """
 
     __tablename__ = "prices_cluster"
@@ -23,8 +25,8 @@ class PricesCluster(Base):
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4, unique=True, nullable=False)
     prediction_id = Column(UUID(as_uuid=True), ForeignKey("predictions.id", ondelete="CASCADE"), nullable=False, unique=True)
 
-    kmeans_cluster = Column(Integer, nullable=False)  # Clúster asignado por KMeans
-    dbscan_cluster = Column(Integer, nullable=False)  # Clúster asignado por DBSCAN
+    kmeans_cluster = Column(Integer, nullable=True)  # Clúster asignado por KMeans
+    dbscan_cluster = Column(Integer, nullable=True)  # Clúster asignado por DBSCAN
 
     # Relación con la tabla `Prediction`
     prediction = relationship("Prediction", back_populates="model1_result")
@@ -42,6 +44,8 @@ class PricesSegmentation(Base):
         svm_prediction (str): Segmento asignado por SVM.
         mlp_prediction (str): Segmento asignado por MLP.
         prediction (relationship): Relación con la tabla `Prediction`.
+
+    Las columnas de los modelos quedan en NULL si la petición no los seleccionó (`members`).
     """
 
     __tablename__ = "prices_segmentation"
@@ -49,9 +53,9 @@ class PricesSegmentation(Base):
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4, unique=True, nullable=False)
     prediction_id = Column(UUID(as_uuid=True), ForeignKey("predictions.id", ondelete="CASCADE"), nullable=False, unique=True)
 
-    rf_prediction = Column(String(50), nullable=False)  # Segmento asignado por Random Forest
-    svm_prediction = Column(String(50), nullable=False)  # Segmento asignado por SVM
-    mlp_prediction = Column(String(50), nullable=False)  # Segmento asignado por MLP
+    rf_prediction = Column(String(50), nullable=True)  # Segmento asignado por Random Forest
+    svm_prediction = Column(String(50), nullable=True)  # Segmento asignado por SVM
+    mlp_prediction = Column(String(50), nullable=True)  # Segmento asignado por MLP
 
     # Relación con la tabla `Prediction`
     prediction = relationship("Prediction", back_populates="model2_result")
@@ -70,6 +74,8 @@ class PricesPrediction(Base):
         xgb_prediction (float): Precio estimado por XGBoost.
         dnn_prediction (float): Precio estimado por Deep Neural Network.
         prediction (relationship): Relación con la tabla `Prediction`.
+
+    Las columnas de los modelos quedan en NULL si la petición no los seleccionó (`members`).
     """
 
     __tablename__ = "prices_prediction"
@@ -77,9 +83,9 @@ class PricesPrediction(Base):
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4, unique=True, nullable=False)
     prediction_id = Column(UUID(as_uuid=True), ForeignKey("predictions.id", ondelete="CASCADE"), nullable=False, unique=True)
 
-    rf_prediction = Column(Float, nullable=False)  # Precio estimado por Random Forest
-    xgb_prediction = Column(Float, nullable=False)  # Precio estimado por XGBoost
-    dnn_prediction = Column(Float, nullable=False)  # Precio estimado por Deep Neural Network
+    rf_prediction = Column(Float, nullable=True)  # Precio estimado por Random Forest
+    xgb_prediction = Column(Float, nullable=True)  # Precio estimado por XGBoost
+    dnn_prediction = Column(Float, nullable=True)  # Precio estimado por Deep Neural Network
 
     # Relación con la tabla `Prediction`
     prediction = relationship("Prediction", back_populates="model3_result")
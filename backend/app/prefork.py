@@ -0,0 +1,188 @@
+"""
+Lanzador pre-fork: carga los modelos una sola vez y los comparte entre los workers.
+
+Con `uvicorn --workers N` cada worker importa la aplicación y carga su propia copia de los
+modelos (RF, XGBoost, SVM, MLP, DNN, KMeans, DBSCAN), multiplicando la memoria por N.
+Este lanzador:
+
+1. Carga el registro de modelos en el proceso padre.
+2. Ejecuta `gc.collect()` + `gc.freeze()` para que el recolector de basura no recorra (ni
+   escriba en los encabezados de) los objetos de los modelos, lo que copiaría sus páginas
+   en cada worker (copy-on-write).
+3. Abre el socket de escucha y hace `fork` de N workers que sirven la aplicación con
+   uvicorn sobre ese socket compartido, usando las páginas de los modelos del padre.
+
+El padre reinicia los workers que terminan inesperadamente, reenvía SIGINT/SIGTERM y
+registra la memoria única/compartida de cada worker al arrancar y con SIGUSR1.
+
+Uso (desde la carpeta backend/, solo Linux):
+    python -m app.prefork --workers 4 --host 0.0.0.0 --port 8888
+"""
+
+import argparse
+import gc
+import os
+import signal
+import socket
+import sys
+import time
+from typing import Callable, Dict
+
+from app.core.database import engine
+from app.utils.logger import logger
+from app.utils.model_registry import MODEL_REGISTRY
+from app.utils.process_memory import memory_report
+
+
+def load_and_freeze() -> Dict:
+    """
+    Carga todas las familias de modelos en el proceso actual y congela el heap para que los
+    procesos hijos compartan sus páginas.
+
+    Retorna:
+        dict: Reporte del registro de modelos (ver `ModelRegistry.report`).
+    """
+    report = MODEL_REGISTRY.load_all()
+    gc.collect()
+    gc.freeze()  # Los objetos existentes pasan a la generación permanente: el GC no los toca
+    logger.info(f"Modelos cargados y congelados en el proceso padre ({gc.get_freeze_count()} objetos).")
+    return report
+
+
+def fork_worker(target: Callable[[], None]) -> int:
+    """
+    Crea un worker con `fork` que ejecuta `target()` y termina.
+    El hijo descarta el pool de conexiones heredado del padre (`init_db()` al importar la
+    aplicación deja una conexión abierta): compartir ese socket entre procesos corrompe el
+    protocolo de PostgreSQL. `close=False` no cierra la conexión, que sigue siendo del padre.
+
+    Retorna:
+        int: PID del worker (en el padre).
+    """
+    pid = os.fork()
+    if pid == 0:
+        exit_code = 0
+        try:
+            engine.dispose(close=False)
+            signal.signal(signal.SIGINT, signal.SIG_DFL)
+            signal.signal(signal.SIGTERM, signal.SIG_DFL)
+            target()
+        except BaseException:
+            logger.exception(f"Worker {os.getpid()} terminó con error")
+            exit_code = 1
+        finally:
+            os._exit(exit_code)
+    return pid
+
+
+def bind_socket(host: str, port: int, backlog: int = 2048) -> socket.socket:
+    """Abre el socket de escucha que heredan todos los workers."""
+    family = socket.AF_INET6 if ":" in host else socket.AF_INET
+    sock = socket.socket(family, socket.SOCK_STREAM)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    sock.bind((host, port))
+    sock.listen(backlog)
+    sock.set_inheritable(True)
+    return sock
+
+
+def serve_worker(sock: socket.socket, log_level: str) -> None:
+    """Sirve la aplicación FastAPI con uvicorn sobre el socket heredado del padre."""
+    import uvicorn  # Importación diferida: solo los workers la necesitan
+    from app.main import app
+
+    config = uvicorn.Config(app, log_level=log_level, lifespan="on")
+    uvicorn.Server(config).run(sockets=[sock])
+
+
+class PreforkSupervisor:
+    """
+    Proceso padre: mantiene N workers vivos y reporta su memoria.
+
+    Parámetros:
+        workers (int): Número de workers.
+        target (callable): Función que ejecuta cada worker.
+    """
+
+    def __init__(self, workers: int, target: Callable[[], None]):
+        self.workers = max(int(workers), 1)
+        self.target = target
+        self.pids = set()
+        self._stopping = False
+
+    def log_memory(self, *_) -> Dict:
+        """Registra la memoria única y compartida del padre y de cada worker."""
+        report = memory_report([os.getpid(), *sorted(self.pids)])
+        for process in report["processes"]:
+            role = "padre" if process["pid"] == os.getpid() else "worker"
+            logger.info(
+                f"[{role} {process['pid']}] único {process['unique_mb']} MB, compartido "
+                f"{process['shared_mb']} MB, RSS {process['rss_mb']} MB, PSS {process['pss_mb']} MB"
+            )
+        logger.info(
+            f"Total: RSS {report['total_rss_mb']} MB (con páginas compartidas repetidas), "
+            f"PSS {report['total_pss_mb']} MB, único {report['total_unique_mb']} MB"
+        )
+        return report
+
+    def _stop(self, signum, _frame) -> None:
+        self._stopping = True
+        for pid in list(self.pids):
+            try:
+                os.kill(pid, signum)
+            except ProcessLookupError:
+                pass
+
+    def run(self, report_after: float = 5.0) -> int:
+        """Arranca los workers y los supervisa hasta recibir SIGINT/SIGTERM."""
+        signal.signal(signal.SIGINT, self._stop)
+        signal.signal(signal.SIGTERM, self._stop)
+        signal.signal(signal.SIGUSR1, self.log_memory)
+
+        for _ in range(self.workers):
+            self.pids.add(fork_worker(self.target))
+        logger.info(f"{self.workers} workers iniciados: {sorted(self.pids)}")
+
+        reported = False
+        started_at = time.monotonic()
+        while self.pids:
+            try:
+                pid, status = os.waitpid(-1, os.WNOHANG)
+            except ChildProcessError:
+                break
+            if pid == 0:
+                if not reported and time.monotonic() - started_at >= report_after:
+                    self.log_memory()
+                    reported = True
+                time.sleep(0.2)
+                continue
+            self.pids.discard(pid)
+            if not self._stopping:
+                logger.warning(f"Worker {pid} terminó (estado {status}); se inicia uno nuevo.")
+                self.pids.add(fork_worker(self.target))
+        return 0
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Servidor pre-fork con modelos compartidos entre workers.")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8888)
+    parser.add_argument("--log-level", default="info")
+    args = parser.parse_args(argv)
+
+    if not hasattr(os, "fork"):
+        print("El modo pre-fork requiere un sistema con fork (Linux).", file=sys.stderr)
+        return 1
+
+    # Importar la aplicación en el padre registra los cargadores y hace la inicialización
+    # común una sola vez; luego los modelos se cargan y se congelan antes del fork.
+    import app.main  # noqa: F401
+    load_and_freeze()
+    sock = bind_socket(args.host, args.port)
+    logger.info(f"Escuchando en {args.host}:{args.port}")
+    return PreforkSupervisor(args.workers, lambda: serve_worker(sock, args.log_level)).run()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
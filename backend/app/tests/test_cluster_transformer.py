@@ -0,0 +1,78 @@
+import numpy as np
+import pandas as pd
+import pytest
+from sklearn.cluster import KMeans
+from sklearn.decomposition import PCA
+from sklearn.preprocessing import LabelEncoder, OneHotEncoder, StandardScaler
+
+import sys
+import os
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..")))
+from app.utils.cluster_transformer import CompiledClusterTransformer
+
+CATEGORICAL = ["Brand", "Fuel_Type", "Transmission"]
+
+
+def _cars(rng, n):
+    return pd.DataFrame({
+        "Brand": rng.choice(["Audi", "BMW", "Kia", "Toyota"], n),
+        "Model": rng.choice(["A4", "X5", "Rio", "Corolla", "Q7"], n),
+        "Year": rng.integers(2000, 2024, n),
+        "Engine_Size": rng.uniform(1.0, 5.0, n).round(1),
+        "Fuel_Type": rng.choice(["Diesel", "Electric", "Petrol"], n),
+        "Transmission": rng.choice(["Automatic", "Manual"], n),
+        "Mileage": rng.integers(0, 300000, n),
+        "Doors": rng.choice([2, 3, 4, 5], n),
+        "Owner_Count": rng.integers(1, 6, n),
+    })
+
+
+def _reference(models, df):
+    """Secuencia original: LabelEncoder → OneHotEncoder → concat → escalador → PCA."""
+    df = df.copy()
+    df["Model"] = models["label_encoder"].transform(df["Model"])
+    encoded = pd.DataFrame(models["encoder"].transform(df[CATEGORICAL]),
+                           columns=models["encoder"].get_feature_names_out(CATEGORICAL))
+    df = pd.concat([df.drop(columns=CATEGORICAL).reset_index(drop=True), encoded], axis=1)
+    return models["pca"].transform(models["scaler"].transform(df))
+
+
+@pytest.fixture(scope="module", params=[False, True], ids=["pca", "whiten"])
+def fitted(request):
+    rng = np.random.default_rng(5)
+    df = _cars(rng, 500)
+    encoder = OneHotEncoder(drop="first", sparse_output=False).fit(df[CATEGORICAL])
+    label_encoder = LabelEncoder().fit(df["Model"])
+    train = df.copy()
+    train["Model"] = label_encoder.transform(train["Model"])
+    encoded = pd.DataFrame(encoder.transform(train[CATEGORICAL]), columns=encoder.get_feature_names_out(CATEGORICAL))
+    X = pd.concat([train.drop(columns=CATEGORICAL), encoded], axis=1)
+    scaler = StandardScaler().fit(X)
+    pca = PCA(n_components=5, whiten=request.param, random_state=42).fit(scaler.transform(X))
+    kmeans = KMeans(n_clusters=4, random_state=42, n_init=10).fit(pca.transform(scaler.transform(X)))
+    models = {"scaler": scaler, "pca": pca, "encoder": encoder, "label_encoder": label_encoder, "kmeans": kmeans}
+    return models, _cars(np.random.default_rng(11), 64)
+
+
+def test_projection_and_kmeans_parity(fitted):
+    models, new_cars = fitted
+    transformer = CompiledClusterTransformer(models["scaler"], models["pca"], models["encoder"],
+                                             models["label_encoder"], models["kmeans"])
+    rows = new_cars.to_dict(orient="records")
+
+    expected = _reference(models, new_cars)
+    Z = transformer.transform(rows)
+
+    np.testing.assert_allclose(Z, expected, rtol=1e-9, atol=1e-9)
+    np.testing.assert_array_equal(transformer.kmeans_predict(Z), models["kmeans"].predict(expected))
+    np.testing.assert_allclose(transformer.transform(rows[:1]), expected[:1], rtol=1e-9, atol=1e-9)
+
+
+def test_unknown_categories(fitted):
+    models, new_cars = fitted
+    transformer = CompiledClusterTransformer(models["scaler"], models["pca"], models["encoder"], models["label_encoder"])
+    row = dict(new_cars.iloc[0], Brand="Tesla", Model="Model S")
+
+    assert transformer.unknown(row) == {"Brand": "Tesla", "Model": "Model S"}
+    assert transformer.unknown(new_cars.iloc[0].to_dict()) == {}
@@ -0,0 +1,41 @@
+import numpy as np
+import pytest
+from sklearn.cluster import DBSCAN
+
+import sys
+import os
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..")))
+from app.utils.dbscan_index import DBSCANIndex
+
+
+@pytest.fixture(scope="module")
+def fitted():
+    rng = np.random.default_rng(3)
+    centers = np.array([[0, 0, 0, 0, 0], [4, 4, 0, 0, 0], [0, 0, 4, 4, 4]], dtype=float)
+    X = np.vstack([c + rng.normal(scale=0.3, size=(150, 5)) for c in centers])
+    X = np.vstack([X, rng.uniform(-8, 8, size=(20, 5))])
+    return X, DBSCAN(eps=0.8, min_samples=10).fit(X)
+
+
+def test_training_points_keep_their_cluster(fitted):
+    """Las muestras núcleo y los puntos asignados conservan la etiqueta del ajuste."""
+    X, dbscan = fitted
+    index = DBSCANIndex.from_dbscan(dbscan)
+
+    np.testing.assert_array_equal(index.predict(dbscan.components_), dbscan.labels_[dbscan.core_sample_indices_])
+    clustered = dbscan.labels_ != -1
+    np.testing.assert_array_equal(index.predict(X[clustered]), dbscan.labels_[clustered])
+
+
+def test_new_points_join_nearby_cluster_or_are_noise(fitted):
+    _, dbscan = fitted
+    index = DBSCANIndex.from_dbscan(dbscan)
+    near = dbscan.components_[:1] + 0.01
+    far = np.full((1, 5), 50.0)
+
+    labels = index.predict(np.vstack([near, far]))
+
+    assert labels[0] == dbscan.labels_[dbscan.core_sample_indices_[0]]
+    assert labels[1] == -1
+    assert index.predict(np.empty((0, 5))).shape == (0,)
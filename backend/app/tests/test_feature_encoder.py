@@ -0,0 +1,58 @@
+import numpy as np
+import pandas as pd
+import pytest
+from sklearn.preprocessing import LabelEncoder, StandardScaler
+
+import sys
+import os
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..")))
+from app.utils.feature_encoder import CompiledFeatureEncoder
+from app.utils.features import CATEGORICAL_COLUMNS, FEATURE_COLUMNS
+
+
+@pytest.fixture(scope="module")
+def fitted():
+    rng = np.random.default_rng(0)
+    n = 300
+    df = pd.DataFrame({
+        "Brand": rng.choice(["Toyota", "Ford", "Kia", "BMW"], n),
+        "Model": rng.choice(["RAV4", "Focus", "Rio", "X5", "Civic"], n),
+        "Year": rng.integers(2000, 2024, n),
+        "Engine_Size": rng.uniform(1.0, 5.0, n).round(1),
+        "Fuel_Type": rng.choice(["Petrol", "Diesel", "Hybrid", "Electric"], n),
+        "Transmission": rng.choice(["Manual", "Automatic", "Semi-Automatic"], n),
+        "Mileage": rng.integers(0, 300000, n),
+        "Doors": rng.integers(2, 6, n),
+        "Owner_Count": rng.integers(1, 6, n),
+    })
+    rows = df.to_dict("records")
+    label_encoders = {col: LabelEncoder().fit(df[col]) for col in CATEGORICAL_COLUMNS}
+    encoded = df.copy()
+    for col, le in label_encoders.items():
+        encoded[col] = le.transform(encoded[col])
+    scaler = StandardScaler().fit(encoded[FEATURE_COLUMNS])
+    return rows, label_encoders, scaler
+
+
+def _reference(rows, label_encoders, scaler):
+    """Camino original: DataFrame + LabelEncoder.transform + scaler.transform."""
+    df = pd.DataFrame(rows, columns=FEATURE_COLUMNS)
+    for col, le in label_encoders.items():
+        df[col] = le.transform(df[col])
+    return scaler.transform(df)
+
+
+def test_transform_matches_sklearn_pipeline(fitted):
+    rows, label_encoders, scaler = fitted
+    encoder = CompiledFeatureEncoder(label_encoders, scaler)
+
+    np.testing.assert_allclose(encoder.transform(rows), _reference(rows, label_encoders, scaler), rtol=1e-12, atol=1e-12)
+
+
+def test_unknown_categories_are_reported(fitted):
+    rows, label_encoders, scaler = fitted
+    encoder = CompiledFeatureEncoder(label_encoders, scaler)
+
+    assert encoder.unknown(rows[0]) == {}
+    assert encoder.unknown(dict(rows[0], Brand="Tesla", Fuel_Type="Gasoline")) == {"Brand": "Tesla", "Fuel_Type": "Gasoline"}
@@ -0,0 +1,68 @@
+import asyncio
+import operator
+import threading
+import time
+
+import pytest
+
+import sys
+import os
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..")))
+from app.utils.inference_executor import ExecutorSaturatedError, InferenceExecutor
+
+
+def test_inference_does_not_block_the_event_loop():
+    """Mientras el modelo corre en el pool, el loop sigue atendiendo otras corrutinas."""
+    executor = InferenceExecutor("test", max_workers=1, max_queue=4)
+    release = threading.Event()
+
+    async def scenario():
+        slow = asyncio.ensure_future(executor.run(release.wait, 5))
+        await asyncio.sleep(0.01)
+        ticks = 0
+        for _ in range(5):
+            await asyncio.sleep(0)
+            ticks += 1
+        assert not slow.done()
+        release.set()
+        return ticks, await slow
+
+    ticks, result = asyncio.run(scenario())
+    executor.shutdown()
+
+    assert (ticks, result) == (5, True)
+    stats = executor.stats()
+    assert stats["completed"] == 1 and stats["pending"] == 0
+
+
+def test_queue_is_bounded():
+    executor = InferenceExecutor("test", max_workers=1, max_queue=2)
+
+    async def scenario():
+        tasks = [asyncio.ensure_future(executor.run(time.sleep, 0.05)) for _ in range(2)]
+        await asyncio.sleep(0)
+        with pytest.raises(ExecutorSaturatedError):
+            await executor.run(time.sleep, 0)
+        await asyncio.gather(*tasks)
+
+    asyncio.run(scenario())
+    executor.shutdown()
+
+    stats = executor.stats()
+    assert stats["rejected"] == 1
+    assert stats["max_pending"] == 2
+    assert stats["wait_ms"]["max"] >= 40  # La segunda tarea esperó a la primera
+
+
+def test_errors_propagate_and_process_pool():
+    async def scenario(executor):
+        with pytest.raises(ZeroDivisionError):
+            await executor.run(operator.truediv, 1, 0)
+        return await executor.run(operator.add, 2, 3)
+
+    for kind in ("thread", "process"):
+        executor = InferenceExecutor("test", kind=kind, max_workers=1)
+        assert asyncio.run(scenario(executor)) == 5
+        executor.shutdown()
+        assert executor.stats()["failed"] == 1
@@ -0,0 +1,42 @@
+import numpy as np
+import pytest
+from sklearn.kernel_approximation import Nystroem
+from sklearn.pipeline import make_pipeline
+from sklearn.svm import LinearSVC
+
+import sys
+import os
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..")))
+from app.utils.kernel_approx import NystroemLinearClassifier
+
+
+@pytest.fixture(scope="module")
+def data():
+    rng = np.random.default_rng(42)
+    X = rng.normal(size=(400, 9))
+    y = (X[:, 0] + X[:, 3] > 0).astype(int) + (X[:, 5] > 1).astype(int)  # 3 clases
+    return X, y
+
+
+def _pipeline(X, y):
+    return make_pipeline(Nystroem(gamma=0.1, n_components=50, random_state=0),
+                         LinearSVC(C=10, max_iter=10000, random_state=0)).fit(X, y)
+
+
+def test_nystroem_linear_parity(data):
+    """El motor NumPy reproduce `decision_function` y `predict` del pipeline de sklearn."""
+    X, y = data
+    pipeline = _pipeline(X, y)
+    model = NystroemLinearClassifier.from_sklearn(pipeline)
+
+    np.testing.assert_allclose(model.decision_function(X), pipeline.decision_function(X), rtol=1e-8, atol=1e-10)
+    np.testing.assert_array_equal(model.predict(X), pipeline.predict(X))
+
+
+def test_binary_parity_and_export_round_trip(data):
+    X, y = data
+    pipeline = _pipeline(X, (y > 0).astype(int))
+    model = NystroemLinearClassifier.from_export(NystroemLinearClassifier.from_sklearn(pipeline).to_export())
+
+    np.testing.assert_array_equal(model.predict(X), pipeline.predict(X))
@@ -0,0 +1,64 @@
+import threading
+
+import pytest
+
+import sys
+import os
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..")))
+from app.utils.micro_batcher import MicroBatcher
+
+
+def test_concurrent_rows_are_merged_into_one_call():
+    """Las filas que llegan dentro de la ventana se resuelven con una sola llamada."""
+    calls = []
+    release = threading.Event()
+
+    def batch_func(rows):
+        release.wait(timeout=5)
+        calls.append(list(rows))
+        return [row * 10 for row in rows]
+
+    batcher = MicroBatcher("test", batch_func, window_ms=50, max_batch_size=8)
+    first = batcher.submit(0)  # ocupa al consumidor mientras llegan las demás filas
+    futures = [batcher.submit(i) for i in range(1, 6)]
+    release.set()
+
+    assert first.result(timeout=5) == 0
+    assert [f.result(timeout=5) for f in futures] == [10, 20, 30, 40, 50]
+    assert sum(len(c) for c in calls) == 6
+    assert len(calls) <= 2
+
+    stats = batcher.stats()
+    assert stats["rows"] == 6
+    assert stats["batches"] == len(calls)
+    assert sum(stats["batch_size_histogram"].values()) == len(calls)
+
+
+def test_max_batch_size_is_respected():
+    """Ningún lote supera `max_batch_size` filas."""
+    sizes = []
+    gate = threading.Event()
+
+    def batch_func(rows):
+        gate.wait(timeout=5)
+        sizes.append(len(rows))
+        return rows
+
+    batcher = MicroBatcher("test", batch_func, window_ms=20, max_batch_size=3)
+    futures = [batcher.submit(i) for i in range(10)]
+    gate.set()
+
+    assert [f.result(timeout=5) for f in futures] == list(range(10))
+    assert max(sizes) <= 3
+
+
+def test_batch_errors_are_propagated_to_every_caller():
+    """Si la llamada por lotes falla, cada petición en espera recibe la excepción."""
+    def batch_func(rows):
+        raise RuntimeError("modelo no disponible")
+
+    batcher = MicroBatcher("test", batch_func, window_ms=1, max_batch_size=4)
+    with pytest.raises(RuntimeError):
+        batcher(1)
+    assert batcher.stats()["errors"] == 1
@@ -0,0 +1,78 @@
+import hashlib
+import io
+import json
+import sys
+import os
+import tarfile
+
+import pytest
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..")))
+from app.utils.features import FEATURE_COLUMNS
+from app.utils.model_bundle import BUNDLE_FORMAT, extract_bundle
+from app.utils.model_registry import ModelRegistry
+
+FILES = {"scaler.pkl": b"scaler", "xgboost_model.pkl": b"xgboost" * 100}
+
+
+def _write_bundle(path, files=FILES, tamper=None):
+    """Paquete mínimo con el mismo formato que genera ModelTrain/handlers/model_bundle.py."""
+    manifest = {
+        "format": BUNDLE_FORMAT, "family": "prediction", "version": "abc123", "features": FEATURE_COLUMNS,
+        "libraries": {}, "files": {name: {"sha256": hashlib.sha256(data).hexdigest(), "size": len(data)}
+                                   for name, data in files.items()},
+    }
+    with tarfile.open(path, "w") as tar:
+        for name, data in [("manifest.json", json.dumps(manifest).encode("utf-8")), *files.items()]:
+            data = tamper if tamper is not None and name == "scaler.pkl" else data
+            info = tarfile.TarInfo(name)
+            info.size = len(data)
+            tar.addfile(info, io.BytesIO(data))
+    return path
+
+
+def test_extract_bundle_verifies_and_reuses_version_directory(tmp_path):
+    """La primera carga extrae y verifica los artefactos; las siguientes reutilizan el directorio."""
+    bundle = _write_bundle(tmp_path / "prediction.tar")
+    manifest, directory = extract_bundle(bundle, family="prediction")
+
+    assert manifest["version"] == "abc123" and directory.name == "prediction-abc123"
+    assert (directory / "xgboost_model.pkl").read_bytes() == FILES["xgboost_model.pkl"]
+
+    (directory / "scaler.pkl").write_bytes(b"marker")
+    assert extract_bundle(bundle, family="prediction")[1] == directory
+    assert (directory / "scaler.pkl").read_bytes() == b"marker"
+
+
+def test_extract_bundle_rejects_bad_checksum(tmp_path):
+    """Un artefacto alterado invalida el paquete y no deja un directorio a medio extraer."""
+    bundle = _write_bundle(tmp_path / "prediction.tar", tamper=b"altered")
+    with pytest.raises(ValueError):
+        extract_bundle(bundle, family="prediction")
+    assert not list((tmp_path / ".extracted").iterdir())
+
+    with pytest.raises(ValueError):
+        extract_bundle(_write_bundle(tmp_path / "other.tar"), family="segmentation")
+
+
+def test_registry_prefers_bundle_over_directory(tmp_path):
+    """Con `source="auto"` la familia se carga del paquete y toma su versión del manifiesto."""
+    class _BundleRegistry(ModelRegistry):
+        _loaders = {}
+        _members = {}
+
+    @_BundleRegistry.loader("prediction", "models_cars/model_cars_prediction_prices")
+    def _loader(artifacts_dir):
+        return {"files": sorted(p.name for p in artifacts_dir.iterdir())}
+
+    _write_bundle(tmp_path / "prediction.tar")
+    registry = _BundleRegistry(base_dir=tmp_path, bundles={"prediction": "prediction.tar"})
+    loaded = registry.get("prediction")
+    assert loaded["files"] == sorted(FILES)
+    assert loaded.version == "abc123" and loaded.report()["source"] == "bundle"
+
+    (tmp_path / "models_cars/model_cars_prediction_prices").mkdir(parents=True)
+    directory_registry = _BundleRegistry(base_dir=tmp_path, bundles={"prediction": "missing.tar"})
+    assert directory_registry.get("prediction").report()["source"] == "directory"
+    with pytest.raises(RuntimeError):
+        _BundleRegistry(base_dir=tmp_path, bundles={"prediction": "missing.tar"}, source="bundle").get("prediction")
@@ -0,0 +1,147 @@
+import pytest
+
+import sys
+import os
+import threading
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..")))
+from app.utils.model_registry import LazyMember, ModelRegistry
+
+
+class _TestRegistry(ModelRegistry):
+    """Registro aislado para no alterar los cargadores reales de la aplicación."""
+    _loaders = {}
+    _members = {}
+
+
+CALLS = {"prediction": 0, "xgb": 0}
+
+
+def _load_xgb():
+    CALLS["xgb"] += 1
+    return "xgb"
+
+
+@_TestRegistry.loader("prediction", "models_cars/model_cars_prediction_prices", members=("rf", "xgb"))
+def _fake_loader(base_dir):
+    CALLS["prediction"] += 1
+    return {"rf": object(), "xgb": LazyMember(_load_xgb), "scaler": object()}
+
+
+@_TestRegistry.loader("segmentation", "models_cars/model_car_segmentation")
+def _failing_loader(base_dir):
+    return None
+
+
+@pytest.fixture
+def registry(tmp_path):
+    CALLS["prediction"] = CALLS["xgb"] = 0
+    return _TestRegistry(base_dir=tmp_path, preload_members=False)
+
+
+def test_family_is_loaded_once(registry):
+    """Las peticiones reutilizan la misma instancia sin volver a cargar los artefactos."""
+    first = registry.get("prediction")
+    second = registry.get("prediction")
+
+    assert first is second
+    assert CALLS["prediction"] == 1
+
+
+def test_models_are_read_only(registry):
+    """El registro solo entrega vistas de solo lectura."""
+    loaded = registry.get("prediction")
+    with pytest.raises(TypeError):
+        loaded.models["rf"] = None
+
+
+def test_load_all_reports_failures_without_stopping(registry):
+    """Una familia que falla no impide cargar las demás y se reporta como no cargada."""
+    report = registry.load_all()
+
+    assert report["prediction"]["load_seconds"] >= 0
+    assert report["prediction"]["memory_bytes"] >= 0
+    assert report["segmentation"] is None
+    with pytest.raises(RuntimeError):
+        registry.get("segmentation")
+
+
+def test_subscribers_are_notified_on_load_and_clear(registry):
+    """Los suscriptores (p. ej. la caché de resultados) se enteran de cada recarga."""
+    events = []
+    registry.subscribe(events.append)
+
+    registry.get("prediction")
+    registry.load("prediction")
+    registry.clear()
+
+    assert events == ["prediction", "prediction", "prediction"]
+
+
+def test_reload_subscribers_ignore_load_and_clear(registry):
+    """`subscribe_reload` solo se entera de las recargas, no de la primera carga ni de `clear`."""
+    events = []
+    registry.subscribe_reload(events.append)
+
+    registry.get("prediction")
+    registry.load("prediction")
+    registry.clear()
+    assert events == []
+
+    registry.reload("prediction")
+    assert events == ["prediction"]
+
+
+def test_lazy_members_load_on_first_use(registry):
+    """Un estimador perezoso no se carga hasta que se usa, y se carga una sola vez."""
+    loaded = registry.get("prediction")
+    assert not loaded.is_resident("xgb")
+    assert loaded.report()["pending"] == ["xgb"]
+
+    assert loaded["xgb"] == "xgb" and loaded["xgb"] == "xgb"
+    assert CALLS["xgb"] == 1
+    assert loaded.report()["pending"] == []
+
+
+def test_select_members(registry):
+    """La selección se valida y se ordena como en la familia; vacía equivale a todos."""
+    assert registry.select_members("prediction", ["xgb", "rf"]) == ("rf", "xgb")
+    assert registry.select_members("prediction", None) == ("rf", "xgb")
+    with pytest.raises(ValueError):
+        registry.select_members("prediction", ["svm"])
+
+
+def test_reload_swaps_atomically_and_drains_previous_version(registry):
+    """Quien ya tenía la instantánea termina con ella; se libera al soltarla y se reporta el drenaje."""
+    in_flight = registry.get("prediction")
+    seen_by_warmup = []
+
+    report = registry.reload("prediction", warm=lambda candidate: seen_by_warmup.append(registry.get("prediction")))
+
+    current = registry.get("prediction")
+    assert current is not in_flight and seen_by_warmup == [current]
+    assert in_flight["scaler"] is not current["scaler"]
+    assert report["swap_ms"] >= 0 and not report["drained"]
+
+    del in_flight, seen_by_warmup
+    assert registry.reload_report()["prediction"]["drained"]
+    assert registry.reload_report()["prediction"]["drain_seconds"] >= 0
+
+
+def test_override_is_local_to_the_thread(registry):
+    """Una instantánea fijada con `override` no la ven los demás hilos."""
+    current = registry.get("prediction")
+    candidate = registry._build("prediction")
+    seen = []
+    with registry.override("prediction", candidate):
+        worker = threading.Thread(target=lambda: seen.append(registry.get("prediction")))
+        worker.start()
+        worker.join()
+        assert registry.get("prediction") is candidate
+    assert seen == [current] and registry.get("prediction") is current
+
+
+def test_failed_reload_keeps_current_version(registry):
+    with pytest.raises(RuntimeError):
+        registry.reload("segmentation")
+    assert not registry.is_loaded("segmentation")
@@ -0,0 +1,63 @@
+import numpy as np
+import pytest
+from sklearn.neural_network import MLPClassifier
+
+import sys
+import os
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..")))
+from app.utils.numpy_inference import DenseNetwork
+
+
+@pytest.fixture(scope="module")
+def data():
+    rng = np.random.default_rng(42)
+    X = rng.normal(size=(400, 9))
+    y = (X[:, 0] + X[:, 3] > 0).astype(int) + (X[:, 5] > 1).astype(int)  # 3 clases
+    return X, y
+
+
+def test_mlp_classifier_parity(data):
+    """El motor NumPy reproduce `predict` y `predict_proba` del MLPClassifier."""
+    X, y = data
+    mlp = MLPClassifier(hidden_layer_sizes=(128, 128), max_iter=200, random_state=0).fit(X, y)
+    network = DenseNetwork.from_sklearn_mlp(mlp)
+
+    np.testing.assert_allclose(network.predict_proba(X), mlp.predict_proba(X), rtol=1e-9, atol=1e-12)
+    np.testing.assert_array_equal(network.predict(X), mlp.predict(X))
+
+
+def test_binary_mlp_classifier_parity(data):
+    X, y = data
+    y_binary = (y > 0).astype(int)
+    mlp = MLPClassifier(hidden_layer_sizes=(16,), max_iter=200, random_state=0).fit(X, y_binary)
+    network = DenseNetwork.from_sklearn_mlp(mlp)
+
+    np.testing.assert_allclose(network.predict_proba(X), mlp.predict_proba(X), rtol=1e-9, atol=1e-12)
+    np.testing.assert_array_equal(network.predict(X), mlp.predict(X))
+
+
+def test_export_round_trip(data):
+    X, y = data
+    mlp = MLPClassifier(hidden_layer_sizes=(8,), max_iter=50, random_state=0).fit(X, y)
+    network = DenseNetwork.from_sklearn_mlp(mlp)
+
+    restored = DenseNetwork.from_export(network.to_export())
+
+    np.testing.assert_array_equal(restored.forward(X), network.forward(X))
+
+
+def test_keras_dnn_parity(data):
+    """La DNN de precios (Dense(64)-Dense(64)-Dense(1)) se reproduce dentro de la tolerancia de float32."""
+    keras = pytest.importorskip("tensorflow").keras
+    X, _ = data
+    model = keras.Sequential([
+        keras.layers.Input(shape=(X.shape[1],)),
+        keras.layers.Dense(64, activation="relu"),
+        keras.layers.Dense(64, activation="relu"),
+        keras.layers.Dense(1),
+    ])
+    network = DenseNetwork.from_keras(model)
+
+    expected = model.predict(X, verbose=0)
+    np.testing.assert_allclose(network.predict(X), expected, rtol=1e-4, atol=1e-5)
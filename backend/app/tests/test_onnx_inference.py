@@ -0,0 +1,40 @@
+import sys
+import os
+
+import numpy as np
+import pytest
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..")))
+from app.utils.onnx_inference import OnnxModel, load_estimator
+
+
+def test_missing_onnx_falls_back_to_native(tmp_path):
+    native = object()
+    assert load_estimator(tmp_path / "missing.onnx", lambda: native, "onnx") is native
+    assert load_estimator(tmp_path / "missing.onnx", lambda: native, "native") is native
+
+
+def test_onnx_model_matches_sklearn(tmp_path):
+    pytest.importorskip("onnxruntime")
+    skl2onnx = pytest.importorskip("skl2onnx")
+    from sklearn.ensemble import RandomForestRegressor
+    from sklearn.svm import SVC
+
+    rng = np.random.default_rng(0)
+    X = rng.normal(size=(200, 9))
+    y = X[:, 0] * 3 + X[:, 1]
+    initial_types = [("X", skl2onnx.common.data_types.FloatTensorType([None, 9]))]
+
+    forest = RandomForestRegressor(n_estimators=10, random_state=0).fit(X, y)
+    with open(tmp_path / "rf.onnx", "wb") as fs:
+        fs.write(skl2onnx.convert_sklearn(forest, initial_types=initial_types, target_opset=15).SerializeToString())
+    model = OnnxModel(tmp_path / "rf.onnx", ravel=True)
+    assert model.predict(X).shape == (200,)
+    np.testing.assert_allclose(model.predict(X), forest.predict(X), atol=1e-4)
+
+    svm = SVC().fit(X, (y > 0).astype(int))
+    onnx_svm = skl2onnx.convert_sklearn(svm, initial_types=initial_types, options={id(svm): {"zipmap": False}},
+                                        target_opset=15)
+    with open(tmp_path / "svm.onnx", "wb") as fs:
+        fs.write(onnx_svm.SerializeToString())
+    assert np.mean(OnnxModel(tmp_path / "svm.onnx").predict(X) == svm.predict(X)) > 0.99
@@ -0,0 +1,191 @@
+import asyncio
+import sys
+import os
+import uuid
+
+import pytest
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import sessionmaker
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+from app.core import settings
+from app.core.database import Base
+from app.models import Prediction, PricesCluster, PricesPrediction, PricesSegmentation, User
+from app.api.schemas.prediction_schema import PredictionRequest
+from app.api.services import prediction_service
+from app.utils.result_cache import MemoryCacheBackend
+from app.api.services.prediction_service import (find_persisted_result, find_persisted_results,
+                                                 persist_all_predictions, persist_prediction)
+
+CAR = PredictionRequest(Brand="Toyota", Model="RAV4", Year=2006, Engine_Size=1.3, Fuel_Type="Hybrid",
+                        Transmission="Manual", Mileage=195129, Doors=4, Owner_Count=5)
+
+RESULTS = {
+    "model1": {"rf": 8000.0, "xgb": 8100.0, "dnn": 7900.0},
+    "model2": {"rf": "Low", "svm": "Low", "mlp": "Medium"},
+    "model3": {"kmeans": 2, "dbscan": 0},
+}
+
+
+@pytest.fixture
+def db_session():
+    """Base de datos SQLite en memoria con las tablas de la aplicación."""
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(bind=engine)
+    session = sessionmaker(bind=engine, autoflush=False)()
+    statements = []
+    event.listen(engine, "before_cursor_execute", lambda *args: statements.append(args[2]))
+    session.statements = statements
+    yield session
+    session.close()
+
+
+@pytest.fixture
+def orm_path(monkeypatch):
+    """Guarda con el ORM (búsqueda previa y commit) en lugar del upsert."""
+    monkeypatch.setattr(settings, "PERSISTENCE_UPSERT", False)
+
+
+def _new_user(db) -> uuid.UUID:
+    user_id = uuid.uuid4()
+    db.add(User(id=user_id, email="test@example.com", username="test", hashed_password="x"))
+    db.commit()
+    db.statements.clear()
+    return user_id
+
+
+def test_persist_all_predictions_single_transaction(db_session, orm_path):
+    """La predicción y sus tres resultados se guardan con una consulta de duplicados y un commit."""
+    user_id = _new_user(db_session)
+    response = persist_all_predictions(user_id, CAR, db_session, RESULTS)
+
+    assert response["model1"] == {"rf_prediction": 8000.0, "xgb_prediction": 8100.0, "dnn_prediction": 7900.0}
+    assert response["model2"] == {"rf_prediction": "Low", "svm_prediction": "Low", "mlp_prediction": "Medium"}
+    assert response["model3"] == {"kmeans_cluster": 2, "dbscan_cluster": 0}
+    selects = [s for s in db_session.statements if s.lstrip().upper().startswith("SELECT")]
+    inserts = [s for s in db_session.statements if s.lstrip().upper().startswith("INSERT")]
+    assert len(selects) == 1 and len(inserts) == 4
+
+    for table in (Prediction, PricesPrediction, PricesSegmentation, PricesCluster):
+        assert db_session.query(table).count() == 1
+
+
+def test_persist_all_predictions_reuses_existing_results(db_session, orm_path):
+    """Repetir la petición no duplica filas y retorna los resultados ya guardados."""
+    user_id = _new_user(db_session)
+    first = persist_all_predictions(user_id, CAR, db_session, RESULTS)
+    db_session.statements.clear()
+
+    changed = {**RESULTS, "model3": {"kmeans": 5, "dbscan": -1}}
+    second = persist_all_predictions(user_id, CAR, db_session, changed)
+
+    assert second == first
+    assert not [s for s in db_session.statements if s.lstrip().upper().startswith("INSERT")]
+    assert db_session.query(Prediction).count() == 1
+    assert db_session.query(PricesCluster).count() == 1
+
+
+def test_upsert_writes_each_table_with_one_statement(db_session):
+    """Con upsert, cada tabla se escribe con un INSERT ... RETURNING, sin SELECT previos ni recargas."""
+    user_id = _new_user(db_session)
+    first = persist_all_predictions(user_id, CAR, db_session, RESULTS)
+    assert first["model3"] == {"kmeans_cluster": 2, "dbscan_cluster": 0}
+    assert len(db_session.statements) == 4
+    assert all(s.lstrip().upper().startswith("INSERT") and "RETURNING" in s.upper() for s in db_session.statements)
+
+    # Un reenvío no reescribe las filas existentes: cada INSERT no devuelve nada y se leen
+    db_session.statements.clear()
+    changed = {**RESULTS, "model3": {"kmeans": 5, "dbscan": -1}}
+    assert persist_all_predictions(user_id, CAR, db_session, changed) == first
+    kinds = sorted(s.lstrip().split()[0].upper() for s in db_session.statements)
+    assert kinds == ["INSERT"] * 4 + ["SELECT"] * 4
+    for table in (Prediction, PricesPrediction, PricesSegmentation, PricesCluster):
+        assert db_session.query(table).count() == 1
+
+
+def test_persist_prediction_fills_unselected_members(db_session):
+    """Un resultado parcial (`members`) se completa cuando llegan los estimadores que faltaban."""
+    user_id = _new_user(db_session)
+    partial = persist_prediction(user_id, CAR, db_session, "model1", {"rf": 8000.0})
+    assert partial == {"rf_prediction": 8000.0, "xgb_prediction": None, "dnn_prediction": None}
+
+    full = persist_prediction(user_id, CAR, db_session, "model1", {"rf": 1.0, "xgb": 8100.0, "dnn": 7900.0})
+    assert full == {"rf_prediction": 8000.0, "xgb_prediction": 8100.0, "dnn_prediction": 7900.0}
+    assert db_session.query(PricesPrediction).count() == 1
+
+
+def test_find_persisted_result_requires_selected_members(db_session):
+    """El resultado guardado evita la inferencia solo si tiene todos los estimadores pedidos."""
+    user_id = _new_user(db_session)
+    assert find_persisted_result(user_id, CAR, db_session, "model1") is None
+
+    persist_prediction(user_id, CAR, db_session, "model1", {"rf": 8000.0})
+    db_session.statements.clear()
+    assert find_persisted_result(user_id, CAR, db_session, "model1", ["rf"])["rf_prediction"] == 8000.0
+    assert find_persisted_result(user_id, CAR, db_session, "model1") is None
+    assert len(db_session.statements) == 2
+
+    persist_all_predictions(user_id, CAR, db_session, {"model3": RESULTS["model3"]})
+    assert list(find_persisted_results(user_id, CAR, db_session)) == ["model3"]
+
+
+def test_concurrent_insert_reuses_committed_prediction(db_session, monkeypatch, orm_path):
+    """Si otra petición guarda la misma predicción entre la búsqueda y el commit, se reutiliza su fila."""
+    user_id = _new_user(db_session)
+    first = persist_all_predictions(user_id, CAR, db_session, RESULTS)
+
+    lookup = prediction_service.is_duplicated_prediction
+    calls = []
+
+    def racing_lookup(*args, **kwargs):
+        calls.append(args)
+        return None if len(calls) == 1 else lookup(*args, **kwargs)  # la primera búsqueda no ve la fila guardada
+
+    monkeypatch.setattr(prediction_service, "is_duplicated_prediction", racing_lookup)
+
+    assert persist_all_predictions(user_id, CAR, db_session, RESULTS) == first
+    assert len(calls) == 2
+    assert db_session.query(Prediction).count() == 1
+
+
+@pytest.mark.parametrize("model_name, result", [("model1", None), ("model3", {"kmeans": None, "dbscan": None})])
+def test_unevaluated_result_is_rejected(db_session, model_name, result):
+    """Un resultado sin ningún valor (categorías desconocidas) no se guarda como fila vacía."""
+    user_id = _new_user(db_session)
+    with pytest.raises(ValueError, match="desconocidos"):
+        persist_prediction(user_id, CAR, db_session, model_name, result)
+    with pytest.raises(ValueError, match="desconocidos"):
+        persist_all_predictions(user_id, CAR, db_session, {**RESULTS, model_name: result})
+    assert db_session.query(Prediction).count() == 0
+
+
+def test_process_executor_only_runs_inference(monkeypatch):
+    """Con `kind: process`, la caché y la evaluación en sombra se resuelven en el worker; el pool solo infiere."""
+    pooled, shadowed = [], []
+
+    class ProcessExecutor:
+        kind = "process"
+
+        async def run(self, func, *args):
+            pooled.append(func)
+            return func(*args)
+
+    class Shadow:
+        def submit(self, family, data):
+            shadowed.append(family)
+
+    monkeypatch.setattr(settings, "MICRO_BATCHING_ENABLED", False)
+    monkeypatch.setattr(prediction_service, "INFERENCE_EXECUTOR", ProcessExecutor())
+    monkeypatch.setattr(prediction_service, "SHADOW_EVALUATOR", Shadow())
+    monkeypatch.setattr(prediction_service, "RESULT_CACHE", MemoryCacheBackend())
+    monkeypatch.setattr(prediction_service, "_result_cache_key", lambda *args: ("prediction", "v1", "car"))
+    predict = lambda data, members: dict(RESULTS["model1"])
+    monkeypatch.setitem(prediction_service.MODEL_FUNCTIONS, "model1", predict)
+
+    data = CAR.model_dump()
+    first = asyncio.run(prediction_service.run_model_async("model1", data))
+    second = asyncio.run(prediction_service.run_model_async("model1", data))
+
+    assert first == second == RESULTS["model1"]
+    assert pooled == [predict]  # El segundo acierto sale de la caché del worker
+    assert shadowed == ["prediction", "prediction"]
@@ -0,0 +1,152 @@
+import pytest
+
+import sys
+import os
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..")))
+from app.utils.result_cache import MemoryCacheBackend, SQLiteCacheBackend, create_cache_backend
+
+CAR = {"Brand": "Toyota", "Model": "Corolla", "Year": 2018, "Engine_Size": 1.8, "Fuel_Type": "Petrol",
+       "Transmission": "Automatic", "Mileage": 50000, "Doors": 4, "Owner_Count": 1}
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock():
+    return FakeClock()
+
+
+def test_hit_and_miss(clock):
+    cache = MemoryCacheBackend(max_entries=10, ttl_seconds=60, clock=clock)
+    key = MemoryCacheBackend.make_key("prediction", "v1", CAR)
+
+    assert cache.get(key) is None
+    cache.put(key, {"rf": 1.0})
+    # Misma combinación con otra representación de los valores: misma llave
+    assert cache.get(MemoryCacheBackend.make_key("prediction", "v1", dict(CAR, Year="2018"))) == {"rf": 1.0}
+    assert cache.get(MemoryCacheBackend.make_key("prediction", "v2", CAR)) is None
+
+    stats = cache.stats()
+    assert (stats["hits"], stats["misses"]) == (1, 2)
+
+
+def test_lru_eviction(clock):
+    cache = MemoryCacheBackend(max_entries=2, ttl_seconds=0, clock=clock)
+    cache.put("a", {"v": 1})
+    cache.put("b", {"v": 2})
+    cache.get("a")  # "b" pasa a ser el menos usado
+    cache.put("c", {"v": 3})
+
+    assert cache.get("b") is None
+    assert cache.get("a") == {"v": 1}
+    assert cache.stats()["evictions"] == 1
+
+
+def test_ttl_expiration(clock):
+    cache = MemoryCacheBackend(max_entries=10, ttl_seconds=5, clock=clock)
+    cache.put("a", {"v": 1})
+    clock.now = 4.9
+    assert cache.get("a") == {"v": 1}
+    clock.now = 5.0
+    assert cache.get("a") is None
+    assert cache.stats()["expirations"] == 1
+    assert len(cache) == 0
+
+
+def test_invalidate_family_and_returned_copies(clock):
+    cache = MemoryCacheBackend(clock=clock)
+    cache.put(MemoryCacheBackend.make_key("prediction", "v1", CAR), {"rf": 1.0})
+    cache.put(MemoryCacheBackend.make_key("clusterization", "v1", CAR), {"kmeans": 2})
+
+    assert cache.invalidate("prediction") == 1
+    assert cache.get(MemoryCacheBackend.make_key("prediction", "v1", CAR)) is None
+
+    result = cache.get(MemoryCacheBackend.make_key("clusterization", "v1", CAR))
+    result["kmeans"] = 99
+    assert cache.get(MemoryCacheBackend.make_key("clusterization", "v1", CAR)) == {"kmeans": 2}
+
+
+@pytest.fixture
+def sqlite_path(tmp_path):
+    return str(tmp_path / "cache.sqlite3")
+
+
+def test_sqlite_backend_is_shared_between_instances(sqlite_path, clock):
+    """Dos instancias sobre el mismo archivo (como dos workers) ven los mismos resultados."""
+    writer = SQLiteCacheBackend(sqlite_path, ttl_seconds=5, clock=clock)
+    reader = SQLiteCacheBackend(sqlite_path, ttl_seconds=5, clock=clock)
+    key = SQLiteCacheBackend.make_key("segmentation", "v1", CAR)
+
+    writer.put(key, {"rf": "Barato", "svm": "Barato", "mlp": "Medio"})
+    assert reader.get(key) == {"rf": "Barato", "svm": "Barato", "mlp": "Medio"}
+
+    clock.now = 5.0
+    assert reader.get(key) is None
+    assert reader.stats()["expirations"] == 1
+
+    writer.put(key, {"rf": "Caro"})
+    assert reader.evict(key) is True
+    assert writer.get(key) is None
+
+
+def test_sqlite_backend_prune_and_invalidate(sqlite_path, clock):
+    cache = SQLiteCacheBackend(sqlite_path, max_entries=3, ttl_seconds=0, prune_every=1, clock=clock)
+    for i in range(5):
+        clock.now = float(i)
+        cache.put(("prediction", "v1", i), {"rf": float(i)})
+    cache.put(("clusterization", "v1", 0), {"kmeans": 1})
+
+    assert len(cache) == 3
+    assert cache.get(("prediction", "v1", 0)) is None
+    assert cache.invalidate("prediction") == 2
+    assert cache.get(("clusterization", "v1", 0)) == {"kmeans": 1}
+
+
+def test_reload_keeps_shared_entries(sqlite_path, clock):
+    """Una recarga en un worker no borra la caché compartida; la memoria sí descarta la familia."""
+    shared = SQLiteCacheBackend(sqlite_path, clock=clock)
+    local = MemoryCacheBackend(clock=clock)
+    for cache in (shared, local):
+        cache.put(("prediction", "v2", 0), {"rf": 1.0})
+
+    assert shared.model_reloaded("prediction") == 0
+    assert shared.get(("prediction", "v2", 0)) == {"rf": 1.0}
+    assert local.model_reloaded("prediction") == 1
+    assert local.get(("prediction", "v2", 0)) is None
+
+
+def _hammer(path, worker, rounds):
+    cache = SQLiteCacheBackend(path, max_entries=50, prune_every=8)
+    for i in range(rounds):
+        key = ("prediction", "v1", i % 20)
+        cache.put(key, {"writer": worker, "payload": [worker] * 200})
+        result = cache.get(key)
+        # Una entrada siempre está completa y proviene de un único escritor
+        assert result is None or result["payload"] == [result["writer"]] * 200
+
+
+def test_sqlite_backend_concurrent_processes(sqlite_path):
+    multiprocessing = pytest.importorskip("multiprocessing")
+    context = multiprocessing.get_context("fork")
+    SQLiteCacheBackend(sqlite_path)  # Crea el esquema antes de arrancar los procesos
+    processes = [context.Process(target=_hammer, args=(sqlite_path, worker, 200)) for worker in range(4)]
+    for process in processes:
+        process.start()
+    for process in processes:
+        process.join(timeout=60)
+
+    assert [process.exitcode for process in processes] == [0, 0, 0, 0]
+
+
+def test_create_cache_backend(sqlite_path):
+    assert isinstance(create_cache_backend("memory", sqlite_path=sqlite_path), MemoryCacheBackend)
+    assert create_cache_backend("sqlite", sqlite_path=sqlite_path).path == sqlite_path
+    with pytest.raises(ValueError):
+        create_cache_backend("redis")
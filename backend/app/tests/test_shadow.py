@@ -0,0 +1,78 @@
+import sys
+import os
+
+import pytest
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..")))
+from app.core import settings
+from app.utils.model_registry import PATH_DIR, ModelRegistry
+from app.utils.shadow import ShadowEvaluator
+
+CAR = {"Brand": "Kia", "Model": "Rio", "Year": 2020, "Engine_Size": 4.2, "Fuel_Type": "Diesel",
+       "Transmission": "Manual", "Mileage": 289944, "Doors": 3, "Owner_Count": 5}
+
+
+class _ShadowRegistry(ModelRegistry):
+    """Registro aislado: la versión depende del directorio base (producción o candidata)."""
+    _loaders = {}
+    _members = {}
+
+
+@_ShadowRegistry.loader("prediction", "models")
+@_ShadowRegistry.loader("segmentation", "models")
+def _loader(artifacts_dir):
+    candidate = artifacts_dir.parent.name == "candidate"
+    return {"price": 110.0 if candidate else 100.0, "segment": "Medio" if candidate else "Caro"}
+
+
+@pytest.fixture
+def evaluator(tmp_path):
+    production = _ShadowRegistry(base_dir=tmp_path / "production")
+    candidate = _ShadowRegistry(base_dir=tmp_path / "candidate")
+
+    # Las funciones leen siempre el registro de producción, como las funciones `prices_*`;
+    # el evaluador fija en él la instantánea de cada versión
+    functions = {
+        "prediction": lambda cars: [{"result": {"rf": production.get("prediction")["price"]}, "error": None}],
+        "segmentation": lambda cars: [{"result": {"rf": production.get("segmentation")["segment"],
+                                                  "svm": "Caro"}, "error": None}],
+    }
+    return ShadowEvaluator(candidate, sample_rate=1.0, max_queue=2, registry=production, functions=functions)
+
+
+def test_compares_candidate_with_production(evaluator):
+    """Precio: diferencia absoluta y relativa; segmento: proporción de coincidencias."""
+    evaluator.evaluate("prediction", CAR)
+    evaluator.evaluate("segmentation", CAR)
+
+    report = evaluator.report()["families"]
+    assert report["prediction"]["members"]["rf"] == {"mean_abs_delta": 10.0, "mean_rel_delta_pct": 10.0,
+                                                     "max_abs_delta": 10.0}
+    assert report["segmentation"]["members"] == {"rf": {"agreement": 0.0}, "svm": {"agreement": 1.0}}
+    assert report["prediction"]["samples"] == 1
+    assert set(report["prediction"]["latency_ms"]) == {"production", "candidate", "speedup"}
+
+
+def test_submit_never_blocks_and_runs_off_the_request_path(evaluator):
+    """Con la cola llena las muestras se descartan; el hilo en sombra evalúa las encoladas."""
+    assert [evaluator.submit("prediction", CAR) for _ in range(3)] == [True, True, False]
+    assert evaluator.report()["dropped"] == 1
+
+    evaluator.start()
+    evaluator.join()
+    evaluator.stop()
+    assert evaluator.report()["families"]["prediction"]["samples"] == 2
+
+    evaluator.sample_rate = 0.0
+    assert not evaluator.submit("prediction", CAR)
+
+
+def test_enabled_with_default_base_dir(monkeypatch):
+    """Activar la sombra sin `base_dir` usa la raíz del proyecto en lugar de fallar al importar."""
+    from app.api.services import prediction_service
+
+    monkeypatch.setattr(settings, "SHADOW_ENABLED", True)
+    monkeypatch.setattr(settings, "SHADOW_BASE_DIR", None)
+    evaluator = prediction_service.create_shadow_evaluator()
+
+    assert evaluator.candidate.base_dir == PATH_DIR
@@ -0,0 +1,29 @@
+import asyncio
+
+import sys
+import os
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..")))
+from app.utils.single_flight import SingleFlight
+
+
+def test_concurrent_calls_with_same_key_share_one_execution():
+    """Las llamadas concurrentes con la misma llave esperan una sola ejecución; al terminar, la llave se libera."""
+    flight = SingleFlight("test")
+    calls = []
+
+    async def compute(value):
+        calls.append(value)
+        await asyncio.sleep(0.01)
+        return value * 10
+
+    async def scenario():
+        shared = await asyncio.gather(*(flight.run("a", lambda: compute(1)) for _ in range(5)),
+                                      flight.run("b", lambda: compute(2)))
+        again = await flight.run("a", lambda: compute(1))
+        return shared, again
+
+    shared, again = asyncio.run(scenario())
+    assert shared == [10, 10, 10, 10, 10, 20] and again == 10
+    assert calls == [1, 2, 1]
+    assert flight.stats() == {"executed": 3, "shared": 4, "shared_ratio": 0.5714, "inflight": 0}
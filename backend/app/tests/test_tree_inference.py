@@ -0,0 +1,103 @@
+import joblib
+import numpy as np
+import pytest
+from sklearn.ensemble import RandomForestClassifier, RandomForestRegressor
+
+import sys
+import os
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..")))
+from app.utils.tree_inference import FlatForest, compile_forest, load_forest
+
+
+@pytest.fixture(scope="module")
+def data():
+    rng = np.random.default_rng(7)
+    X = rng.normal(size=(600, 9))
+    y_reg = 20000 + 3000 * X[:, 2] - 1500 * X[:, 6] + rng.normal(scale=500, size=600)
+    y_clf = np.digitize(y_reg, np.quantile(y_reg, [0.33, 0.66]))
+    X_new = rng.normal(size=(257, 9))
+    return X, y_reg, y_clf, X_new
+
+
+def test_regressor_parity(data):
+    """Misma predicción que `RandomForestRegressor(n_estimators=100)` para filas nuevas y de entrenamiento."""
+    X, y_reg, _, X_new = data
+    forest = RandomForestRegressor(n_estimators=100, random_state=42).fit(X, y_reg)
+    flat = FlatForest.from_sklearn(forest)
+
+    for batch in (X_new, X_new[:1], X):
+        np.testing.assert_allclose(flat.predict(batch), forest.predict(batch), rtol=1e-12)
+
+
+def test_classifier_parity(data):
+    """Mismas probabilidades y clases que el clasificador de segmentación."""
+    X, _, y_clf, X_new = data
+    labels = np.array(["Barato", "Medio", "Caro"])[y_clf]
+    forest = RandomForestClassifier(n_estimators=300, max_depth=20, min_samples_split=5, random_state=42).fit(X, labels)
+    flat = FlatForest.from_sklearn(forest)
+
+    np.testing.assert_allclose(flat.predict_proba(X_new), forest.predict_proba(X_new), rtol=1e-12, atol=1e-12)
+    np.testing.assert_array_equal(flat.predict(X_new), forest.predict(X_new))
+    np.testing.assert_array_equal(flat.predict(X_new[:1]), forest.predict(X_new[:1]))
+
+
+def test_thresholds_are_compared_in_float32(data):
+    """Valores justo en el umbral siguen el mismo camino que en sklearn."""
+    X, y_reg, _, _ = data
+    forest = RandomForestRegressor(n_estimators=10, random_state=0).fit(X, y_reg)
+    flat = FlatForest.from_sklearn(forest)
+    tree = forest.estimators_[0].tree_
+    X_edge = np.tile(X[:1], (5, 1)).astype(np.float64)
+    X_edge[:, tree.feature[0]] = tree.threshold[0] + np.array([-1e-9, 0.0, 1e-9, 1e-7, -1e-7])
+
+    np.testing.assert_allclose(flat.predict(X_edge), forest.predict(X_edge), rtol=1e-12)
+
+
+def test_float32_copy_keeps_every_split(data):
+    """La copia float32 llega a las mismas hojas, incluso con valores en el float32 más cercano a cada umbral."""
+    X, y_reg, _, X_new = data
+    forest = RandomForestRegressor(n_estimators=10, random_state=0).fit(X, y_reg)
+    flat = FlatForest.from_sklearn(forest)
+    flat32 = flat.to_float32()
+    tree = forest.estimators_[0].tree_
+    nodes = np.flatnonzero(tree.children_left != -1)
+    X_edge = np.tile(X[:1], (3 * len(nodes), 1))
+    for i, node in enumerate(nodes):
+        nearest = np.float32(tree.threshold[node])
+        X_edge[3 * i:3 * i + 3, tree.feature[node]] = [np.nextafter(nearest, np.float32(-np.inf)), nearest,
+                                                       np.nextafter(nearest, np.float32(np.inf))]
+
+    for batch in (X, X_new, X_edge):
+        np.testing.assert_array_equal(flat32.apply(batch), flat.apply(batch))
+    np.testing.assert_allclose(flat32.predict(X_new), flat.predict(X_new), rtol=1e-6)
+    assert flat32.memory_bytes() * 2 == flat.memory_bytes()
+
+
+def test_large_batches_fall_back_to_sklearn(data):
+    """Con `fallback_min_rows`, los lotes grandes se delegan al bosque original."""
+    X, y_reg, _, X_new = data
+    forest = RandomForestRegressor(n_estimators=10, random_state=0).fit(X, y_reg)
+    flat = compile_forest(forest, fallback_min_rows=256)
+
+    assert flat.fallback is forest
+    np.testing.assert_allclose(flat.predict(X_new), forest.predict(X_new), rtol=1e-12)
+    assert compile_forest(forest).fallback is None
+
+
+def test_exported_arrays_are_memory_mapped(data, tmp_path):
+    """Los arreglos exportados se cargan mapeados en memoria y sklearn solo se carga para lotes grandes."""
+    X, y_reg, _, X_new = data
+    forest = RandomForestRegressor(n_estimators=10, random_state=0).fit(X, y_reg)
+    joblib.dump(forest, tmp_path / "rf.pkl", compress=0)
+    joblib.dump(FlatForest.from_sklearn(forest).to_export(), tmp_path / "rf_flat.pkl", compress=0)
+
+    flat = load_forest(tmp_path / "rf.pkl", tmp_path / "rf_flat.pkl", fallback_min_rows=256,
+                       load=lambda path: joblib.load(path, mmap_mode="r"))
+
+    # Vista sin copia sobre el archivo mapeado (solo lectura)
+    assert not flat.threshold.flags.owndata and not flat.threshold.flags.writeable
+    np.testing.assert_allclose(flat.predict(X_new[:16]), forest.predict(X_new[:16]), rtol=1e-12)
+    assert flat.fallback is None
+    np.testing.assert_allclose(flat.predict(X_new), forest.predict(X_new), rtol=1e-12)
+    assert flat.fallback is not None
@@ -0,0 +1,52 @@
+import sys
+import os
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..")))
+from app.utils.warmup import SAMPLE_CARS, Readiness, load_sample_rows, run_warmup
+
+
+def test_load_sample_rows_spreads_dataset_and_falls_back(tmp_path):
+    """Las filas se toman repartidas del CSV con sus tipos; sin dataset se usan los autos de ejemplo."""
+    path = tmp_path / "cars.csv"
+    header = "Brand,Model,Year,Engine_Size,Fuel_Type,Transmission,Mileage,Doors,Owner_Count,Price\n"
+    path.write_text(header + "".join(f"Kia,Rio,{2000 + i},2.0,Diesel,Manual,{i},4,1,9000\n" for i in range(10)))
+
+    rows = load_sample_rows(path, n_rows=5)
+    assert [row["Year"] for row in rows] == [2000, 2002, 2004, 2006, 2008]
+    assert rows[0]["Engine_Size"] == 2.0 and "Price" not in rows[0]
+
+    assert load_sample_rows(tmp_path / "missing.csv") == SAMPLE_CARS
+    assert load_sample_rows(None) == SAMPLE_CARS
+
+
+def test_run_warmup_times_every_batch_size_and_isolates_errors():
+    """Cada familia se ejecuta a cada tamaño de lote; un error no detiene a las demás."""
+    calls = []
+
+    def fake_batch(batch):
+        calls.append(len(batch))
+        return [None] * len(batch)
+
+    def failing_batch(batch):
+        raise RuntimeError("sin modelos")
+
+    report = run_warmup(SAMPLE_CARS, batch_sizes=(1, 8), repeats=2,
+                        functions={"fake": fake_batch, "broken": failing_batch})
+
+    assert calls == [1, 1, 8, 8]
+    assert sorted(report["families"]["fake"]["timings_ms"]) == [1, 8]
+    assert len(report["families"]["fake"]["timings_ms"][8]) == 2
+    assert report["families"]["broken"]["error"] == "sin modelos"
+
+
+def test_readiness_transitions():
+    """El worker no está listo hasta terminar el calentamiento y deja de estarlo al apagarse."""
+    readiness = Readiness()
+    assert not readiness.ready and readiness.status()["startup_seconds"] is None
+
+    readiness.mark_ready({"seconds": 0.1})
+    assert readiness.ready and readiness.wait(0)
+    assert readiness.status()["warmup"] == {"seconds": 0.1}
+
+    readiness.mark_not_ready()
+    assert not readiness.ready
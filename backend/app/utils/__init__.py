@@ -1,7 +1,9 @@
 from .logger import logger
-from .load_model_prices_clusterization import prices_clusterization
-from .load_model_prices_segmetation import prices_segmentation
-from .load_models_prices_prediction import prices_prediction
+from .model_registry import MODEL_REGISTRY
+from .load_model_prices_clusterization import prices_clusterization, prices_clusterization_batch
+from .load_model_prices_segmetation import prices_segmentation, prices_segmentation_batch
+from .load_models_prices_prediction import prices_prediction, prices_prediction_batch
 
 
-__all__  = {'logger','prices_clusterization', 'prices_segmentation', 'prices_prediction' }
+__all__  = {'logger', 'MODEL_REGISTRY', 'prices_clusterization', 'prices_segmentation', 'prices_prediction',
+            'prices_clusterization_batch', 'prices_segmentation_batch', 'prices_prediction_batch' }
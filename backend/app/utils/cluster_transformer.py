@@ -0,0 +1,125 @@
+"""
+Transformador precompilado para la clusterización.
+
+Reemplaza la secuencia `LabelEncoder.transform` → `OneHotEncoder.transform` → `pd.concat`
+→ `StandardScaler.transform` → `PCA.transform` por:
+
+- búsquedas en diccionarios para el código de "Model" y la posición de cada columna one-hot,
+- una sola multiplicación matriz-vector: el escalador y el PCA son una transformación afín
+  `z = x @ W + b`, con `W = (componentes / escala).T` y `b = -(media / escala + media_pca) @ componentes.T`,
+- la asignación de K-Means como búsqueda del centroide más cercano.
+"""
+
+import copy
+from typing import Dict, List, Optional
+
+import numpy as np
+
+
+class CompiledClusterTransformer:
+    """
+    Transformador construido a partir de `scaler_cluster.pkl`, `pca_cluster.pkl`,
+    `encoder.pkl` (OneHotEncoder) y `encoder_model.pkl` (LabelEncoder de "Model").
+
+    Parámetros:
+        scaler (StandardScaler): Escalador ajustado sobre las columnas numéricas y one-hot.
+        pca (PCA): Reducción de dimensionalidad ajustada sobre los datos escalados.
+        encoder (OneHotEncoder): Codificador de las variables categóricas.
+        label_encoder (LabelEncoder): Codificador de la columna "Model".
+        kmeans (KMeans, opcional): Modelo cuyos centroides se usan en `kmeans_predict`.
+    """
+
+    def __init__(self, scaler, pca, encoder, label_encoder, kmeans=None):
+        self.columns: List[str] = [str(col) for col in scaler.feature_names_in_]
+        position_of = {col: position for position, col in enumerate(self.columns)}
+
+        # 🔹 Columnas one-hot: categoría → posición en la matriz (None para la categoría eliminada)
+        categorical_columns = [str(col) for col in getattr(encoder, "feature_names_in_",
+                                                           ["Brand", "Fuel_Type", "Transmission"])]
+        one_hot_names = encoder.get_feature_names_out(categorical_columns)
+        names = iter(one_hot_names)
+        drop_idx = encoder.drop_idx_ if encoder.drop_idx_ is not None else [None] * len(categorical_columns)
+        self.one_hot: Dict[str, Dict] = {}
+        for col, categories, dropped in zip(categorical_columns, encoder.categories_, drop_idx):
+            self.one_hot[col] = {
+                category: (None if dropped is not None and code == dropped else position_of[str(next(names))])
+                for code, category in enumerate(categories)
+            }
+
+        # 🔹 Columnas numéricas (y "Model" codificada): posición en la matriz
+        self.model_codes: Dict = {value: float(code) for code, value in enumerate(label_encoder.classes_)}
+        one_hot_positions = {position_of[str(name)] for name in one_hot_names}
+        self._numeric_slots = [(position, col) for position, col in enumerate(self.columns)
+                               if position not in one_hot_positions]
+
+        # 🔹 Escalador + PCA fusionados en una transformación afín
+        n_features = len(self.columns)
+        mean = scaler.mean_ if scaler.with_mean and scaler.mean_ is not None else np.zeros(n_features)
+        scale = scaler.scale_ if scaler.with_std and scaler.scale_ is not None else np.ones(n_features)
+        components = np.asarray(pca.components_, dtype=np.float64)
+        if pca.whiten:
+            components = components / np.sqrt(pca.explained_variance_)[:, np.newaxis]
+        self.weights = np.ascontiguousarray((components / scale).T)  # (n_features, n_componentes)
+        self.bias = np.ascontiguousarray(-(mean / scale + pca.mean_) @ components.T)
+
+        # 🔹 Centroides de K-Means para la búsqueda del más cercano
+        self.centroids = None if kmeans is None else np.ascontiguousarray(kmeans.cluster_centers_, dtype=np.float64)
+        self._centroid_norms = None if kmeans is None else (self.centroids ** 2).sum(axis=1)
+        self.dtype = np.float64  # Precisión de la codificación y de la proyección (ver `to_float32`)
+
+    @property
+    def n_features(self) -> int:
+        return len(self.columns)
+
+    @property
+    def n_components(self) -> int:
+        return self.weights.shape[1]
+
+    def to_float32(self) -> "CompiledClusterTransformer":
+        """Copia del transformador con la proyección y los centroides en float32."""
+        transformer = copy.copy(self)
+        transformer.weights = self.weights.astype(np.float32)
+        transformer.bias = self.bias.astype(np.float32)
+        if self.centroids is not None:
+            transformer.centroids = self.centroids.astype(np.float32)
+            transformer._centroid_norms = self._centroid_norms.astype(np.float32)
+        transformer.dtype = np.float32
+        return transformer
+
+    def unknown(self, row: Dict) -> Dict:
+        """Retorna `{columna: valor}` con las categorías que los encoders no conocen."""
+        unknown = {col: row[col] for col, positions in self.one_hot.items() if row[col] not in positions}
+        if row["Model"] not in self.model_codes:
+            unknown["Model"] = row["Model"]
+        return unknown
+
+    def encode(self, rows: List[Dict], out: Optional[np.ndarray] = None) -> np.ndarray:
+        """
+        Construye la matriz sin escalar `(n_filas, n_features)` con "Model" codificada y las
+        columnas one-hot activadas. Todas las categorías deben ser conocidas (ver `unknown`).
+        """
+        if out is None:
+            out = np.zeros((len(rows), self.n_features), dtype=self.dtype)
+        else:
+            out.fill(0.0)
+        for i, row in enumerate(rows):
+            target = out[i]
+            for position, col in self._numeric_slots:
+                target[position] = self.model_codes[row[col]] if col == "Model" else row[col]
+            for col, positions in self.one_hot.items():
+                position = positions[row[col]]
+                if position is not None:
+                    target[position] = 1.0
+        return out
+
+    def transform(self, rows: List[Dict]) -> np.ndarray:
+        """Proyecta un lote de autos al espacio PCA, `(n_filas, n_componentes)`."""
+        return self.encode(rows) @ self.weights + self.bias
+
+    def kmeans_predict(self, Z: np.ndarray) -> np.ndarray:
+        """Índice del centroide de K-Means más cercano a cada fila de `Z` (espacio PCA)."""
+        if self.centroids is None:
+            raise AttributeError("El transformador se construyó sin modelo K-Means.")
+        # ||z - c||² = ||z||² - 2 z·c + ||c||²; ||z||² no cambia el argmin
+        distances = self._centroid_norms - 2.0 * (Z @ self.centroids.T)
+        return np.argmin(distances, axis=1)
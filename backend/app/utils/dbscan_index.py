@@ -0,0 +1,62 @@
+"""
+Asignación de autos nuevos a clusters de DBSCAN mediante un índice de muestras núcleo.
+
+Un punto nuevo pertenece al cluster de la muestra núcleo más cercana si está a una
+distancia <= `eps` (es alcanzable por densidad desde ella); si no, es ruido (-1).
+El índice se construye al entrenar (ver `ModelTrain/handlers/dbscan_index.py`) y se guarda
+como un diccionario con joblib:
+
+    {
+        "format": "dbscan-core-index/v1",
+        "tree": KDTree,                # muestras núcleo (`components_`)
+        "core_labels": array,          # cluster de cada muestra núcleo
+        "eps": float,
+    }
+"""
+
+from typing import Dict
+
+import numpy as np
+from sklearn.neighbors import KDTree
+
+INDEX_FORMAT = "dbscan-core-index/v1"
+NOISE = -1
+
+
+class DBSCANIndex:
+    """
+    KD-tree de las muestras núcleo de un DBSCAN ajustado.
+
+    Parámetros:
+        tree (KDTree): Índice sobre las muestras núcleo.
+        core_labels (array): Etiqueta de cluster de cada muestra núcleo.
+        eps (float): Radio de vecindad del DBSCAN.
+    """
+
+    def __init__(self, tree: KDTree, core_labels: np.ndarray, eps: float):
+        self.tree = tree
+        self.core_labels = np.asarray(core_labels, dtype=np.int64)
+        self.eps = float(eps)
+
+    @classmethod
+    def from_export(cls, export: Dict) -> "DBSCANIndex":
+        """Construye el índice a partir del diccionario guardado al entrenar."""
+        if export.get("format") != INDEX_FORMAT:
+            raise ValueError(f"Formato de índice no soportado: {export.get('format')}")
+        return cls(export["tree"], export["core_labels"], export["eps"])
+
+    @classmethod
+    def from_dbscan(cls, dbscan, leaf_size: int = 40) -> "DBSCANIndex":
+        """Construye el índice a partir de un `DBSCAN` ajustado (artefactos sin `dbscan_index.pkl`)."""
+        if dbscan.metric != "euclidean":
+            raise ValueError(f"Métrica no soportada por el índice: {dbscan.metric}")
+        tree = KDTree(np.asarray(dbscan.components_, dtype=np.float64), leaf_size=leaf_size)
+        return cls(tree, dbscan.labels_[dbscan.core_sample_indices_], dbscan.eps)
+
+    def predict(self, X: np.ndarray) -> np.ndarray:
+        """Retorna el cluster de cada fila de `X` (en el espacio PCA), o -1 si es ruido."""
+        X = np.asarray(X, dtype=np.float64)
+        if len(X) == 0 or len(self.core_labels) == 0:
+            return np.full(len(X), NOISE, dtype=np.int64)
+        distances, indices = self.tree.query(X, k=1)
+        return np.where(distances[:, 0] <= self.eps, self.core_labels[indices[:, 0]], NOISE)
@@ -0,0 +1,77 @@
+"""
+Codificador de características precompilado.
+
+Reemplaza la secuencia `pd.DataFrame` → `LabelEncoder.transform` → `StandardScaler.transform`
+por búsquedas en diccionarios (categoría → código) y una escritura directa en un arreglo
+de NumPy con la media y la escala del escalador ya fusionadas.
+"""
+
+import copy
+from typing import Dict, List
+
+import numpy as np
+
+from app.utils.features import FEATURE_COLUMNS
+
+
+class CompiledFeatureEncoder:
+    """
+    Codificador construido a partir de `label_encoders.pkl` y `scaler.pkl`.
+
+    Produce exactamente las mismas columnas y en el mismo orden con el que se ajustó el
+    escalador, de modo que la salida puede pasarse directamente a los modelos.
+
+    Parámetros:
+        label_encoders (dict): `{columna: LabelEncoder}` de las variables categóricas.
+        scaler (StandardScaler): Escalador ajustado sobre las columnas de entrada.
+    """
+
+    def __init__(self, label_encoders: Dict, scaler):
+        self.columns: List[str] = [str(col) for col in getattr(scaler, "feature_names_in_", FEATURE_COLUMNS)]
+
+        # Búsqueda O(1) de categoría → código (el código es la posición en `classes_`)
+        self.vocabularies: Dict[str, Dict] = {
+            col: {value: float(code) for code, value in enumerate(encoder.classes_)}
+            for col, encoder in label_encoders.items()
+        }
+        self._slots = [(position, col, self.vocabularies.get(col)) for position, col in enumerate(self.columns)]
+
+        # (x - media) / escala  ==  x * (1 / escala) + (-media / escala)
+        n_features = len(self.columns)
+        mean = scaler.mean_ if getattr(scaler, "with_mean", True) and scaler.mean_ is not None else np.zeros(n_features)
+        scale = scaler.scale_ if getattr(scaler, "with_std", True) and scaler.scale_ is not None else np.ones(n_features)
+        self.inv_scale = np.ascontiguousarray(1.0 / np.asarray(scale, dtype=np.float64))
+        self.offset = np.ascontiguousarray(-np.asarray(mean, dtype=np.float64) * self.inv_scale)
+        self.dtype = np.float64  # Tipo de la matriz que retorna `transform` (ver `to_float32`)
+
+    @property
+    def n_features(self) -> int:
+        return len(self.columns)
+
+    def to_float32(self) -> "CompiledFeatureEncoder":
+        """
+        Copia del codificador cuyo `transform` retorna matrices float32. El escalado sigue en
+        float64 y el resultado se redondea una sola vez, igual que hacen sklearn y XGBoost con
+        una entrada float64: los árboles toman exactamente las mismas decisiones.
+        """
+        encoder = copy.copy(self)
+        encoder.dtype = np.float32
+        return encoder
+
+    def unknown(self, row: Dict) -> Dict:
+        """Retorna `{columna: valor}` con las categorías que los encoders no conocen."""
+        return {col: row[col] for col, vocabulary in self.vocabularies.items() if row[col] not in vocabulary}
+
+    def transform(self, rows: List[Dict]) -> np.ndarray:
+        """
+        Codifica y escala un lote de filas (todas con categorías conocidas, ver `unknown`)
+        en una matriz `(n_filas, n_features)`.
+        """
+        out = np.empty((len(rows), self.n_features), dtype=np.float64)
+        for i, row in enumerate(rows):
+            target = out[i]
+            for position, col, vocabulary in self._slots:
+                target[position] = vocabulary[row[col]] if vocabulary is not None else row[col]
+        out *= self.inv_scale
+        out += self.offset
+        return out if out.dtype == self.dtype else out.astype(self.dtype)
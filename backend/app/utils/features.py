@@ -0,0 +1,74 @@
+"""
+Definición común de las características de entrada de los modelos y utilidades
+para normalizar y deduplicar filas de autos.
+"""
+
+import hashlib
+import json
+from typing import Dict, List, Tuple
+
+# Columnas de entrada, en el mismo orden con el que se entrenaron los modelos
+FEATURE_COLUMNS = ["Brand", "Model", "Year", "Engine_Size", "Fuel_Type", "Transmission", "Mileage", "Doors", "Owner_Count"]
+
+# Variables categóricas codificadas con LabelEncoder en predicción y segmentación
+CATEGORICAL_COLUMNS = ["Brand", "Model", "Fuel_Type", "Transmission"]
+
+
+def canonical_key(car_data: Dict) -> Tuple:
+    """
+    Retorna una tupla canónica con las características del auto, útil como llave
+    de diccionario: dos filas con los mismos valores producen la misma llave.
+
+    Lanza:
+        ValueError: Si falta alguna de las columnas requeridas.
+    """
+    missing_columns = [col for col in FEATURE_COLUMNS if col not in car_data]
+    if missing_columns:
+        raise ValueError(f"Faltan las siguientes columnas: {missing_columns}")
+    return (
+        str(car_data["Brand"]),
+        str(car_data["Model"]),
+        int(car_data["Year"]),
+        float(car_data["Engine_Size"]),
+        str(car_data["Fuel_Type"]),
+        str(car_data["Transmission"]),
+        int(car_data["Mileage"]),
+        int(car_data["Doors"]),
+        int(car_data["Owner_Count"]),
+    )
+
+
+def input_fingerprint(car_data: Dict) -> str:
+    """
+    Retorna el hash SHA-256 (64 caracteres hexadecimales) de `canonical_key`: identifica los
+    datos de entrada de una predicción en una sola columna indexable (`predictions.fingerprint`).
+    Cambiar `canonical_key` invalida los valores guardados (habría que recalcularlos).
+
+    Lanza:
+        ValueError: Si falta alguna de las columnas requeridas.
+    """
+    payload = json.dumps(canonical_key(car_data), ensure_ascii=False, separators=(",", ":"))
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def deduplicate_rows(rows: List[Dict]) -> Tuple[List[Dict], List[int]]:
+    """
+    Elimina las filas repetidas de un lote.
+
+    Parámetros:
+        rows (list): Lista de diccionarios con las características de cada auto.
+
+    Retorna:
+        tuple: (`unique_rows`, `inverse`) donde `unique_rows[inverse[i]]` es la fila única
+        que corresponde a `rows[i]`.
+    """
+    positions: Dict[Tuple, int] = {}
+    unique_rows: List[Dict] = []
+    inverse: List[int] = []
+    for row in rows:
+        key = canonical_key(row)
+        if key not in positions:
+            positions[key] = len(unique_rows)
+            unique_rows.append(dict(zip(FEATURE_COLUMNS, key)))
+        inverse.append(positions[key])
+    return unique_rows, inverse
@@ -0,0 +1,178 @@
+"""
+Ejecutor acotado para sacar la inferencia del event loop de asyncio.
+
+Las rutas `async def` no deben llamar a los modelos directamente: una inferencia lenta
+bloquearía el loop y detendría todas las demás peticiones del worker (incluido `/auth/login`).
+`InferenceExecutor.run` envía la función a un pool de hilos (o de procesos, para modelos que
+retienen el GIL) y espera el resultado sin bloquear el loop.
+
+El número de tareas pendientes está acotado: al superar `max_queue` se rechaza la petición
+con `ExecutorSaturatedError` en lugar de acumular latencia sin límite.
+"""
+
+import asyncio
+import collections
+import multiprocessing
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Any, Callable, Dict, Tuple
+
+from app.utils.logger import logger
+from app.utils.micro_batcher import _percentile
+
+# Número de muestras recientes usadas para calcular percentiles de espera
+WAIT_SAMPLES = 1024
+
+
+class ExecutorSaturatedError(RuntimeError):
+    """La cola del ejecutor de inferencia está llena."""
+
+
+def _timed_call(func: Callable, args: Tuple, kwargs: Dict) -> Tuple[float, float, Any]:
+    """
+    Ejecuta `func` dentro del pool y retorna `(inicio, fin, resultado)` con reloj de pared,
+    comparable entre procesos, para medir la espera en cola y el tiempo de ejecución.
+    """
+    started_at = time.time()
+    result = func(*args, **kwargs)
+    return started_at, time.time(), result
+
+
+class InferenceExecutor:
+    """
+    Pool de hilos o procesos con cola acotada y métricas de espera.
+
+    Parámetros:
+        name (str): Nombre usado en logs y métricas.
+        kind (str): "thread" o "process". En "process" las funciones y sus argumentos deben
+            poder serializarse con pickle; los procesos se crean con `fork` y heredan los
+            modelos ya cargados en el registro.
+        max_workers (int): Hilos o procesos del pool.
+        max_queue (int): Máximo de tareas pendientes (en ejecución más en espera).
+    """
+
+    def __init__(self, name: str, kind: str = "thread", max_workers: int = 4, max_queue: int = 64):
+        if kind not in ("thread", "process"):
+            raise ValueError(f"Tipo de ejecutor '{kind}' no soportado. Debe ser 'thread' o 'process'.")
+        self.name = name
+        self.kind = kind
+        self.max_workers = max(int(max_workers), 1)
+        self.max_queue = max(int(max_queue), self.max_workers)
+        self._pool = None
+        self._pool_lock = threading.Lock()
+
+        # Métricas
+        self._stats_lock = threading.Lock()
+        self._pending = 0
+        self._max_pending = 0
+        self._submitted = 0
+        self._completed = 0
+        self._failed = 0
+        self._rejected = 0
+        self._wait_total = 0.0
+        self._wait_max = 0.0
+        self._wait_samples = collections.deque(maxlen=WAIT_SAMPLES)
+        self._run_total = 0.0
+
+    def _get_pool(self):
+        """Crea el pool en el primer uso (después de un posible `fork` del servidor)."""
+        if self._pool is None:
+            with self._pool_lock:
+                if self._pool is None:
+                    if self.kind == "process":
+                        self._pool = ProcessPoolExecutor(max_workers=self.max_workers,
+                                                         mp_context=multiprocessing.get_context("fork"))
+                    else:
+                        self._pool = ThreadPoolExecutor(max_workers=self.max_workers,
+                                                        thread_name_prefix=f"inference-{self.name}")
+        return self._pool
+
+    def _reserve(self) -> None:
+        with self._stats_lock:
+            if self._pending >= self.max_queue:
+                self._rejected += 1
+                raise ExecutorSaturatedError(
+                    f"Ejecutor de inferencia '{self.name}' saturado ({self._pending} tareas pendientes)."
+                )
+            self._pending += 1
+            self._submitted += 1
+            self._max_pending = max(self._max_pending, self._pending)
+
+    def _release(self, submitted_at: float, timing, failed: bool) -> None:
+        with self._stats_lock:
+            self._pending -= 1
+            if failed:
+                self._failed += 1
+                return
+            started_at, finished_at = timing
+            wait = max(started_at - submitted_at, 0.0)
+            self._completed += 1
+            self._wait_total += wait
+            self._wait_max = max(self._wait_max, wait)
+            self._wait_samples.append(wait)
+            self._run_total += finished_at - started_at
+
+    async def run(self, func: Callable, *args, **kwargs) -> Any:
+        """
+        Ejecuta `func(*args, **kwargs)` en el pool sin bloquear el event loop.
+
+        Lanza:
+            ExecutorSaturatedError: Si ya hay `max_queue` tareas pendientes.
+            Cualquier excepción lanzada por `func`.
+        """
+        self._reserve()
+        submitted_at = time.time()
+        try:
+            future = self._get_pool().submit(_timed_call, func, args, kwargs)
+            started_at, finished_at, result = await asyncio.wrap_future(future)
+        except BaseException:
+            self._release(submitted_at, None, failed=True)
+            raise
+        self._release(submitted_at, (started_at, finished_at), failed=False)
+        return result
+
+    def shutdown(self, wait: bool = True) -> None:
+        """Detiene el pool (se vuelve a crear en el siguiente uso)."""
+        with self._pool_lock:
+            pool, self._pool = self._pool, None
+        if pool is not None:
+            pool.shutdown(wait=wait)
+            logger.info(f"Ejecutor de inferencia '{self.name}' detenido.")
+
+    def recycle(self) -> None:
+        """
+        Reemplaza el pool por uno nuevo en la siguiente tarea; las tareas en curso terminan en
+        el anterior. En "process" los procesos nuevos heredan los modelos recién publicados
+        en el registro (los del pool anterior conservan la versión con la que se crearon).
+        """
+        with self._pool_lock:
+            pool, self._pool = self._pool, None
+        if pool is not None:
+            pool.shutdown(wait=False)
+            logger.info(f"Ejecutor de inferencia '{self.name}' reciclado.")
+
+    def stats(self) -> Dict:
+        """Retorna la longitud de la cola, los contadores y los tiempos de espera (ms)."""
+        with self._stats_lock:
+            samples = list(self._wait_samples)
+            completed = self._completed
+            return {
+                "kind": self.kind,
+                "max_workers": self.max_workers,
+                "max_queue": self.max_queue,
+                "pending": self._pending,
+                "queued": max(self._pending - self.max_workers, 0),
+                "max_pending": self._max_pending,
+                "submitted": self._submitted,
+                "completed": completed,
+                "failed": self._failed,
+                "rejected": self._rejected,
+                "wait_ms": {
+                    "avg": round(self._wait_total / completed * 1000, 3) if completed else 0.0,
+                    "p50": round(_percentile(samples, 50) * 1000, 3),
+                    "p99": round(_percentile(samples, 99) * 1000, 3),
+                    "max": round(self._wait_max * 1000, 3),
+                },
+                "avg_run_ms": round(self._run_total / completed * 1000, 3) if completed else 0.0,
+            }
@@ -0,0 +1,109 @@
+"""
+Motor de inferencia en NumPy para la variante aproximada del SVM de segmentación.
+
+El SVM exacto (`SVC(kernel='rbf')`) evalúa el kernel contra todos sus vectores de soporte en
+cada predicción, y ese número crece con el dataset. La variante aproximada (ver
+`train_svm_approx` en `ModelTrain/scripts/car_price_segmentation.py`) proyecta cada fila con un
+mapa de Nystroem de tamaño fijo y la clasifica con un modelo lineal. Como todo lo que sigue al
+kernel es lineal, la normalización de Nystroem y los coeficientes se fusionan al entrenar en una
+sola matriz, y cada lote cuesta dos multiplicaciones de matrices:
+
+    scores = exp(-gamma * ||x - c||²) @ weights + intercept
+
+Los arreglos se exportan al entrenar (ver `ModelTrain/handlers/export_weights.py`):
+
+    {
+        "format": "nystroem-linear/v1",
+        "components": array (componentes, columnas),
+        "gamma": float,
+        "weights": array (componentes, clases),   # normalization_.T @ coef_.T
+        "intercept": array (clases,),
+        "classes": array,
+    }
+"""
+
+from typing import Dict
+
+import numpy as np
+
+EXPORT_FORMAT = "nystroem-linear/v1"
+
+
+class NystroemLinearClassifier:
+    """
+    Clasificador lineal sobre el mapa de características RBF de Nystroem.
+
+    Parámetros:
+        components (array): Muestras de referencia del mapa `(componentes, columnas)`.
+        gamma (float): Parámetro del kernel RBF.
+        weights (array): Normalización y coeficientes fusionados `(componentes, clases)`.
+        intercept (array): Sesgo de cada clase (uno solo en clasificación binaria).
+        classes (array): Etiquetas de salida.
+        dtype: Precisión de los arreglos y del cálculo (float64 o float32).
+    """
+
+    def __init__(self, components: np.ndarray, gamma: float, weights: np.ndarray, intercept: np.ndarray,
+                 classes: np.ndarray, dtype=np.float64):
+        self.components = np.ascontiguousarray(components, dtype=dtype)
+        self.gamma = float(gamma)
+        self.weights = np.ascontiguousarray(weights, dtype=dtype)
+        self.intercept = np.asarray(intercept, dtype=dtype).reshape(-1)
+        self.classes = np.asarray(classes)
+        self._component_norms = (self.components ** 2).sum(axis=1)
+
+    # 🔹 Construcción y exportación
+    @classmethod
+    def from_export(cls, export: Dict) -> "NystroemLinearClassifier":
+        """Construye el clasificador a partir del diccionario exportado."""
+        if export.get("format") != EXPORT_FORMAT:
+            raise ValueError(f"Formato de pesos no soportado: {export.get('format')}")
+        return cls(export["components"], export["gamma"], export["weights"], export["intercept"], export["classes"])
+
+    def to_export(self) -> Dict:
+        """Retorna el diccionario exportable (ver la documentación del módulo)."""
+        return {
+            "format": EXPORT_FORMAT,
+            "components": self.components,
+            "gamma": self.gamma,
+            "weights": self.weights,
+            "intercept": self.intercept,
+            "classes": self.classes,
+        }
+
+    @classmethod
+    def from_sklearn(cls, pipeline) -> "NystroemLinearClassifier":
+        """Compila un pipeline `Nystroem(kernel="rbf") -> clasificador lineal` ajustado."""
+        nystroem, linear = pipeline[0], pipeline[-1]
+        if nystroem.kernel != "rbf":
+            raise ValueError(f"Kernel no soportado por el motor NumPy: {nystroem.kernel}")
+        gamma = nystroem.gamma if nystroem.gamma is not None else 1.0 / nystroem.components_.shape[1]
+        return cls(nystroem.components_, gamma, nystroem.normalization_.T @ linear.coef_.T,
+                   np.atleast_1d(linear.intercept_), linear.classes_)
+
+    def to_float32(self) -> "NystroemLinearClassifier":
+        """Copia del clasificador con arreglos float32."""
+        return NystroemLinearClassifier(self.components, self.gamma, self.weights, self.intercept, self.classes,
+                                        dtype=np.float32)
+
+    # 🔹 Inferencia
+    def decision_function(self, X: np.ndarray) -> np.ndarray:
+        """Puntajes del clasificador lineal `(n_filas, clases)` (una columna en binario)."""
+        X = np.asarray(X, dtype=self.components.dtype)
+        # ||x - c||² = ||x||² - 2 x·c + ||c||², acotado en 0 por redondeo
+        distances = X @ self.components.T
+        distances *= -2.0
+        distances += (X ** 2).sum(axis=1)[:, None]
+        distances += self._component_norms
+        np.maximum(distances, 0.0, out=distances)
+        distances *= distances.dtype.type(-self.gamma)
+        kernel = np.exp(distances, out=distances)
+        scores = kernel @ self.weights
+        scores += self.intercept
+        return scores
+
+    def predict(self, X: np.ndarray) -> np.ndarray:
+        """Etiqueta de cada fila (mismo criterio que `predict` del clasificador lineal)."""
+        scores = self.decision_function(X)
+        if scores.shape[1] == 1:
+            return self.classes[(scores[:, 0] > 0).astype(int)]
+        return self.classes[np.argmax(scores, axis=1)]
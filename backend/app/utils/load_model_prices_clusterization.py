@@ -2,10 +2,13 @@ import os
 # Limita el número de CPU utilizadas por joblib para evitar un consumo excesivo de recursos
 os.environ["LOKY_MAX_CPU_COUNT"] = "2"
 
-import joblib  # Librería para cargar y guardar modelos de machine learning
-import pandas as pd  # Librería para manipulación de datos en formato DataFrame
 from app.utils import logger  # Importación del logger para registrar eventos y errores
+from app.utils.model_registry import MODEL_REGISTRY, LazyMember, ModelRegistry, load_artifact  # Registro de modelos residentes
 import pathlib  # Manejo de rutas de archivos
+from app.utils.dbscan_index import DBSCANIndex  # Asignación a clusters de DBSCAN por muestras núcleo
+from app.utils.features import deduplicate_rows
+from app.utils.cluster_transformer import CompiledClusterTransformer  # Escalador + PCA fusionados
+from app.utils.onnx_inference import OnnxModel, family_backend, load_estimator  # Backend de onnxruntime
 #from models.handlers.save_to_json import save_prices_clusterization
 
 # ---------------------------
@@ -14,118 +17,137 @@ import pathlib  # Manejo de rutas de archivos
 
 # Definir la ruta base del proyecto, moviéndose cuatro niveles hacia arriba desde el archivo actual
 PATH_DIR = pathlib.Path(__file__).resolve().parent.parent.parent.parent
-def load_models_clusterization():
+ARTIFACTS_DIR = PATH_DIR / "models_cars/model_car_clusterization"
+
+def load_dbscan_index(artifacts_dir=ARTIFACTS_DIR, dbscan=None):
+    """
+    Carga el índice de muestras núcleo de DBSCAN (`dbscan_index.pkl`).
+    Si no existe, lo construye a partir del modelo DBSCAN ajustado (que puede ser un `LazyMember`).
+    """
+    index_path = pathlib.Path(artifacts_dir) / "dbscan_index.pkl"
+    if index_path.exists():
+        return DBSCANIndex.from_export(load_artifact(index_path))
+    logger.warning(f"No se encontró {index_path}; se construye el índice desde dbscan_cluster.pkl")
+    return DBSCANIndex.from_dbscan(dbscan.resolve() if isinstance(dbscan, LazyMember) else dbscan)
+
+@ModelRegistry.loader("clusterization", "models_cars/model_car_clusterization", members=("kmeans", "dbscan"))
+def load_models_clusterization(artifacts_dir=ARTIFACTS_DIR):
     """
-    Carga los modelos de clustering desde el directorio:
-    models_cars/model_car_clusterization/
+    Carga los modelos de clustering desde `artifacts_dir` (el paquete extraído o
+    models_cars/model_car_clusterization/).
 
     Retorna un diccionario con los modelos cargados o None en caso de error.
+    DBSCAN y su índice se cargan en su primer uso (`LazyMember`).
+    La invoca el registro de modelos (`MODEL_REGISTRY`) una sola vez por proceso.
     """
+    artifacts_dir = pathlib.Path(artifacts_dir)
     try:
         # Cargar modelos entrenados previamente con joblib
-        kmeans = joblib.load(PATH_DIR / "models_cars/model_car_clusterization/kmeans_cluster.pkl")  # Modelo K-Means
-        dbscan = joblib.load(PATH_DIR / "models_cars/model_car_clusterization/dbscan_cluster.pkl")  # Modelo DBSCAN
-        scaler = joblib.load(PATH_DIR / "models_cars/model_car_clusterization/scaler_cluster.pkl")  # Escalador de datos
-        pca = joblib.load(PATH_DIR / "models_cars/model_car_clusterization/pca_cluster.pkl")  # Reducción de dimensionalidad con PCA
-        encoder = joblib.load(PATH_DIR / "models_cars/model_car_clusterization/encoder.pkl")  # OneHotEncoder para variables categóricas
-        label_encoder = joblib.load(PATH_DIR / "models_cars/model_car_clusterization/encoder_model.pkl")  # LabelEncoder para modelos de autos
+        # Modelo K-Means (sesión de onnxruntime con `inference.backend.clusterization: "onnx"`)
+        kmeans = load_estimator(artifacts_dir / "kmeans_cluster.onnx",
+                                lambda: load_artifact(artifacts_dir / "kmeans_cluster.pkl"),
+                                family_backend("clusterization"))
+        dbscan = LazyMember(lambda: load_artifact(artifacts_dir / "dbscan_cluster.pkl"))  # Modelo DBSCAN
+        dbscan_index = LazyMember(lambda: load_dbscan_index(artifacts_dir, dbscan))  # KD-tree de muestras núcleo de DBSCAN
+        scaler = load_artifact(artifacts_dir / "scaler_cluster.pkl")  # Escalador de datos
+        pca = load_artifact(artifacts_dir / "pca_cluster.pkl")  # Reducción de dimensionalidad con PCA
+        encoder = load_artifact(artifacts_dir / "encoder.pkl")  # OneHotEncoder para variables categóricas
+        label_encoder = load_artifact(artifacts_dir / "encoder_model.pkl")  # LabelEncoder para modelos de autos
+        transformer = CompiledClusterTransformer(scaler, pca, encoder, label_encoder,
+                                                 None if isinstance(kmeans, OnnxModel) else kmeans)
         
         logger.info("Modelos de clusterización cargados correctamente.")
 
         return {
             'kmeans': kmeans,
             'dbscan': dbscan,
+            'dbscan_index': dbscan_index,
             'scaler': scaler,
             'pca': pca,
             'encoder': encoder,
-            'label_encoder': label_encoder
+            'label_encoder': label_encoder,
+            # Transformador compilado (one-hot precalculado, escalador + PCA en una sola multiplicación)
+            'transformer': transformer
         }
     except Exception as e:
         logger.exception("Error al cargar los modelos de clusterización")
         return None
-def prices_clusterization(new_car_data):
+def prices_clusterization_batch(cars, members=None):
+    """
+    Asigna un lote de autos a clusters (K-Means y DBSCAN) transformando toda la
+    matriz de una sola vez.
+
+    Las filas repetidas se calculan una sola vez y las filas con valores no vistos por
+    los encoders reciben su propio mensaje de error sin detener el lote.
+
+    Parámetros:
+        cars (list): Lista de diccionarios con las características de cada auto.
+        members (iterable, opcional): Modelos a evaluar ("kmeans", "dbscan"); por defecto ambos.
+
+    Retorna:
+        list: Un diccionario por fila, en el orden de entrada, con las llaves
+        `result` (clusters de los modelos seleccionados o None) y `error` (mensaje o None).
+    """
+    selected = ModelRegistry.select_members("clusterization", members)
+
+    # Modelos y encoders residentes en el registro (lanza RuntimeError si no se pudieron cargar)
+    clustering_models = MODEL_REGISTRY.get("clusterization")
+
+    # Calcular cada fila distinta una sola vez (lanza ValueError si faltan columnas)
+    unique_cars, inverse = deduplicate_rows(cars)
+
+    transformer = clustering_models['transformer']
+
+    # 🔹 Valores no vistos previamente en los encoders, por fila
+    unknown = [transformer.unknown(car) for car in unique_cars]
+    if any(unknown):
+        logger.warning(f"Valores desconocidos en los encoders: {[u for u in unknown if u]}. Se requiere actualizar el encoder.")
+        # save_prices_clusterization(new_car_data)
+
+    results = [{'result': None, 'error': f"Valores desconocidos: {u}" if u else None} for u in unknown]
+    valid = [i for i, u in enumerate(unknown) if not u]
+    if not valid:
+        return [results[i] for i in inverse]
+
+    # Proyectar al espacio PCA con una sola transformación afín (codificación, escalado y PCA)
+    df_pca = transformer.transform([unique_cars[i] for i in valid])
+
+    clusters = {}
+    if 'kmeans' in selected:
+        kmeans = clustering_models['kmeans']
+        if isinstance(kmeans, OnnxModel):
+            clusters['kmeans'] = kmeans.predict(df_pca)
+        else:
+            # Asignación de K-Means: centroide más cercano (una sola operación para todo el lote)
+            clusters['kmeans'] = transformer.kmeans_predict(df_pca)
+    if 'dbscan' in selected:
+        # DBSCAN no tiene `predict`: cada auto recibe el cluster de la muestra núcleo más
+        # cercana dentro de `eps`, o -1 (ruido) si no hay ninguna
+        clusters['dbscan'] = clustering_models['dbscan_index'].predict(df_pca)
+
+    for row, i in enumerate(valid):
+        results[i]['result'] = {member: int(values[row]) for member, values in clusters.items()}
+
+    return [results[i] for i in inverse]
+
+def prices_clusterization(new_car_data, members=None):
     """
     Asigna un auto a clusters usando modelos de clustering (K-Means y DBSCAN).
 
     Parámetros:
         new_car_data (dict): Diccionario con las características del auto.
+        members (iterable, opcional): Modelos a evaluar ("kmeans", "dbscan"); por defecto ambos.
 
     Retorna:
-        dict: Resultado con los clusters asignados por K-Means y DBSCAN.
+        dict: Resultado con los clusters asignados por los modelos seleccionados.
     """
+    selected = ModelRegistry.select_members("clusterization", members)
     try:
-        # Cargar modelos y encoders
-        clustering_models = load_models_clusterization()
-        if clustering_models is None:
-            raise RuntimeError("No se pudieron cargar los modelos de clusterización.")
-        
-        # Convertir el diccionario de entrada en un DataFrame de Pandas
-        df = pd.DataFrame([new_car_data])
-        
-        # Verificar que todas las columnas necesarias están presentes
-        required_columns = ["Brand", "Model", "Fuel_Type", "Transmission", "Year", "Engine_Size", "Mileage", "Doors", "Owner_Count"]
-        missing_columns = [col for col in required_columns if col not in df.columns]
-        if missing_columns:
-            raise ValueError(f"Faltan las siguientes columnas: {missing_columns}")
-
-        # 🔹 Diccionario para almacenar valores no vistos previamente en los encoders
-        unseen_data = {}
-
-        # Codificar la columna "Model" con LabelEncoder
-        try:
-            if df["Model"].iloc[0] not in clustering_models["label_encoder"].classes_:
-                unseen_data["Model"] = df["Model"].iloc[0]  # Guardar modelo no visto
-            else:
-                df["Model"] = clustering_models["label_encoder"].transform(df["Model"])
-        except Exception as e:
-            logger.exception(f"Error al codificar la columna 'Model': {e}")
-            raise
-        
-        # Aplicar OneHotEncoder a las variables categóricas
-        categorical_columns = ["Brand", "Fuel_Type", "Transmission"]
-        try:
-            for col in categorical_columns:
-                if df[col].iloc[0] not in clustering_models["encoder"].categories_[categorical_columns.index(col)]:
-                    unseen_data[col] = df[col].iloc[0]  # Guardar valores desconocidos
-            
-            # Si hay valores desconocidos, registrar advertencia y retornar None
-            if unseen_data:
-                logger.warning(f"Valores desconocidos en OneHotEncoder: {unseen_data}. Se requiere actualizar el encoder.")
-                # save_prices_clusterization(new_car_data)
-                return {"kmeans": None, "dbscan": None}
-
-            # Transformar las variables categóricas usando OneHotEncoder
-            encoded_df = pd.DataFrame(clustering_models["encoder"].transform(df[categorical_columns]),
-                                      columns=clustering_models["encoder"].get_feature_names_out(categorical_columns))
-        except Exception as e:
-            logger.exception(f"Error al aplicar OneHotEncoder: {e}")
-            raise
-        
-        # Eliminar las columnas categóricas originales y concatenar las codificadas
-        df = df.drop(columns=categorical_columns).reset_index(drop=True)
-        df = pd.concat([df, encoded_df], axis=1)
-        
-        # Normalizar los datos y aplicar PCA para reducción de dimensionalidad
-        try:
-            df_scaled = clustering_models['scaler'].transform(df)  # Normalización
-            df_pca = clustering_models['pca'].transform(df_scaled)  # Transformación PCA
-        except Exception as e:
-            logger.exception(f"Error en la normalización o PCA: {e}")
-            raise
-        
-        # Obtener la asignación de clusters
-        kmeans_cluster = clustering_models['kmeans'].predict(df_pca)[0]  # Predicción con K-Means
-        dbscan_labels = clustering_models['dbscan'].fit_predict(df_pca)  # Predicción con DBSCAN
-        dbscan_cluster = int(dbscan_labels[0]) if len(dbscan_labels) > 0 else None  # Asignación de cluster DBSCAN
-
-        return {
-            'kmeans': int(kmeans_cluster),
-            'dbscan': int(dbscan_cluster) if dbscan_cluster is not None else None
-        }
+        result = prices_clusterization_batch([new_car_data], selected)[0]['result']
+        if result is None:
+            return {member: None for member in selected}
+        return result
 
     except Exception as e:
         logger.error(f"Error en prices_clusterization: {e}")
-        return {
-            'kmeans': None,
-            'dbscan': None
-        }
\ No newline at end of file
+        return {member: None for member in selected}
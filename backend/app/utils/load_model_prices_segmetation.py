@@ -1,9 +1,15 @@
 import os
 os.environ["LOKY_MAX_CPU_COUNT"] = "2"
-import joblib
-import pandas as pd
 import pathlib
 from app.utils import logger
+from app.utils.model_registry import MODEL_REGISTRY, LazyMember, ModelRegistry, load_artifact
+from app.utils.features import deduplicate_rows
+from app.utils.feature_encoder import CompiledFeatureEncoder
+from app.utils.numpy_inference import DenseNetwork
+from app.utils.kernel_approx import NystroemLinearClassifier
+from app.utils.onnx_inference import family_backend, load_estimator
+from app.utils.tree_inference import load_forest
+from app.core.config import settings
 #from models.handlers.save_to_json import save_prices_segmentation
 # ---------------------------
 # Funciones para Segmentación (Clasificación de precios de autos)
@@ -11,20 +17,78 @@ from app.utils import logger
 
 # Definir la ruta base del proyecto, moviéndose cuatro niveles hacia arriba desde el archivo actual
 PATH_DIR = pathlib.Path(__file__).resolve().parent.parent.parent.parent
+ARTIFACTS_DIR = PATH_DIR / "models_cars/model_car_segmentation"
 
-def load_models_segmentation():
+def load_mlp(artifacts_dir=ARTIFACTS_DIR):
     """
-    Carga los modelos de segmentación y preprocesadores desde la carpeta:
-    models_cars/model_cars_segmentation/
+    Carga el MLP de segmentación como una `DenseNetwork` evaluada con NumPy.
+    Usa los pesos exportados (`mlp_weights.pkl`) si existen; si no, los extrae de `mlp_classifier.pkl`.
+    """
+    segmentation_dir = pathlib.Path(artifacts_dir)
+    weights_path = segmentation_dir / "mlp_weights.pkl"
+    if weights_path.exists():
+        return DenseNetwork.from_export(load_artifact(weights_path))
+    return DenseNetwork.from_sklearn_mlp(load_artifact(segmentation_dir / "mlp_classifier.pkl"))
+
+def load_svm(artifacts_dir=ARTIFACTS_DIR, variant="exact"):
+    """
+    Carga el SVM de segmentación según la variante configurada (`inference.svm_variant`).
+
+    - "exact": `SVC` con kernel RBF (`svm_classifier.pkl`).
+    - "approx": mapa de Nystroem + clasificador lineal evaluado con NumPy, desde los pesos
+      exportados (`svm_approx_weights.pkl`) o compilado desde `svm_approx_classifier.pkl`.
+      Si el modelo no se entrenó, se usa el SVM exacto.
+    """
+    segmentation_dir = pathlib.Path(artifacts_dir)
+    if variant == "approx":
+        weights_path = segmentation_dir / "svm_approx_weights.pkl"
+        if weights_path.exists():
+            return NystroemLinearClassifier.from_export(load_artifact(weights_path))
+        pipeline_path = segmentation_dir / "svm_approx_classifier.pkl"
+        if pipeline_path.exists():
+            return NystroemLinearClassifier.from_sklearn(load_artifact(pipeline_path))
+        logger.warning(f"No se encontró el SVM aproximado en {segmentation_dir}; se usa el SVM exacto.")
+    return load_artifact(segmentation_dir / "svm_classifier.pkl")
+
+@ModelRegistry.loader("segmentation", "models_cars/model_car_segmentation", members=("rf", "svm", "mlp"))
+def load_models_segmentation(artifacts_dir=ARTIFACTS_DIR):
+    """
+    Carga los modelos de segmentación y preprocesadores desde `artifacts_dir` (el paquete
+    extraído o models_cars/model_car_segmentation/).
     
     Retorna un diccionario con los modelos y herramientas de preprocesamiento cargados.
+    Los clasificadores (RF, SVM, MLP) se cargan en su primer uso (`LazyMember`).
+    La invoca el registro de modelos (`MODEL_REGISTRY`) una sola vez por proceso.
     """
-    rf_model = joblib.load(PATH_DIR /"models_cars/model_car_segmentation/rf_classifier.pkl")  # Random Forest
-    svm_model = joblib.load(PATH_DIR /"models_cars/model_car_segmentation/svm_classifier.pkl")  # SVM
-    mlp_model = joblib.load(PATH_DIR /"models_cars/model_car_segmentation/mlp_classifier.pkl")  # MLP (Red Neuronal)
-    scaler = joblib.load(PATH_DIR /"models_cars/model_car_segmentation/scaler_classifier.pkl")  # Escalador de datos
-    label_encoders = joblib.load(PATH_DIR /"models_cars/model_car_segmentation/label_encoders.pkl")  # Encoders para variables categóricas
-    le_segment = joblib.load(PATH_DIR /"models_cars/model_car_segmentation/labelencoder_price_segment.pkl")  # Encoder para etiquetas de segmentación
+    artifacts_dir = pathlib.Path(artifacts_dir)
+    # Con `inference.backend.segmentation: "onnx"` los clasificadores se ejecutan con onnxruntime
+    backend = family_backend("segmentation")
+    # Random Forest: arreglos compilados (mapeados en memoria si se exportaron al entrenar);
+    # los lotes grandes siguen usando el bosque de sklearn
+    rf_model = LazyMember(lambda: load_estimator(
+        artifacts_dir / "rf_classifier.onnx",
+        lambda: load_forest(
+            artifacts_dir / "rf_classifier.pkl",
+            artifacts_dir / "rf_classifier_flat.pkl",
+            engine=settings.TREE_ENGINE,
+            fallback_min_rows=settings.FLAT_FOREST_MAX_ROWS,
+            load=load_artifact,
+        ),
+        backend,
+    ))
+    # SVM exacto o aproximado (`inference.svm_variant`), expuesto siempre como "svm". skl2onnx no
+    # convierte Nystroem: la variante aproximada usa el motor NumPy también con el backend "onnx"
+    svm_variant = settings.SVM_VARIANT
+    svm_model = LazyMember(lambda: load_estimator(
+        artifacts_dir / "svm_classifier.onnx", lambda: load_svm(artifacts_dir, svm_variant),
+        backend if svm_variant == "exact" else "native",
+    ))
+    mlp_model = LazyMember(lambda: load_estimator(  # MLP (Red Neuronal) evaluado con NumPy u onnxruntime
+        artifacts_dir / "mlp_classifier.onnx", lambda: load_mlp(artifacts_dir), backend,
+    ))
+    scaler = load_artifact(artifacts_dir / "scaler_classifier.pkl")  # Escalador de datos
+    label_encoders = load_artifact(artifacts_dir / "label_encoders.pkl")  # Encoders para variables categóricas
+    le_segment = load_artifact(artifacts_dir / "labelencoder_price_segment.pkl")  # Encoder para etiquetas de segmentación
     
     return {
         'rf': rf_model,
@@ -32,16 +96,67 @@ def load_models_segmentation():
         'mlp': mlp_model,
         'scaler': scaler,
         'label_encoders': label_encoders,
-        'le_segment': le_segment
+        'le_segment': le_segment,
+        # Codificador compilado (búsqueda O(1) de categorías y escalado fusionado)
+        'feature_encoder': CompiledFeatureEncoder(label_encoders, scaler)
     }
 
-def prices_segmentation(new_car_data):
+def prices_segmentation_batch(cars, members=None):
+    """
+    Predice el segmento de precio de un lote de autos ejecutando cada clasificador
+    una sola vez sobre la matriz completa.
+
+    Las filas repetidas se calculan una sola vez y las filas con valores categóricos
+    desconocidos reciben su propio mensaje de error sin detener el lote.
+
+    Parámetros:
+        cars (list): Lista de diccionarios con las características de cada auto.
+        members (iterable, opcional): Clasificadores a evaluar ("rf", "svm", "mlp"); por defecto todos.
+            Los demás no se evalúan ni se cargan.
+
+    Retorna:
+        list: Un diccionario por fila, en el orden de entrada, con las llaves
+        `result` (etiqueta de cada modelo seleccionado o None) y `error` (mensaje o None).
+    """
+    selected = ModelRegistry.select_members("segmentation", members)
+
+    # Modelos y preprocesadores residentes en el registro
+    models = MODEL_REGISTRY.get("segmentation")
+
+    # Calcular cada fila distinta una sola vez
+    unique_cars, inverse = deduplicate_rows(cars)
+    encoder = models['feature_encoder']
+    unknown = [encoder.unknown(car) for car in unique_cars]
+
+    # Si hay valores desconocidos, registrar advertencia (solo esas filas quedan sin predicción)
+    if any(unknown):
+        logger.warning(f"⚠️ Valores desconocidos detectados: {[u for u in unknown if u]}")
+        #save_prices_segmentation(new_car_data)
+
+    results = [{'result': None, 'error': f"Valores desconocidos: {u}" if u else None} for u in unknown]
+    valid = [i for i, u in enumerate(unknown) if not u]
+    if valid:
+        # Codificar las variables categóricas y normalizar en un solo paso (sin DataFrame)
+        df_scaled = encoder.transform([unique_cars[i] for i in valid])
+
+        # Realizar predicciones con cada clasificador seleccionado (una llamada por modelo):
+        # 'rf' Random Forest, 'svm' Support Vector Machine, 'mlp' Multi-Layer Perceptron
+        labels = {member: models['le_segment'].inverse_transform(models[member].predict(df_scaled))
+                  for member in selected}
+
+        for row, i in enumerate(valid):
+            results[i]['result'] = {member: str(values[row]) for member, values in labels.items()}
+
+    return [results[i] for i in inverse]
+
+def prices_segmentation(new_car_data, members=None):
     """
     Recibe un diccionario con las características del auto y retorna la predicción 
     del segmento de precio (Barato, Medio o Caro) usando modelos de clasificación.
     
     Parámetros:
         new_car_data (dict): Diccionario con las características del auto.
+        members (iterable, opcional): Clasificadores a evaluar ("rf", "svm", "mlp"); por defecto todos.
     
     Ejemplo de entrada:
     {
@@ -57,46 +172,7 @@ def prices_segmentation(new_car_data):
     }
     
     Retorna:
-        dict: Diccionario con las predicciones de cada modelo de clasificación.
+        dict: Diccionario con las predicciones de cada modelo de clasificación,
+        o None si hay valores desconocidos.
     """
-    # Cargar los modelos y preprocesadores
-    models = load_models_segmentation()
-    df = pd.DataFrame([new_car_data])  # Convertir el diccionario en un DataFrame
-    
-    # Variables categóricas a transformar
-    categorical_columns = ["Brand", "Model", "Fuel_Type", "Transmission"]
-    unknown_values = {}  # Diccionario para almacenar valores no reconocidos
-    
-    # Verificar si hay valores desconocidos en las variables categóricas
-    for col in categorical_columns:
-        if df[col][0] not in models['label_encoders'][col].classes_:
-            unknown_values[col] = df[col][0]
-    
-    # Si hay valores desconocidos, detener la predicción y registrar advertencia
-    if unknown_values:
-        logger.warning(f"⚠️ Valores desconocidos detectados: {unknown_values}")
-        #save_prices_segmentation(new_car_data)
-        return None
-    
-    # Aplicar la transformación de las variables categóricas solo si son conocidas
-    for col in categorical_columns:
-        df[col] = models['label_encoders'][col].transform(df[col])
-    
-    # Normalizar los datos numéricos
-    df_scaled = models['scaler'].transform(df)
-    
-    # Realizar predicciones con cada modelo de clasificación
-    rf_pred = models['rf'].predict(df_scaled)[0]  # Random Forest
-    svm_pred = models['svm'].predict(df_scaled)[0]  # Support Vector Machine
-    mlp_pred = models['mlp'].predict(df_scaled)[0]  # Multi-Layer Perceptron
-    
-    # Convertir las predicciones numéricas a etiquetas originales
-    rf_label = models['le_segment'].inverse_transform([rf_pred])[0]
-    svm_label = models['le_segment'].inverse_transform([svm_pred])[0]
-    mlp_label = models['le_segment'].inverse_transform([mlp_pred])[0]
-    
-    return {
-        'rf': rf_label,
-        'svm': svm_label,
-        'mlp': mlp_label
-    }
\ No newline at end of file
+    return prices_segmentation_batch([new_car_data], members)[0]['result']
@@ -1,33 +1,137 @@
 import os
 os.environ["LOKY_MAX_CPU_COUNT"] = "2"
-import joblib
-import pandas as pd
-from tensorflow import keras
 #from models.handlers.save_to_json import save_prices_prediction
 from app.utils import logger
+from app.utils.model_registry import MODEL_REGISTRY, LazyMember, ModelRegistry, load_artifact
+from app.utils.features import deduplicate_rows
+from app.utils.feature_encoder import CompiledFeatureEncoder
+from app.utils.numpy_inference import DenseNetwork
+from app.utils.onnx_inference import family_backend, load_estimator
+from app.utils.tree_inference import load_forest
+from app.core.config import settings
 import pathlib
 PATH_DIR = pathlib.Path(__file__).resolve().parent.parent.parent.parent
-def load_models():
+ARTIFACTS_DIR = PATH_DIR / "models_cars/model_cars_prediction_prices"
+
+def load_dnn(artifacts_dir=ARTIFACTS_DIR):
+    """
+    Carga la DNN de precios como una `DenseNetwork` evaluada con NumPy.
+
+    Usa los pesos exportados (`dnn_weights.pkl`) si existen, de modo que TensorFlow no se
+    importa. Si no, carga `dnn_model.h5` con Keras una sola vez y extrae los pesos en memoria.
+    """
+    save_dir = pathlib.Path(artifacts_dir)
+    weights_path = save_dir / "dnn_weights.pkl"
+    if weights_path.exists():
+        return DenseNetwork.from_export(load_artifact(weights_path))
+
+    logger.warning(f"No se encontró {weights_path.name}; se importa TensorFlow para convertir dnn_model.h5. "
+                   "Ejecute el exportador de pesos para evitarlo.")
+    from tensorflow import keras  # Importación diferida: solo si no hay pesos exportados
+    return DenseNetwork.from_keras(keras.models.load_model(save_dir / "dnn_model.h5", compile=False))
+
+@ModelRegistry.loader("prediction", "models_cars/model_cars_prediction_prices", members=("rf", "xgb", "dnn"))
+def load_models(artifacts_dir=ARTIFACTS_DIR):
     """
     Carga los modelos de predicción (Random Forest, XGBoost y DNN),
-    el escalador y los codificadores de etiquetas desde la carpeta de modelos.
+    el escalador y los codificadores de etiquetas desde `artifacts_dir` (el paquete
+    extraído o models_cars/model_cars_prediction_prices/).
+
+    Los tres estimadores se cargan de forma perezosa (`LazyMember`): un estimador que
+    ninguna petición selecciona no se lee del disco (ver `artifacts.preload_members`).
+
+    No debe llamarse por petición: el registro de modelos (`MODEL_REGISTRY`) la invoca
+    una sola vez y mantiene los modelos residentes.
     """
-    rf_model = joblib.load(PATH_DIR / "models_cars/model_cars_prediction_prices/random_forest_model.pkl")
-    xgb_model = joblib.load(PATH_DIR / "models_cars/model_cars_prediction_prices/xgboost_model.pkl")
-    dnn_model = keras.models.load_model(PATH_DIR / "models_cars/model_cars_prediction_prices/dnn_model.h5", compile=False)
+    artifacts_dir = pathlib.Path(artifacts_dir)
+    # Con `inference.backend.prediction: "onnx"` los tres estimadores se ejecutan con onnxruntime
+    backend = family_backend("prediction")
+    # Random Forest: arreglos compilados (mapeados en memoria si se exportaron al entrenar);
+    # los lotes grandes siguen usando el bosque de sklearn
+    rf_model = LazyMember(lambda: load_estimator(
+        artifacts_dir / "random_forest_model.onnx",
+        lambda: load_forest(
+            artifacts_dir / "random_forest_model.pkl",
+            artifacts_dir / "random_forest_flat.pkl",
+            engine=settings.TREE_ENGINE,
+            fallback_min_rows=settings.FLAT_FOREST_MAX_ROWS,
+            load=load_artifact,
+        ),
+        backend, ravel=True,
+    ))
+    xgb_model = LazyMember(lambda: load_estimator(
+        artifacts_dir / "xgboost_model.onnx", lambda: load_artifact(artifacts_dir / "xgboost_model.pkl"),
+        backend, ravel=True,
+    ))
+    # La DNN conserva la forma [n, 1] de la red nativa
+    dnn_model = LazyMember(lambda: load_estimator(
+        artifacts_dir / "dnn_model.onnx", lambda: load_dnn(artifacts_dir), backend,
+    ))
     
-    scaler = joblib.load(PATH_DIR / "models_cars/model_cars_prediction_prices/scaler.pkl")
-    label_encoders = joblib.load(PATH_DIR / "models_cars/model_cars_prediction_prices/label_encoders.pkl")
+    scaler = load_artifact(artifacts_dir / "scaler.pkl")
+    label_encoders = load_artifact(artifacts_dir / "label_encoders.pkl")
     
     return {
         'rf': rf_model,
         'xgb': xgb_model,
         'dnn': dnn_model,
         'scaler': scaler,
-        'label_encoders': label_encoders
+        'label_encoders': label_encoders,
+        # Codificador compilado (búsqueda O(1) de categorías y escalado fusionado)
+        'feature_encoder': CompiledFeatureEncoder(label_encoders, scaler)
     }
 
-def prices_prediction(new_car_data):
+def prices_prediction_batch(cars, members=None):
+    """
+    Predice el precio de un lote de autos ejecutando cada modelo una sola vez sobre
+    la matriz completa.
+
+    Las filas repetidas dentro del lote se calculan una sola vez. Las filas con valores
+    categóricos desconocidos no detienen el lote: reciben su propio mensaje de error.
+
+    Parámetros:
+        cars (list): Lista de diccionarios con las características de cada auto.
+        members (iterable, opcional): Estimadores a evaluar ("rf", "xgb", "dnn"); por defecto todos.
+            Los demás no se evalúan ni se cargan.
+
+    Retorna:
+        list: Un diccionario por fila, en el mismo orden de entrada, con las llaves
+        `result` (predicciones de los modelos seleccionados o None) y `error` (mensaje o None).
+    """
+    selected = ModelRegistry.select_members("prediction", members)
+
+    # Modelos residentes en el registro (se cargan una sola vez por proceso)
+    models = MODEL_REGISTRY.get("prediction")
+
+    # Calcular cada fila distinta una sola vez
+    unique_cars, inverse = deduplicate_rows(cars)
+    encoder = models['feature_encoder']
+    unknown = [encoder.unknown(car) for car in unique_cars]
+    if any(unknown):
+        logger.info(f"⚠️ Valores desconocidos detectados: {[u for u in unknown if u]}")
+        #save_prices_prediction(new_car_data)
+
+    results = [{'result': None, 'error': f"Valores desconocidos: {u}" if u else None} for u in unknown]
+    valid = [i for i, u in enumerate(unknown) if not u]
+    if valid:
+        # Codificar las variables categóricas y normalizar en un solo paso (sin DataFrame)
+        new_data_scaled = encoder.transform([unique_cars[i] for i in valid])
+
+        # Una sola llamada por modelo seleccionado para todo el lote
+        predictions = {}
+        if 'rf' in selected:
+            predictions['rf'] = models['rf'].predict(new_data_scaled)
+        if 'xgb' in selected:
+            predictions['xgb'] = models['xgb'].predict(new_data_scaled)
+        if 'dnn' in selected:
+            predictions['dnn'] = models['dnn'].predict(new_data_scaled)[:, 0]
+
+        for row, i in enumerate(valid):
+            results[i]['result'] = {member: round(values[row].item(), 3) for member, values in predictions.items()}
+
+    return [results[i] for i in inverse]
+
+def prices_prediction(new_car_data, members=None):
     """
     Realiza la predicción del precio de un auto usando los modelos cargados.
     
@@ -42,45 +146,9 @@ def prices_prediction(new_car_data):
               "Mileage": 175273,
               "Doors": 3,
               "Owner_Count": 5 }
+        members (iterable, opcional): Estimadores a evaluar ("rf", "xgb", "dnn"); por defecto todos.
     
     Retorna:
-        dict: Predicciones de precio de cada modelo.
+        dict: Predicciones de precio de cada modelo, o None si hay valores desconocidos.
     """
-    models = load_models()
-    
-    # Convertir el diccionario a DataFrame
-    new_data = pd.DataFrame([new_car_data])
-    
-    # Codificar variables categóricas usando los codificadores cargados
-    categorical_columns = ["Brand", "Model", "Fuel_Type", "Transmission"]
-    unknown_values = {}
-    
-    
-    for col in categorical_columns:
-        if new_data[col][0] not in models['label_encoders'][col].classes_:
-            unknown_values[col] = new_data[col][0]
-    
-    
-    # Si hay valores desconocidos, guardarlos y no predecir
-    if unknown_values:
-        logger.info(f"⚠️ Valores desconocidos detectados: {unknown_values}")
-        #save_prices_prediction(new_car_data)
-        return None
-    
-    # Aplicar la transformación solo si todos los valores son conocidos
-    for col in categorical_columns:
-        new_data[col] = models['label_encoders'][col].transform(new_data[col])
-        
-    # Normalizar los datos usando el escalador cargado
-    new_data_scaled = models['scaler'].transform(new_data)
-    
-    # Realizar las predicciones con cada modelo
-    rf_prediction = models['rf'].predict(new_data_scaled)[0].item()
-    xgb_prediction = models['xgb'].predict(new_data_scaled)[0].item()
-    dnn_prediction = models['dnn'].predict(new_data_scaled)[0][0].item()
-    
-    return {
-        'rf': round(rf_prediction,3),
-        'xgb': round(xgb_prediction,3),
-        'dnn': round(dnn_prediction,3), #dnn_prediction
-    }
\ No newline at end of file
+    return prices_prediction_batch([new_car_data], members)[0]['result']
@@ -58,7 +58,8 @@ def setup_logger(
         datefmt="%d-%b-%y %H:%M:%S"
     )
 
-    # Configurar handler para archivo con rotación automática
+    # Configurar handler para archivo con rotación automática (crea la carpeta de logs si no existe)
+    pathlib.Path(log_file).parent.mkdir(parents=True, exist_ok=True)
     file_handler = RotatingFileHandler(log_file, maxBytes=max_bytes, backupCount=backup_count)
     file_handler.setFormatter(formatter)
     logger.addHandler(file_handler)
@@ -0,0 +1,169 @@
+"""
+Micro-batcher dinámico para las llamadas a los modelos.
+
+Agrupa las peticiones individuales que llegan de forma concurrente dentro de una ventana
+corta (p. ej. 2-5 ms, hasta `max_batch_size` filas) en una sola llamada a la función por
+lotes de la familia (`prices_*_batch`) y reparte los resultados a cada petición en espera.
+"""
+
+import collections
+import os
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from typing import Callable, Dict, List
+
+from app.utils.logger import logger
+
+# Límites superiores de los buckets del histograma de tamaños de lote
+BATCH_SIZE_BUCKETS = (1, 2, 4, 8, 16, 32, 64, 128, 256)
+HISTOGRAM_LABELS = [f"le_{b}" for b in BATCH_SIZE_BUCKETS] + [f"gt_{BATCH_SIZE_BUCKETS[-1]}"]
+
+# Número de muestras recientes usadas para calcular percentiles de espera
+WAIT_SAMPLES = 1024
+
+
+def _bucket_label(size: int) -> str:
+    """Etiqueta del bucket del histograma que corresponde a un tamaño de lote."""
+    for bucket in BATCH_SIZE_BUCKETS:
+        if size <= bucket:
+            return f"le_{bucket}"
+    return f"gt_{BATCH_SIZE_BUCKETS[-1]}"
+
+
+def _percentile(samples: List[float], q: float) -> float:
+    """Percentil `q` (0-100) de una lista de muestras; 0 si está vacía."""
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    return ordered[min(int(len(ordered) * q / 100), len(ordered) - 1)]
+
+
+class MicroBatcher:
+    """
+    Cola de agrupación frente a una función por lotes.
+
+    Parámetros:
+        name (str): Nombre usado en logs y métricas.
+        batch_func (callable): Función que recibe una lista de filas y retorna una lista
+            de resultados del mismo largo y en el mismo orden.
+        window_ms (float): Tiempo máximo que espera la primera fila de un lote a que lleguen más.
+        max_batch_size (int): Número máximo de filas por lote.
+    """
+
+    def __init__(self, name: str, batch_func: Callable[[List], List], window_ms: float = 3.0, max_batch_size: int = 32):
+        self.name = name
+        self.batch_func = batch_func
+        self.window = window_ms / 1000.0
+        self.max_batch_size = max(int(max_batch_size), 1)
+
+        self._queue: "queue.Queue" = queue.Queue()
+        self._thread = None
+        self._pid = None
+        self._start_lock = threading.Lock()
+
+        # Métricas
+        self._stats_lock = threading.Lock()
+        self._batches = 0
+        self._rows = 0
+        self._errors = 0
+        self._max_queue_depth = 0
+        self._histogram = collections.Counter()
+        self._wait_total = 0.0
+        self._wait_max = 0.0
+        self._wait_samples = collections.deque(maxlen=WAIT_SAMPLES)
+        self._run_total = 0.0
+
+    def _ensure_worker(self) -> None:
+        """Inicia el hilo consumidor (también tras un `fork`, donde los hilos no se heredan)."""
+        if self._thread is not None and self._pid == os.getpid():
+            return
+        with self._start_lock:
+            if self._thread is None or self._pid != os.getpid():
+                self._queue = queue.Queue()
+                self._pid = os.getpid()
+                self._thread = threading.Thread(target=self._run, name=f"micro-batcher-{self.name}", daemon=True)
+                self._thread.start()
+
+    def submit(self, row) -> Future:
+        """Encola una fila y retorna un `Future` con su resultado."""
+        self._ensure_worker()
+        future: Future = Future()
+        self._queue.put((row, future, time.perf_counter()))
+        depth = self._queue.qsize()
+        if depth > self._max_queue_depth:
+            with self._stats_lock:
+                self._max_queue_depth = max(self._max_queue_depth, depth)
+        return future
+
+    def __call__(self, row):
+        """Encola una fila y espera su resultado (propaga la excepción del lote si la hubo)."""
+        return self.submit(row).result()
+
+    def _collect(self) -> List:
+        """Bloquea hasta la primera fila y junta las que lleguen dentro de la ventana."""
+        items = [self._queue.get()]
+        deadline = items[0][2] + self.window
+        while len(items) < self.max_batch_size:
+            remaining = deadline - time.perf_counter()
+            try:
+                if remaining <= 0:
+                    # Ventana agotada: solo se toman las filas que ya estaban en cola
+                    items.append(self._queue.get_nowait())
+                else:
+                    items.append(self._queue.get(timeout=remaining))
+            except queue.Empty:
+                break
+        return items
+
+    def _run(self) -> None:
+        while True:
+            items = self._collect()
+            started = time.perf_counter()
+            waits = [started - enqueued for _, _, enqueued in items]
+            try:
+                outputs = self.batch_func([row for row, _, _ in items])
+                for (_, future, _), output in zip(items, outputs):
+                    future.set_result(output)
+                failed = False
+            except Exception as e:
+                logger.exception(f"Error en el lote de '{self.name}' ({len(items)} filas)")
+                for _, future, _ in items:
+                    future.set_exception(e)
+                failed = True
+            self._record(len(items), waits, time.perf_counter() - started, failed)
+
+    def _record(self, size: int, waits: List[float], run_seconds: float, failed: bool) -> None:
+        with self._stats_lock:
+            self._batches += 1
+            self._rows += size
+            self._errors += int(failed)
+            self._histogram[_bucket_label(size)] += 1
+            self._wait_total += sum(waits)
+            self._wait_max = max(self._wait_max, max(waits))
+            self._wait_samples.extend(waits)
+            self._run_total += run_seconds
+
+    def stats(self) -> Dict:
+        """Retorna la profundidad de cola, el histograma de tamaños de lote y los tiempos de espera."""
+        with self._stats_lock:
+            samples = list(self._wait_samples)
+            return {
+                "window_ms": self.window * 1000.0,
+                "max_batch_size": self.max_batch_size,
+                "queue_depth": self._queue.qsize(),
+                "max_queue_depth": self._max_queue_depth,
+                "batches": self._batches,
+                "rows": self._rows,
+                "errors": self._errors,
+                "avg_batch_size": round(self._rows / self._batches, 3) if self._batches else 0.0,
+                "batch_size_histogram": {label: self._histogram.get(label, 0) for label in HISTOGRAM_LABELS},
+                "wait_ms": {
+                    "avg": round(self._wait_total / self._rows * 1000.0, 4) if self._rows else 0.0,
+                    "p50": round(_percentile(samples, 50) * 1000.0, 4),
+                    "p99": round(_percentile(samples, 99) * 1000.0, 4),
+                    "max": round(self._wait_max * 1000.0, 4),
+                },
+                "avg_batch_run_ms": round(self._run_total / self._batches * 1000.0, 4) if self._batches else 0.0,
+            }
@@ -0,0 +1,149 @@
+"""
+Lectura de los paquetes versionados de modelos ("model-bundle/v1").
+
+Cada familia se despliega como un único `tar` sin comprimir generado al entrenar
+(ver `ModelTrain/handlers/model_bundle.py`), con `manifest.json` como primer miembro:
+orden de las columnas, vocabularios de los codificadores, versiones de sklearn/xgboost y
+el sha256 de cada artefacto.
+
+`extract_bundle` lee el paquete de una sola pasada secuencial, verifica cada checksum y
+deja los artefactos en un directorio propio de la versión (`<cache_dir>/<familia>-<versión>`).
+El directorio se publica con un `rename` atómico, así que solo la primera carga de una
+versión paga la extracción; las siguientes (otros workers, reinicios) solo leen el manifiesto.
+Los cargadores siguen leyendo archivos sueltos, por lo que el mapeo en memoria de
+`load_artifact` y la carga perezosa de los estimadores funcionan igual que con un directorio.
+"""
+
+import hashlib
+import json
+import os
+import pathlib
+import shutil
+import tarfile
+from typing import Dict, Optional, Tuple
+
+from app.utils.features import FEATURE_COLUMNS
+from app.utils.logger import logger
+
+BUNDLE_FORMAT = "model-bundle/v1"
+MANIFEST_NAME = "manifest.json"
+
+# Librerías cuya versión debe coincidir con la del entrenamiento para deserializar los pickles
+CHECKED_LIBRARIES = {"numpy": "numpy", "scikit-learn": "sklearn", "xgboost": "xgboost", "joblib": "joblib"}
+
+
+def _read_manifest(tar: tarfile.TarFile, path) -> Dict:
+    member = tar.next()
+    if member is None or member.name != MANIFEST_NAME:
+        raise ValueError(f"{path} no es un paquete de modelos: el primer miembro debe ser {MANIFEST_NAME}")
+    manifest = json.loads(tar.extractfile(member).read().decode("utf-8"))
+    if manifest.get("format") != BUNDLE_FORMAT:
+        raise ValueError(f"Formato de paquete no soportado: {manifest.get('format')}")
+    return manifest
+
+
+def read_manifest(path) -> Dict:
+    """Lee solo el manifiesto de un paquete (el primer miembro del tar)."""
+    with tarfile.open(path, "r|") as tar:
+        return _read_manifest(tar, path)
+
+
+def check_manifest(manifest: Dict, family: Optional[str] = None) -> None:
+    """
+    Valida que el paquete corresponda a la familia y al orden de columnas del backend.
+
+    Lanza:
+        ValueError: Si la familia o las columnas no coinciden.
+    """
+    if family is not None and manifest.get("family") != family:
+        raise ValueError(f"El paquete es de la familia '{manifest.get('family')}', se esperaba '{family}'.")
+    if list(manifest.get("features", [])) != list(FEATURE_COLUMNS):
+        raise ValueError(f"Columnas del paquete {manifest.get('features')} distintas de {FEATURE_COLUMNS}.")
+
+
+def library_mismatches(manifest: Dict) -> Dict[str, Tuple[Optional[str], Optional[str]]]:
+    """
+    Compara las versiones de las librerías del entrenamiento con las instaladas.
+
+    Retorna:
+        dict: {librería: (versión del paquete, versión instalada)} solo para las que difieren.
+    """
+    mismatches = {}
+    for name, module in CHECKED_LIBRARIES.items():
+        expected = manifest.get("libraries", {}).get(name)
+        if expected is None:
+            continue
+        try:
+            installed = __import__(module).__version__
+        except ImportError:
+            installed = None
+        if installed != expected:
+            mismatches[name] = (expected, installed)
+    return mismatches
+
+
+def _extract_verified(tar: tarfile.TarFile, manifest: Dict, target: pathlib.Path, path) -> None:
+    """Escribe los miembros restantes del tar en `target` verificando tamaño y sha256."""
+    expected = manifest["files"]
+    seen = set()
+    # `tar.next()` en lugar de iterar el tar: la iteración vuelve a entregar el manifiesto ya leído
+    member = tar.next()
+    while member is not None:
+        name = member.name
+        if not member.isfile() or name not in expected or name != os.path.basename(name) or name in seen:
+            raise ValueError(f"Miembro inesperado en {path}: {name}")
+        digest = hashlib.sha256()
+        source = tar.extractfile(member)
+        with open(target / name, "wb") as fs:
+            for chunk in iter(lambda: source.read(1 << 20), b""):
+                digest.update(chunk)
+                fs.write(chunk)
+        if member.size != expected[name]["size"] or digest.hexdigest() != expected[name]["sha256"]:
+            raise ValueError(f"Checksum inválido para {name} en {path}")
+        seen.add(name)
+        member = tar.next()
+    missing = sorted(set(expected).difference(seen))
+    if missing:
+        raise ValueError(f"Faltan artefactos en {path}: {missing}")
+
+
+def extract_bundle(path, cache_dir=None, family: Optional[str] = None) -> Tuple[Dict, pathlib.Path]:
+    """
+    Abre un paquete y retorna su manifiesto y el directorio con sus artefactos verificados.
+
+    Parámetros:
+        path: Ruta del paquete (puede ser el enlace `<familia>.tar` a la versión vigente).
+        cache_dir (opcional): Directorio de extracción; por defecto `.extracted` junto al paquete.
+        family (str, opcional): Familia esperada (ver `check_manifest`).
+
+    Lanza:
+        ValueError: Si el paquete no es válido o algún checksum no coincide.
+    """
+    path = pathlib.Path(path).resolve()
+    cache_dir = pathlib.Path(cache_dir) if cache_dir else path.parent / ".extracted"
+
+    with tarfile.open(path, "r|") as tar:
+        manifest = _read_manifest(tar, path)
+        check_manifest(manifest, family)
+        target = cache_dir / f"{manifest['family']}-{manifest['version']}"
+        if not target.is_dir():
+            cache_dir.mkdir(parents=True, exist_ok=True)
+            tmp_dir = cache_dir / f".{target.name}.{os.getpid()}.tmp"
+            shutil.rmtree(tmp_dir, ignore_errors=True)
+            tmp_dir.mkdir()
+            try:
+                _extract_verified(tar, manifest, tmp_dir, path)
+                os.rename(tmp_dir, target)
+            except OSError:
+                # Otro proceso publicó la misma versión primero: se usa la suya
+                shutil.rmtree(tmp_dir, ignore_errors=True)
+                if not target.is_dir():
+                    raise
+            except Exception:
+                shutil.rmtree(tmp_dir, ignore_errors=True)
+                raise
+            logger.info(f"Paquete {path.name} extraído en {target}")
+
+    for name, (expected, installed) in library_mismatches(manifest).items():
+        logger.warning(f"El paquete {path.name} se generó con {name} {expected} y está instalado {installed}.")
+    return manifest, target
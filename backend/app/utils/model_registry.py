@@ -0,0 +1,522 @@
+"""
+Registro de modelos compartido por todo el proceso.
+
+Los modelos de las tres familias (predicción, segmentación y clusterización) se cargan
+una sola vez (normalmente desde el `lifespan` de FastAPI) y se mantienen residentes en
+memoria. Las funciones `prices_*` obtienen referencias de solo lectura desde aquí en lugar
+de volver a leer los pickles y el `.h5` en cada petición.
+
+Los artefactos de cada familia se leen de su paquete versionado (`models_path` en config.yaml,
+ver `app/utils/model_bundle.py`) o, si no hay paquete, de su directorio en `models_cars/`.
+
+`reload` publica una versión nueva sin reiniciar: la carga (y calienta) aparte y reemplaza la
+instantánea con una sola asignación. Las peticiones en curso terminan con la instantánea que ya
+obtuvieron; la anterior se libera cuando la suelta la última de ellas.
+"""
+
+import contextlib
+import hashlib
+import os
+import pathlib
+import threading
+import time
+import weakref
+from types import MappingProxyType
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+import joblib
+
+from app.core.config import settings
+from app.utils.logger import logger
+from app.utils.model_bundle import extract_bundle, read_manifest
+
+# Ruta base del proyecto (mismo criterio que los cargadores de modelos)
+PATH_DIR = pathlib.Path(__file__).resolve().parent.parent.parent.parent
+
+# Familias de modelos disponibles, en el orden en que se cargan al iniciar la aplicación
+FAMILIES = ("prediction", "segmentation", "clusterization")
+
+
+def current_rss_bytes() -> int:
+    """
+    Retorna la memoria residente (RSS) actual del proceso en bytes.
+
+    Usa `/proc/self/statm` en Linux y `resource` como alternativa (en ese caso el valor
+    es el pico de RSS, no el actual). Retorna 0 si no se puede medir.
+    """
+    try:
+        with open("/proc/self/statm", "r", encoding="utf-8") as fs:
+            resident_pages = int(fs.read().split()[1])
+        return resident_pages * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError):
+        pass
+    try:
+        import resource
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+    except Exception:
+        return 0
+
+
+def artifacts_version(directory: pathlib.Path) -> str:
+    """
+    Calcula una versión corta para un directorio de artefactos a partir del nombre,
+    tamaño y fecha de modificación de cada archivo. Cambia cada vez que se reemplaza un modelo.
+    """
+    digest = hashlib.sha1()
+    if directory.is_dir():
+        for path in sorted(p for p in directory.iterdir() if p.is_file()):
+            stat = path.stat()
+            digest.update(f"{path.name}:{stat.st_size}:{stat.st_mtime_ns};".encode("utf-8"))
+    return digest.hexdigest()[:12]
+
+
+def load_artifact(path, mmap_mode: Optional[str] = None):
+    """
+    Carga un artefacto guardado con joblib.
+
+    Con `mmap_mode="r"` los arreglos de NumPy del archivo (sin comprimir) se mapean en memoria
+    de solo lectura en lugar de copiarse al heap: la carga es casi sin copias y las páginas
+    quedan en la caché del sistema, compartidas por todos los procesos que leen el archivo.
+    Si no se indica, se usa el modo del registro global (`artifacts.mmap_mode` en config.yaml).
+    """
+    return joblib.load(path, mmap_mode=mmap_mode if mmap_mode is not None else MODEL_REGISTRY.mmap_mode)
+
+
+class LazyMember:
+    """
+    Estimador de una familia que se carga en su primer uso.
+
+    Los cargadores envuelven así cada modelo del ensamble (RF, XGBoost, DNN, ...): si una
+    petición solo selecciona algunos (`members=`), los demás nunca se leen del disco.
+
+    Parámetros:
+        load (callable): Función sin argumentos que carga y retorna el modelo.
+    """
+
+    __slots__ = ("_load", "_value", "_lock", "load_seconds")
+
+    def __init__(self, load: Callable[[], object]):
+        self._load = load
+        self._value = None
+        self._lock = threading.Lock()
+        self.load_seconds = None
+
+    @property
+    def loaded(self) -> bool:
+        return self.load_seconds is not None
+
+    def resolve(self):
+        """Retorna el modelo, cargándolo una sola vez aunque lo pidan varios hilos a la vez."""
+        if self.load_seconds is None:
+            with self._lock:
+                if self.load_seconds is None:
+                    start = time.perf_counter()
+                    self._value = self._load()
+                    self.load_seconds = time.perf_counter() - start
+        return self._value
+
+
+class LoadedFamily:
+    """
+    Instantánea inmutable de una familia de modelos ya cargada.
+
+    Los valores `LazyMember` se cargan al accederlos por primera vez con `family[llave]`.
+
+    Atributos:
+        name (str): Nombre de la familia ("prediction", "segmentation" o "clusterization").
+        models (MappingProxyType): Modelos y preprocesadores (vista de solo lectura).
+        version (str): Versión de los artefactos a partir de los que se cargó.
+        manifest (dict | None): Manifiesto del paquete de origen (None si se cargó de un directorio).
+        load_seconds (float): Tiempo que tomó la carga.
+        memory_bytes (int): Incremento de memoria residente observado durante la carga.
+        loaded_at (float): Marca de tiempo (epoch) de la carga.
+    """
+
+    __slots__ = ("name", "models", "version", "manifest", "load_seconds", "memory_bytes", "loaded_at",
+                 "__weakref__")
+
+    def __init__(self, name: str, models: Dict, version: str, load_seconds: float, memory_bytes: int,
+                 manifest: Optional[Dict] = None):
+        self.name = name
+        self.models = MappingProxyType(dict(models))
+        self.version = version
+        self.manifest = manifest
+        self.load_seconds = load_seconds
+        self.memory_bytes = memory_bytes
+        self.loaded_at = time.time()
+
+    def __getitem__(self, key):
+        value = self.models[key]
+        return value.resolve() if isinstance(value, LazyMember) else value
+
+    def is_resident(self, key) -> bool:
+        """Indica si un modelo de la familia ya está en memoria (los perezosos, tras su primer uso)."""
+        value = self.models[key]
+        return value.loaded if isinstance(value, LazyMember) else True
+
+    def resolve_all(self) -> "LoadedFamily":
+        """Carga todos los modelos perezosos de la familia."""
+        for key in self.models:
+            self[key]
+        return self
+
+    def report(self) -> Dict:
+        """Retorna las métricas de carga de la familia."""
+        return {
+            "pending": sorted(key for key in self.models if not self.is_resident(key)),
+            "version": self.version,
+            "source": "bundle" if self.manifest else "directory",
+            "trained_at": self.manifest.get("created_at") if self.manifest else None,
+            "load_seconds": round(self.load_seconds, 4),
+            "memory_bytes": self.memory_bytes,
+            "memory_mb": round(self.memory_bytes / (1024 * 1024), 2),
+            "loaded_at": self.loaded_at,
+            "artifacts": sorted(self.models.keys()),
+        }
+
+
+class ModelRegistry:
+    """
+    Registro de las familias de modelos residentes en el proceso.
+
+    Cada familia se carga con la función registrada mediante `ModelRegistry.loader` y se
+    guarda como un `LoadedFamily`. `get` entrega siempre la instantánea vigente; si la
+    familia aún no se cargó, la carga en ese momento (carga perezosa). `reload` reemplaza
+    la instantánea de forma atómica (ver la documentación del módulo).
+    """
+
+    # Funciones de carga por familia: {familia: (función, subdirectorio de artefactos)}
+    _loaders: Dict[str, tuple] = {}
+
+    # Estimadores del ensamble de cada familia, en el orden de sus resultados
+    _members: Dict[str, Tuple[str, ...]] = {}
+
+    def __init__(self, base_dir: pathlib.Path = PATH_DIR, mmap_mode: Optional[str] = None,
+                 preload_members: bool = True, bundles: Optional[Dict[str, str]] = None,
+                 source: str = "auto", bundle_cache_dir: Optional[str] = None, precision: str = "float64"):
+        if source not in ("auto", "bundle", "directory"):
+            raise ValueError(f"Origen de artefactos '{source}' no soportado (auto, bundle o directory).")
+        if precision not in ("float64", "float32"):
+            raise ValueError(f"Precisión '{precision}' no soportada (float64 o float32).")
+        self.base_dir = pathlib.Path(base_dir)
+        self.mmap_mode = mmap_mode  # Modo de `load_artifact` ("r" = mapeo de solo lectura, None = copia)
+        self.preload_members = preload_members  # `load_all` carga también los estimadores perezosos
+        self.bundles = dict(bundles or {})  # {familia: paquete relativo a `base_dir`}
+        self.source = source  # "auto": paquete si existe, si no el directorio; "bundle"; "directory"
+        self.bundle_cache_dir = bundle_cache_dir  # Directorio de extracción (None = junto al paquete)
+        self.precision = precision  # "float32": convertir los modelos que lo permiten (ver app/utils/precision.py)
+        self._families: Dict[str, LoadedFamily] = {}
+        self._lock = threading.Lock()
+        self._load_lock = threading.RLock()
+        self._reload_lock = threading.Lock()
+        self._reloads: Dict[str, Dict] = {}  # Último reporte de recarga por familia
+        self._local = threading.local()  # Instantáneas fijadas por hilo (ver `override`)
+        self._subscribers: List[Callable[[str], None]] = []
+        self._reload_subscribers: List[Callable[[str], None]] = []  # Solo `reload` (ver `subscribe_reload`)
+
+    @classmethod
+    def loader(cls, family: str, artifacts_dir: str, members: Iterable[str] = ()) -> Callable:
+        """
+        Decorador para registrar la función que carga una familia de modelos.
+
+        Parámetros:
+            family (str): Nombre de la familia.
+            artifacts_dir (str): Subdirectorio (relativo a `base_dir`) con los artefactos.
+            members (iterable): Estimadores del ensamble que una petición puede seleccionar.
+
+        La función decorada recibe el directorio con los artefactos de la familia (el del
+        paquete extraído o `artifacts_dir`) y retorna un diccionario con los modelos.
+        """
+        def decorator(func: Callable) -> Callable:
+            cls._loaders[family] = (func, artifacts_dir)
+            cls._members[family] = tuple(members)
+            return func
+        return decorator
+
+    @classmethod
+    def select_members(cls, family: str, members: Optional[Iterable[str]] = None) -> Tuple[str, ...]:
+        """
+        Valida una selección de estimadores y la retorna en el orden de la familia.
+        Sin selección (None o vacía) se retornan todos.
+
+        Lanza:
+            ValueError: Si algún estimador no pertenece a la familia.
+        """
+        available = cls._members.get(family, ())
+        if not members:
+            return available
+        selected = set(members)
+        unknown = sorted(selected.difference(available))
+        if unknown:
+            raise ValueError(f"Modelos {unknown} no válidos para '{family}'. Opciones: {list(available)}")
+        return tuple(member for member in available if member in selected)
+
+    def subscribe(self, callback: Callable[[str], None]) -> Callable[[str], None]:
+        """
+        Registra una función que se invoca con el nombre de la familia cada vez que esta se
+        carga, se recarga o se libera (p. ej. para reemplazar los procesos de inferencia).
+        """
+        self._subscribers.append(callback)
+        return callback
+
+    def subscribe_reload(self, callback: Callable[[str], None]) -> Callable[[str], None]:
+        """
+        Registra una función que se invoca con el nombre de la familia solo cuando `reload`
+        publica una versión nueva; la primera carga y `clear` no la invocan (p. ej. para
+        invalidar la caché de resultados sin vaciarla al arrancar o al detener el worker).
+        """
+        self._reload_subscribers.append(callback)
+        return callback
+
+    def _notify(self, family: str, reloaded: bool = False) -> None:
+        callbacks = list(self._subscribers)
+        if reloaded:
+            callbacks += self._reload_subscribers
+        for callback in callbacks:
+            try:
+                callback(family)
+            except Exception:
+                logger.exception(f"Error al notificar el cambio de la familia '{family}'")
+
+    def artifacts_dir(self, family: str) -> pathlib.Path:
+        """Retorna el directorio de artefactos de una familia."""
+        return self.base_dir / self._loaders[family][1]
+
+    def bundle_path(self, family: str) -> Optional[pathlib.Path]:
+        """Retorna la ruta del paquete configurado para una familia (None si no hay)."""
+        bundle = self.bundles.get(family)
+        return self.base_dir / bundle if bundle else None
+
+    def resolve_artifacts(self, family: str) -> Tuple[pathlib.Path, str, Optional[Dict]]:
+        """
+        Determina de dónde se cargan los artefactos de una familia según `source`.
+
+        Retorna:
+            tuple: (directorio de artefactos, versión, manifiesto o None)
+
+        Lanza:
+            FileNotFoundError: Si `source="bundle"` y el paquete no existe.
+            ValueError: Si el paquete no es válido (ver `extract_bundle`).
+        """
+        bundle = self.bundle_path(family)
+        if self.source != "directory" and bundle is not None and bundle.exists():
+            manifest, directory = extract_bundle(bundle, self.bundle_cache_dir, family=family)
+            return directory, manifest["version"], manifest
+        if self.source == "bundle":
+            raise FileNotFoundError(f"No se encontró el paquete de '{family}': {bundle}")
+        directory = self.artifacts_dir(family)
+        return directory, artifacts_version(directory), None
+
+    def source_version(self, family: str) -> str:
+        """
+        Versión de los artefactos publicados en disco para una familia, sin cargarlos
+        (del paquete solo se lee el manifiesto). Difiere de `get(family).version` cuando
+        hay una versión nueva por cargar.
+        """
+        bundle = self.bundle_path(family)
+        if self.source != "directory" and bundle is not None and bundle.exists():
+            return read_manifest(bundle)["version"]
+        return artifacts_version(self.artifacts_dir(family))
+
+    def _build(self, family: str) -> LoadedFamily:
+        """Carga una familia de modelos sin publicarla (ver `load` y `reload`)."""
+        if family not in self._loaders:
+            raise ValueError(f"Familia de modelos '{family}' no registrada.")
+        load_func, _ = self._loaders[family]
+
+        rss_before = current_rss_bytes()
+        start = time.perf_counter()
+        try:
+            directory, version, manifest = self.resolve_artifacts(family)
+            models = load_func(directory)
+        except Exception as e:
+            logger.exception(f"Error al cargar la familia de modelos '{family}'")
+            raise RuntimeError(f"No se pudieron cargar los modelos de '{family}': {e}") from e
+        if models is None:
+            raise RuntimeError(f"No se pudieron cargar los modelos de '{family}'.")
+        if self.precision == "float32":
+            from app.utils.precision import reduce_precision
+            models = reduce_precision(models)
+        load_seconds = time.perf_counter() - start
+
+        return LoadedFamily(
+            name=family,
+            models=models,
+            version=version,
+            load_seconds=load_seconds,
+            memory_bytes=max(current_rss_bytes() - rss_before, 0),
+            manifest=manifest,
+        )
+
+    def load(self, family: str) -> LoadedFamily:
+        """
+        Carga (o recarga) una familia de modelos y la publica en el registro.
+
+        Lanza:
+            ValueError: Si la familia no existe.
+            RuntimeError: Si la función de carga falla o no retorna modelos.
+        """
+        loaded = self._build(family)
+        with self._lock:
+            self._families[family] = loaded
+        self._notify(family)
+        logger.info(
+            f"Familia '{family}' cargada en {loaded.load_seconds:.3f}s "
+            f"(+{loaded.memory_bytes / (1024 * 1024):.1f} MB, versión {loaded.version})."
+        )
+        return loaded
+
+    def reload(self, family: str, warm: Optional[Callable[[LoadedFamily], object]] = None) -> Dict:
+        """
+        Carga una versión nueva de la familia mientras la vigente sigue atendiendo peticiones,
+        la calienta y la publica con un intercambio atómico.
+
+        Las peticiones en curso terminan con la instantánea anterior, que se libera cuando la
+        última de ellas la suelta; el reporte se completa en ese momento (`drained`).
+
+        Parámetros:
+            family (str): Familia a recargar.
+            warm (callable, opcional): Recibe la instantánea nueva antes del intercambio; se
+                ejecuta con `override`, así que las funciones `prices_*` usan la nueva versión
+                en ese hilo. Su resultado se incluye en el reporte.
+
+        Retorna:
+            dict: Versiones, tiempos de carga, calentamiento e intercambio, y memoria durante la transición.
+
+        Lanza:
+            ValueError: Si la familia no existe.
+            RuntimeError: Si la nueva versión no se pudo cargar (la vigente no se modifica).
+        """
+        with self._reload_lock:
+            rss_before = current_rss_bytes()
+            candidate = self._build(family)
+            if self.preload_members:
+                candidate.resolve_all()
+            warmup = None
+            if warm is not None:
+                with self.override(family, candidate):
+                    warmup = warm(candidate)
+
+            # Ambas versiones residentes: el pico de memoria de la transición
+            rss_overlap = current_rss_bytes()
+            swap_start = time.perf_counter()
+            with self._lock:
+                previous = self._families.get(family)
+                self._families[family] = candidate
+            swap_seconds = time.perf_counter() - swap_start
+            self._notify(family, reloaded=True)
+
+            report = {
+                "family": family,
+                "previous_version": previous.version if previous is not None else None,
+                "version": candidate.version,
+                "load_seconds": round(candidate.load_seconds, 4),
+                "warmup": warmup,
+                "swap_ms": round(swap_seconds * 1000, 4),
+                "swapped_at": time.time(),
+                "rss_before_mb": round(rss_before / (1024 * 1024), 2),
+                "rss_overlap_mb": round(rss_overlap / (1024 * 1024), 2),
+                "overlap_mb": round(max(rss_overlap - rss_before, 0) / (1024 * 1024), 2),
+                "drained": previous is None,
+                "drain_seconds": 0.0 if previous is None else None,
+                "rss_after_drain_mb": None,
+            }
+            self._reloads[family] = report
+            if previous is not None:
+                weakref.finalize(previous, self._drained, report, time.perf_counter())
+                del previous
+            logger.info(f"Familia '{family}' recargada: {report['previous_version']} → {report['version']} "
+                        f"(intercambio {report['swap_ms']} ms, +{report['overlap_mb']} MB durante la transición).")
+            return report
+
+    @staticmethod
+    def _drained(report: Dict, swapped_at: float) -> None:
+        """Completa el reporte de recarga cuando se libera la instantánea anterior."""
+        report["drained"] = True
+        report["drain_seconds"] = round(time.perf_counter() - swapped_at, 4)
+        report["rss_after_drain_mb"] = round(current_rss_bytes() / (1024 * 1024), 2)
+        logger.info(f"Versión {report['previous_version']} de '{report['family']}' liberada "
+                    f"{report['drain_seconds']}s después del intercambio.")
+
+    def reload_report(self) -> Dict[str, Dict]:
+        """Retorna el reporte de la última recarga de cada familia."""
+        return {family: dict(report) for family, report in self._reloads.items()}
+
+    @contextlib.contextmanager
+    def override(self, family: str, loaded: LoadedFamily):
+        """
+        Fija una instantánea para `get(family)` solo en el hilo actual (p. ej. para calentar
+        o evaluar una versión que aún no se publica). Las demás peticiones no la ven.
+        """
+        previous = getattr(self._local, "overrides", None) or {}
+        self._local.overrides = {**previous, family: loaded}
+        try:
+            yield loaded
+        finally:
+            self._local.overrides = previous
+
+    def load_all(self) -> Dict[str, Dict]:
+        """
+        Carga todas las familias registradas. Un fallo en una familia se registra en el log
+        y no impide cargar las demás (la familia fallida se reintenta en la primera petición).
+
+        Retorna:
+            dict: Reporte del registro tras la carga (ver `report`).
+        """
+        for family in FAMILIES:
+            if family in self._loaders:
+                try:
+                    loaded = self.get(family)
+                except RuntimeError:
+                    continue
+                if self.preload_members:
+                    try:
+                        loaded.resolve_all()
+                    except Exception:
+                        # El estimador se reintenta cuando una petición lo seleccione
+                        logger.exception(f"Error al cargar los estimadores de la familia '{family}'")
+        return self.report()
+
+    def get(self, family: str) -> LoadedFamily:
+        """Retorna la instantánea vigente de una familia, cargándola si aún no está residente."""
+        overrides = getattr(self._local, "overrides", None)
+        if overrides and family in overrides:
+            return overrides[family]
+        loaded = self._families.get(family)
+        if loaded is None:
+            # Evita que varias peticiones concurrentes carguen la misma familia a la vez
+            with self._load_lock:
+                loaded = self._families.get(family)
+                if loaded is None:
+                    loaded = self.load(family)
+        return loaded
+
+    def is_loaded(self, family: str) -> bool:
+        """Indica si una familia ya está residente en memoria."""
+        return family in self._families
+
+    def clear(self) -> None:
+        """Libera todas las familias cargadas."""
+        with self._lock:
+            families = list(self._families)
+            self._families.clear()
+        for family in families:
+            self._notify(family)
+
+    def report(self) -> Dict[str, Optional[Dict]]:
+        """
+        Retorna el tiempo de carga y la memoria por familia.
+        Las familias que no están cargadas aparecen con valor None.
+        """
+        families = dict(self._families)
+        return {family: (families[family].report() if family in families else None)
+                for family in FAMILIES if family in self._loaders}
+
+
+# Registro global utilizado por la aplicación
+MODEL_REGISTRY = ModelRegistry(mmap_mode=settings.ARTIFACTS_MMAP_MODE,
+                               preload_members=settings.ARTIFACTS_PRELOAD_MEMBERS,
+                               bundles=settings.MODELS_PATH,
+                               source=settings.ARTIFACTS_SOURCE,
+                               bundle_cache_dir=settings.ARTIFACTS_BUNDLE_CACHE_DIR,
+                               precision=settings.INFERENCE_PRECISION)
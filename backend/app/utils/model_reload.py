@@ -0,0 +1,135 @@
+"""
+Recarga en caliente de las familias de modelos.
+
+`reload_models` carga cada familia nueva aparte, la calienta con las mismas funciones por
+lotes que usan las rutas (ver `app/utils/warmup.py`) y la publica con `ModelRegistry.reload`.
+El worker sigue listo durante la recarga: las peticiones se atienden con la versión vigente
+hasta el intercambio y las que ya estaban en curso terminan con ella.
+
+`ArtifactWatcher` revisa periódicamente la versión publicada en disco de cada familia
+(el manifiesto del paquete o el directorio de artefactos) y recarga las que cambiaron.
+En el modo pre-fork cada worker tiene su propio registro: `POST /api/models/reload` solo
+recarga el worker que atiende la petición, mientras que el vigilante corre en cada worker.
+"""
+
+import threading
+from typing import Dict, Iterable, Optional
+
+from app.utils.logger import logger
+from app.utils.model_registry import FAMILIES, MODEL_REGISTRY, LoadedFamily
+from app.utils.warmup import default_warmup_functions, load_sample_rows, run_warmup
+
+
+def warm_candidate(family: str, dataset_path=None, sample_rows: int = 64, batch_sizes=(1, 8, 32),
+                   repeats: int = 2):
+    """
+    Retorna la función de calentamiento que `ModelRegistry.reload` ejecuta sobre la versión nueva
+    (el registro la fija con `override`, así que las funciones por lotes usan esa versión).
+    """
+    rows = load_sample_rows(dataset_path, sample_rows)
+    functions = {family: default_warmup_functions()[family]}
+
+    def warm(candidate: LoadedFamily) -> Dict:
+        return run_warmup(rows, batch_sizes, repeats, functions)["families"][family]
+    return warm
+
+
+def reload_models(families: Optional[Iterable[str]] = None, warm: bool = True, **warmup_options) -> Dict[str, Dict]:
+    """
+    Recarga las familias indicadas (por defecto todas las registradas), una a la vez.
+    Una familia que falla conserva su versión vigente y no impide recargar las demás.
+
+    Parámetros:
+        families (iterable, opcional): Familias a recargar.
+        warm (bool): Calentar cada versión nueva antes de publicarla.
+        warmup_options: Opciones de `warm_candidate` (dataset_path, sample_rows, batch_sizes, repeats).
+
+    Retorna:
+        dict: {familia: reporte de `ModelRegistry.reload` o {"error": mensaje}}
+
+    Lanza:
+        ValueError: Si alguna familia no existe.
+    """
+    registered = list(MODEL_REGISTRY.report())
+    families = list(families) if families else registered
+    unknown = sorted(set(families).difference(registered))
+    if unknown:
+        raise ValueError(f"Familias {unknown} no válidas. Opciones: {registered}")
+
+    reports = {}
+    for family in families:
+        try:
+            reports[family] = MODEL_REGISTRY.reload(
+                family, warm=warm_candidate(family, **warmup_options) if warm else None)
+        except RuntimeError as e:
+            reports[family] = {"family": family, "error": str(e)}
+    return reports
+
+
+class ArtifactWatcher:
+    """
+    Hilo que recarga una familia cuando cambia la versión de sus artefactos en disco.
+
+    Un cambio se aplica cuando se observa la misma versión nueva en dos revisiones seguidas,
+    para no cargar un directorio que todavía se está copiando. Una versión que falla al
+    cargarse no se reintenta hasta que vuelva a cambiar.
+
+    Parámetros:
+        poll_seconds (float): Intervalo entre revisiones.
+        warm (bool): Calentar cada versión nueva antes de publicarla.
+        warmup_options: Opciones de `warm_candidate`.
+    """
+
+    def __init__(self, poll_seconds: float = 10.0, warm: bool = True, **warmup_options):
+        self.poll_seconds = max(float(poll_seconds), 0.1)
+        self.warm = warm
+        self.warmup_options = warmup_options
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._pending: Dict[str, str] = {}  # Versión nueva vista en la revisión anterior
+        self._failed: Dict[str, str] = {}  # Última versión que no se pudo cargar
+
+    def check(self) -> Dict[str, Dict]:
+        """Revisa todas las familias cargadas una vez y recarga las que cambiaron."""
+        reports = {}
+        for family in FAMILIES:
+            if not MODEL_REGISTRY.is_loaded(family):
+                continue
+            try:
+                version = MODEL_REGISTRY.source_version(family)
+            except (OSError, ValueError) as e:
+                logger.warning(f"No se pudo leer la versión de los artefactos de '{family}': {e}")
+                continue
+            if version == MODEL_REGISTRY.get(family).version or version == self._failed.get(family):
+                self._pending.pop(family, None)
+                continue
+            if self._pending.get(family) != version:
+                self._pending[family] = version
+                continue
+            self._pending.pop(family, None)
+            logger.info(f"Nueva versión de '{family}' detectada ({version}); recargando.")
+            report = reload_models([family], self.warm, **self.warmup_options)[family]
+            if "error" in report:
+                self._failed[family] = version
+            reports[family] = report
+        return reports
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.poll_seconds):
+            try:
+                self.check()
+            except Exception:
+                logger.exception("Error al revisar los artefactos de los modelos")
+
+    def start(self) -> "ArtifactWatcher":
+        if self._thread is None:
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name="artifact-watcher", daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
@@ -0,0 +1,170 @@
+"""
+Motor de inferencia en NumPy para redes densas pequeñas.
+
+Reproduce el `predict` de la DNN de precios (Keras: Dense(64)-Dense(64)-Dense(1)) y del
+`MLPClassifier(hidden_layer_sizes=(128, 128))` de segmentación con multiplicaciones de
+matrices (BLAS), sin importar TensorFlow ni pasar por el despacho de Keras/sklearn.
+
+Los pesos se exportan una sola vez (ver `ModelTrain/handlers/export_weights.py`) como un
+diccionario guardado con joblib:
+
+    {
+        "format": "dense-network/v1",
+        "task": "regression" | "classification",
+        "weights": [W0, W1, ...],      # matrices (entradas, salidas)
+        "biases": [b0, b1, ...],
+        "activations": ["relu", ..., "linear" | "softmax" | "logistic"],
+        "classes": array | None,       # solo para clasificación
+    }
+"""
+
+from typing import Dict, List, Optional
+
+import numpy as np
+
+EXPORT_FORMAT = "dense-network/v1"
+
+
+def _relu(x):
+    return np.maximum(x, 0, out=x)
+
+
+def _identity(x):
+    return x
+
+
+def _tanh(x):
+    return np.tanh(x, out=x)
+
+
+def _logistic(x):
+    # Igual que sklearn: 1 / (1 + exp(-x)) evaluado en el lugar
+    np.negative(x, out=x)
+    np.exp(x, out=x)
+    x += 1
+    return np.reciprocal(x, out=x)
+
+
+def _softmax(x):
+    x -= x.max(axis=1, keepdims=True)
+    np.exp(x, out=x)
+    x /= x.sum(axis=1, keepdims=True)
+    return x
+
+
+# Nombres de activación de Keras y de sklearn
+ACTIVATIONS = {
+    "relu": _relu,
+    "linear": _identity,
+    "identity": _identity,
+    "tanh": _tanh,
+    "logistic": _logistic,
+    "sigmoid": _logistic,
+    "softmax": _softmax,
+}
+
+
+class DenseNetwork:
+    """
+    Red densa (perceptrón multicapa) evaluada con NumPy.
+
+    Parámetros:
+        weights (list): Matrices de pesos `(entradas, salidas)` de cada capa.
+        biases (list): Vectores de sesgo de cada capa.
+        activations (list): Nombre de la activación de cada capa.
+        task (str): "regression" o "classification".
+        classes (array, opcional): Etiquetas de salida para clasificación.
+    """
+
+    def __init__(self, weights: List[np.ndarray], biases: List[np.ndarray], activations: List[str],
+                 task: str = "regression", classes: Optional[np.ndarray] = None):
+        if not (len(weights) == len(biases) == len(activations)):
+            raise ValueError("weights, biases y activations deben tener el mismo número de capas.")
+        unknown = [name for name in activations if name not in ACTIVATIONS]
+        if unknown:
+            raise ValueError(f"Activaciones no soportadas: {unknown}")
+        self.weights = [np.ascontiguousarray(w) for w in weights]
+        self.biases = [np.ascontiguousarray(b).reshape(-1) for b in biases]
+        self.activations = list(activations)
+        self._activation_funcs = [ACTIVATIONS[name] for name in self.activations]
+        self.task = task
+        self.classes = None if classes is None else np.asarray(classes)
+
+    # 🔹 Construcción y exportación
+    @classmethod
+    def from_export(cls, export: Dict) -> "DenseNetwork":
+        """Construye la red a partir del diccionario exportado."""
+        if export.get("format") != EXPORT_FORMAT:
+            raise ValueError(f"Formato de pesos no soportado: {export.get('format')}")
+        return cls(export["weights"], export["biases"], export["activations"],
+                   task=export.get("task", "regression"), classes=export.get("classes"))
+
+    def to_export(self) -> Dict:
+        """Retorna el diccionario exportable (ver la documentación del módulo)."""
+        return {
+            "format": EXPORT_FORMAT,
+            "task": self.task,
+            "weights": self.weights,
+            "biases": self.biases,
+            "activations": self.activations,
+            "classes": self.classes,
+        }
+
+    @classmethod
+    def from_keras(cls, model) -> "DenseNetwork":
+        """Extrae los pesos de un modelo Keras secuencial formado solo por capas `Dense`."""
+        weights, biases, activations = [], [], []
+        for layer in model.layers:
+            if type(layer).__name__ == "InputLayer":
+                continue
+            if type(layer).__name__ != "Dense":
+                raise ValueError(f"Capa no soportada por el motor NumPy: {type(layer).__name__}")
+            kernel, bias = layer.get_weights()
+            weights.append(np.asarray(kernel))
+            biases.append(np.asarray(bias))
+            activations.append(layer.activation.__name__)
+        return cls(weights, biases, activations, task="regression")
+
+    @classmethod
+    def from_sklearn_mlp(cls, mlp) -> "DenseNetwork":
+        """Extrae los pesos de un `MLPClassifier` o `MLPRegressor` ajustado."""
+        n_layers = len(mlp.coefs_)
+        activations = [mlp.activation] * (n_layers - 1) + [mlp.out_activation_]
+        is_classifier = hasattr(mlp, "classes_")
+        return cls(mlp.coefs_, mlp.intercepts_, activations,
+                   task="classification" if is_classifier else "regression",
+                   classes=mlp.classes_ if is_classifier else None)
+
+    def to_float32(self) -> "DenseNetwork":
+        """Copia de la red con pesos float32 (`forward` evalúa en la precisión de los pesos)."""
+        return DenseNetwork([w.astype(np.float32) for w in self.weights], [b.astype(np.float32) for b in self.biases],
+                            self.activations, task=self.task, classes=self.classes)
+
+    # 🔹 Inferencia
+    def forward(self, X: np.ndarray) -> np.ndarray:
+        """Evalúa la red y retorna la salida de la última capa `(n_filas, n_salidas)`."""
+        activation = np.asarray(X, dtype=self.weights[0].dtype)
+        for W, b, func in zip(self.weights, self.biases, self._activation_funcs):
+            activation = activation @ W
+            activation += b
+            activation = func(activation)
+        return activation
+
+    def predict_proba(self, X: np.ndarray) -> np.ndarray:
+        """Probabilidades por clase (mismo criterio que `MLPClassifier.predict_proba`)."""
+        output = self.forward(X)
+        if output.shape[1] == 1:
+            output = np.hstack([1 - output, output])
+        return output
+
+    def predict(self, X: np.ndarray) -> np.ndarray:
+        """
+        Regresión: retorna `(n_filas, n_salidas)` como `keras.Model.predict`.
+        Clasificación: retorna la etiqueta de cada fila como `MLPClassifier.predict`.
+        """
+        output = self.forward(X)
+        if self.task != "classification":
+            return output
+        if output.shape[1] == 1:
+            return self.classes[(output[:, 0] > 0.5).astype(int)]
+        return self.classes[np.argmax(output, axis=1)]
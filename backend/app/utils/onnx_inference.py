@@ -0,0 +1,90 @@
+"""
+Backend de inferencia con onnxruntime (proveedor de CPU).
+
+Los estimadores exportados al entrenar (ver `ModelTrain/handlers/export_onnx.py`) se cargan
+como `OnnxModel`, que expone el mismo `predict` que su versión de sklearn/XGBoost/NumPy: las
+funciones `prices_*` no cambian y el backend se elige por familia con `inference.backend`
+en config.yaml. La codificación y el escalado siguen en NumPy (`CompiledFeatureEncoder`,
+`CompiledClusterTransformer`); onnxruntime solo reemplaza a los estimadores.
+
+Los hilos de cada sesión se controlan con `inference.onnx_intra_op_threads` e
+`inference.onnx_inter_op_threads`. Con más de un hilo intra-op, onnxruntime crea su propio pool
+al abrir la sesión: en el modo pre-fork conviene mantener 1 (o `preload_members: false`), porque
+los hilos creados en el padre no existen en los workers.
+
+onnxruntime se importa solo si alguna familia usa este backend.
+"""
+
+import pathlib
+from typing import Callable, Optional
+
+import numpy as np
+
+from app.core.config import settings
+from app.utils.logger import logger
+
+
+class OnnxModel:
+    """
+    Sesión de onnxruntime con la interfaz `predict` de los estimadores nativos.
+
+    Parámetros:
+        path: Ruta del modelo `.onnx` (entrada única float32 `[n_filas, n_columnas]`).
+        output (str, opcional): Salida que retorna `predict`; por defecto la primera
+            (`variable` en regresión, `label` en clasificación y K-Means).
+        ravel (bool): Aplanar la salida a una dimensión (regresores de árboles `[n, 1]` → `[n]`).
+        intra_op_threads (int, opcional): Hilos para paralelizar cada operador (0 = los de
+            onnxruntime); por defecto `inference.onnx_intra_op_threads`.
+        inter_op_threads (int, opcional): Hilos para ejecutar operadores independientes en
+            paralelo; por defecto `inference.onnx_inter_op_threads`.
+    """
+
+    def __init__(self, path, output: Optional[str] = None, ravel: bool = False,
+                 intra_op_threads: Optional[int] = None, inter_op_threads: Optional[int] = None):
+        import onnxruntime as ort  # Importación diferida: solo con el backend "onnx"
+
+        options = ort.SessionOptions()
+        options.intra_op_num_threads = int(settings.ONNX_INTRA_OP_THREADS if intra_op_threads is None
+                                           else intra_op_threads)
+        options.inter_op_num_threads = int(settings.ONNX_INTER_OP_THREADS if inter_op_threads is None
+                                           else inter_op_threads)
+        options.execution_mode = ort.ExecutionMode.ORT_SEQUENTIAL
+        options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        self.path = pathlib.Path(path)
+        self.session = ort.InferenceSession(str(self.path), sess_options=options,
+                                            providers=["CPUExecutionProvider"])
+        self.input_name = self.session.get_inputs()[0].name
+        self.output = output or self.session.get_outputs()[0].name
+        self.ravel = ravel
+
+    def predict(self, X) -> np.ndarray:
+        """Ejecuta el modelo sobre la matriz `X` (se convierte a float32 contiguo)."""
+        X32 = np.ascontiguousarray(X, dtype=np.float32)
+        result = self.session.run([self.output], {self.input_name: X32})[0]
+        return result.ravel() if self.ravel else result
+
+
+def family_backend(family: str) -> str:
+    """Backend de inferencia configurado para una familia ("native" u "onnx")."""
+    return settings.INFERENCE_BACKENDS.get(family, "native")
+
+
+def load_estimator(onnx_path, native: Callable[[], object], backend: str = "native", **options):
+    """
+    Carga un estimador con el backend configurado.
+
+    Con `backend="onnx"` usa el `.onnx` exportado al entrenar; si no existe, registra una
+    advertencia y usa el estimador nativo (`native()`), igual que sin exportación.
+
+    Parámetros:
+        onnx_path: Ruta del modelo ONNX.
+        native (callable): Carga el estimador nativo (sklearn, XGBoost o NumPy).
+        backend (str): "native" u "onnx".
+        options: Parámetros de `OnnxModel` (`output`, `ravel`, hilos).
+    """
+    if backend == "onnx":
+        if pathlib.Path(onnx_path).exists():
+            return OnnxModel(onnx_path, **options)
+        logger.warning(f"No se encontró {onnx_path}; se usa el estimador nativo. "
+                       "Ejecute el exportador ONNX para usar onnxruntime.")
+    return native()
@@ -0,0 +1,70 @@
+"""
+Modo de inferencia en precisión reducida (float32).
+
+Con `inference.precision: "float32"` el registro convierte cada familia al cargarla: los motores
+propios (`FlatForest`, `DenseNetwork`, `NystroemLinearClassifier`, `CompiledFeatureEncoder`,
+`CompiledClusterTransformer`) exponen `to_float32()` y pasan a guardar y calcular en float32,
+incluidas las matrices de entrada que producen los codificadores. Los modelos que no lo permiten
+se sirven igual que antes:
+
+- `SVC` (libsvm) y el índice KD-tree de DBSCAN solo trabajan en float64 y convierten la entrada.
+- XGBoost y los bosques de sklearn ya evalúan en float32 internamente.
+- Las sesiones de onnxruntime reciben siempre float32.
+
+La conversión copia los arreglos: con `artifacts.mmap_mode: "r"` la versión float32 deja de
+compartir las páginas del archivo, así que conviene cargarla antes del fork (pre-fork con
+`preload_members: true`) para que los workers compartan la copia.
+
+El ahorro de memoria por familia y la desviación de las predicciones en la partición de prueba
+del dataset se miden con `python -m benchmarks.bench_float32`.
+"""
+
+from typing import Dict
+
+import numpy as np
+
+from app.utils.model_registry import LazyMember
+
+PRECISIONS = ("float64", "float32")
+
+
+def to_float32(model):
+    """Retorna la versión float32 del modelo si la soporta; si no, el mismo modelo."""
+    convert = getattr(model, "to_float32", None)
+    return convert() if callable(convert) else model
+
+
+def reduce_precision(models: Dict) -> Dict:
+    """
+    Convierte a float32 los modelos de una familia. Los `LazyMember` se convierten en su
+    primer uso, así que un estimador que no se selecciona sigue sin cargarse.
+    """
+    converted = {}
+    for key, value in models.items():
+        if isinstance(value, LazyMember):
+            converted[key] = LazyMember(lambda member=value: to_float32(member.resolve()))
+        else:
+            converted[key] = to_float32(value)
+    return converted
+
+
+def array_bytes(model, _seen=None) -> int:
+    """
+    Bytes de los arreglos de NumPy alcanzables desde `model` (atributos, listas y diccionarios).
+    Los objetos compilados de sklearn/XGBoost (árboles de Cython, boosters) no se cuentan.
+    """
+    seen = set() if _seen is None else _seen
+    if id(model) in seen:
+        return 0
+    seen.add(id(model))
+    if isinstance(model, np.ndarray):
+        return model.nbytes
+    if isinstance(model, LazyMember):
+        return array_bytes(model.resolve(), seen)
+    if isinstance(model, dict):
+        return sum(array_bytes(value, seen) for value in model.values())
+    if isinstance(model, (list, tuple)):
+        return sum(array_bytes(value, seen) for value in model)
+    if hasattr(model, "__dict__") and not callable(model):
+        return sum(array_bytes(value, seen) for value in vars(model).values())
+    return 0
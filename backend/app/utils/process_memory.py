@@ -0,0 +1,71 @@
+"""
+Medición de memoria única y compartida por proceso (Linux).
+
+Lee `/proc/<pid>/smaps_rollup` para separar las páginas privadas de cada proceso de las
+compartidas con otros (p. ej. los modelos cargados en el proceso padre antes de `fork`).
+
+- `unique`: Private_Clean + Private_Dirty (lo que se liberaría al terminar el proceso).
+- `shared`: Shared_Clean + Shared_Dirty (páginas que también usan otros procesos).
+- `pss`: memoria proporcional (las páginas compartidas se reparten entre quienes las usan).
+"""
+
+import os
+from typing import Dict, Iterable, Optional
+
+# Campos de smaps_rollup que se reportan (en kB en el archivo)
+SMAPS_FIELDS = ("Rss", "Pss", "Shared_Clean", "Shared_Dirty", "Private_Clean", "Private_Dirty", "Anonymous", "Swap")
+
+
+def read_smaps_rollup(pid: Optional[int] = None) -> Dict[str, int]:
+    """
+    Retorna los campos de `smaps_rollup` del proceso en bytes.
+
+    Lanza:
+        OSError: Si el archivo no existe (kernel sin smaps_rollup o sistema no Linux) o el
+            proceso ya terminó.
+    """
+    path = f"/proc/{pid or os.getpid()}/smaps_rollup"
+    values = {}
+    with open(path, "r", encoding="utf-8") as fs:
+        for line in fs:
+            parts = line.split()
+            if len(parts) >= 3 and parts[0].endswith(":") and parts[0][:-1] in SMAPS_FIELDS:
+                values[parts[0][:-1]] = int(parts[1]) * 1024
+    return values
+
+
+def _mb(n_bytes: int) -> float:
+    return round(n_bytes / (1024 * 1024), 2)
+
+
+def process_memory(pid: Optional[int] = None) -> Dict[str, float]:
+    """Retorna la memoria única, compartida, RSS y PSS de un proceso, en MB."""
+    values = read_smaps_rollup(pid)
+    return {
+        "pid": pid or os.getpid(),
+        "rss_mb": _mb(values.get("Rss", 0)),
+        "pss_mb": _mb(values.get("Pss", 0)),
+        "unique_mb": _mb(values.get("Private_Clean", 0) + values.get("Private_Dirty", 0)),
+        "shared_mb": _mb(values.get("Shared_Clean", 0) + values.get("Shared_Dirty", 0)),
+    }
+
+
+def memory_report(pids: Iterable[int]) -> Dict:
+    """
+    Retorna la memoria de cada proceso y los totales del grupo.
+
+    `total_pss_mb` es la memoria física real que usa el grupo completo; la suma de `rss_mb`
+    cuenta varias veces las páginas compartidas.
+    """
+    processes = []
+    for pid in pids:
+        try:
+            processes.append(process_memory(pid))
+        except OSError:
+            continue
+    return {
+        "processes": processes,
+        "total_rss_mb": round(sum(p["rss_mb"] for p in processes), 2),
+        "total_pss_mb": round(sum(p["pss_mb"] for p in processes), 2),
+        "total_unique_mb": round(sum(p["unique_mb"] for p in processes), 2),
+    }
@@ -0,0 +1,326 @@
+"""
+Caché de resultados de predicción con backends intercambiables.
+
+Las mismas combinaciones de características (Brand, Model, Year, ...) llegan una y otra vez
+desde distintos usuarios. Esta caché guarda el resultado de cada familia de modelos por
+combinación, con una llave `(familia, versión de los artefactos, llave canónica del auto)`,
+de modo que un acierto evita por completo la inferencia.
+
+Backends disponibles (misma API `get` / `put` / `evict` / `invalidate` / `stats`):
+
+- `MemoryCacheBackend`: LRU en memoria del proceso, con expiración por TTL.
+- `SQLiteCacheBackend`: archivo SQLite local en modo WAL compartido por todos los workers
+  de uvicorn del host. Cada lectura y escritura es una transacción, así que un lector
+  nunca ve una entrada a medio escribir.
+
+Ambos llevan contadores de aciertos, fallos, desalojos y expiraciones. Al recargar una familia
+se llama a `model_reloaded` (ver `ModelRegistry.subscribe_reload`): la caché en memoria descarta
+las entradas de la familia; la compartida no borra nada, porque otros workers pueden estar
+usando (y escribiendo) la versión nueva: las llaves llevan la versión, así que las entradas
+obsoletas dejan de consultarse y salen por TTL o por `prune`.
+"""
+
+import abc
+import collections
+import json
+import os
+import sqlite3
+import tempfile
+import threading
+import time
+from typing import Callable, Dict, Hashable, Iterable, Optional, Tuple
+
+from app.utils.features import canonical_key
+
+
+class CacheBackend(abc.ABC):
+    """
+    Interfaz común de los backends de la caché de resultados.
+
+    Las llaves son tuplas cuyo primer elemento es la familia de modelos (ver `make_key`).
+    """
+
+    name = "base"
+
+    def __init__(self, max_entries: int = 10000, ttl_seconds: float = 3600.0):
+        self.max_entries = max(int(max_entries), 1)
+        self.ttl = float(ttl_seconds)
+
+        # Métricas (por proceso)
+        self._stats_lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+        self._expirations = 0
+        self._invalidations = 0
+
+    @staticmethod
+    def make_key(family: str, version: str, car_data: Dict, members: Optional[Iterable[str]] = None) -> Tuple:
+        """
+        Llave de la caché: familia, versión de los artefactos, llave canónica del auto y,
+        si la petición seleccionó solo algunos estimadores, la lista de estos.
+        """
+        key = (family, version, canonical_key(car_data))
+        return key + (tuple(members),) if members else key
+
+    @abc.abstractmethod
+    def get(self, key: Hashable) -> Optional[Dict]:
+        """Retorna una copia del resultado guardado, o None si no existe o expiró."""
+
+    @abc.abstractmethod
+    def put(self, key: Hashable, result: Dict) -> None:
+        """Guarda un resultado, desalojando entradas antiguas si la caché está llena."""
+
+    @abc.abstractmethod
+    def evict(self, key: Hashable) -> bool:
+        """Elimina un resultado. Retorna True si existía."""
+
+    @abc.abstractmethod
+    def invalidate(self, family: Optional[str] = None) -> int:
+        """
+        Elimina los resultados de una familia (o todos si `family` es None).
+
+        Retorna:
+            int: Número de resultados eliminados.
+        """
+
+    def model_reloaded(self, family: str) -> int:
+        """Se invoca cuando `family` se recarga; descarta sus resultados (ver `invalidate`)."""
+        return self.invalidate(family)
+
+    @abc.abstractmethod
+    def __len__(self) -> int:
+        """Número de resultados guardados."""
+
+    def _count(self, counter: str, amount: int = 1) -> None:
+        with self._stats_lock:
+            setattr(self, counter, getattr(self, counter) + amount)
+
+    def stats(self) -> Dict:
+        """Retorna el tamaño de la caché y sus contadores."""
+        entries = len(self)
+        with self._stats_lock:
+            lookups = self._hits + self._misses
+            return {
+                "backend": self.name,
+                "entries": entries,
+                "max_entries": self.max_entries,
+                "ttl_seconds": self.ttl,
+                "hits": self._hits,
+                "misses": self._misses,
+                "hit_rate": round(self._hits / lookups, 4) if lookups else 0.0,
+                "evictions": self._evictions,
+                "expirations": self._expirations,
+                "invalidations": self._invalidations,
+            }
+
+
+class MemoryCacheBackend(CacheBackend):
+    """
+    Caché LRU en memoria con expiración por TTL, segura para hilos.
+
+    Parámetros:
+        max_entries (int): Número máximo de resultados guardados; al superarlo se desaloja
+            el menos usado recientemente.
+        ttl_seconds (float): Segundos que un resultado permanece válido (0 = sin expiración).
+        clock (callable): Reloj monotónico (se reemplaza en las pruebas).
+    """
+
+    name = "memory"
+
+    def __init__(self, max_entries: int = 10000, ttl_seconds: float = 3600.0,
+                 clock: Callable[[], float] = time.monotonic):
+        super().__init__(max_entries, ttl_seconds)
+        self._clock = clock
+        # llave → (instante de expiración, resultado)
+        self._entries: "collections.OrderedDict[Tuple, Tuple[float, Dict]]" = collections.OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: Hashable) -> Optional[Dict]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and self.ttl and entry[0] <= self._clock():
+                del self._entries[key]
+                self._count("_expirations")
+                entry = None
+            if entry is None:
+                self._count("_misses")
+                return None
+            self._entries.move_to_end(key)
+            self._count("_hits")
+            return dict(entry[1])
+
+    def put(self, key: Hashable, result: Dict) -> None:
+        expires_at = self._clock() + self.ttl if self.ttl else float("inf")
+        with self._lock:
+            self._entries[key] = (expires_at, dict(result))
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self._count("_evictions")
+
+    def evict(self, key: Hashable) -> bool:
+        with self._lock:
+            return self._entries.pop(key, None) is not None
+
+    def invalidate(self, family: Optional[str] = None) -> int:
+        with self._lock:
+            if family is None:
+                removed = len(self._entries)
+                self._entries.clear()
+            else:
+                stale = [key for key in self._entries if key[0] == family]
+                for key in stale:
+                    del self._entries[key]
+                removed = len(stale)
+        self._count("_invalidations", removed)
+        return removed
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+class SQLiteCacheBackend(CacheBackend):
+    """
+    Caché compartida entre procesos sobre un archivo SQLite local en modo WAL.
+
+    Cada proceso (y cada hilo) abre su propia conexión; WAL permite lectores concurrentes
+    con un escritor, y cada operación es atómica, así que no hay entradas a medias.
+    El desalojo es por antigüedad de escritura: cada `prune_every` escrituras de un proceso
+    se eliminan las entradas más antiguas que excedan `max_entries`.
+
+    Parámetros:
+        path (str): Ruta del archivo SQLite (común a todos los workers del host).
+        max_entries (int): Número máximo aproximado de resultados guardados.
+        ttl_seconds (float): Segundos que un resultado permanece válido (0 = sin expiración).
+        prune_every (int): Escrituras entre cada desalojo por tamaño.
+        clock (callable): Reloj de pared compartido entre procesos (se reemplaza en las pruebas).
+    """
+
+    name = "sqlite"
+
+    _SCHEMA = (
+        "CREATE TABLE IF NOT EXISTS results ("
+        " key TEXT PRIMARY KEY,"
+        " family TEXT NOT NULL,"
+        " expires_at REAL NOT NULL,"
+        " created_at REAL NOT NULL,"
+        " value TEXT NOT NULL)",
+        "CREATE INDEX IF NOT EXISTS results_family ON results (family)",
+        "CREATE INDEX IF NOT EXISTS results_created_at ON results (created_at)",
+    )
+
+    def __init__(self, path: Optional[str] = None, max_entries: int = 10000, ttl_seconds: float = 3600.0,
+                 prune_every: int = 64, clock: Callable[[], float] = time.time):
+        super().__init__(max_entries, ttl_seconds)
+        self.path = str(path or os.path.join(tempfile.gettempdir(), "car_prices_result_cache.sqlite3"))
+        self.prune_every = max(int(prune_every), 1)
+        self._clock = clock
+        self._local = threading.local()
+        self._puts = 0
+        with self._connection() as conn:
+            for statement in self._SCHEMA:
+                conn.execute(statement)
+
+    def _connection(self) -> sqlite3.Connection:
+        """Conexión del hilo actual (se reabre tras un `fork`: las conexiones no se comparten)."""
+        conn = getattr(self._local, "conn", None)
+        if conn is None or self._local.pid != os.getpid():
+            conn = sqlite3.connect(self.path, timeout=5.0, isolation_level=None, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn, self._local.pid = conn, os.getpid()
+        return conn
+
+    @staticmethod
+    def _encode_key(key: Hashable) -> str:
+        return json.dumps(key, separators=(",", ":"))
+
+    def get(self, key: Hashable) -> Optional[Dict]:
+        conn = self._connection()
+        encoded = self._encode_key(key)
+        row = conn.execute("SELECT expires_at, value FROM results WHERE key = ?", (encoded,)).fetchone()
+        if row is not None and row[0] <= self._clock():
+            conn.execute("DELETE FROM results WHERE key = ? AND expires_at <= ?", (encoded, self._clock()))
+            self._count("_expirations")
+            row = None
+        if row is None:
+            self._count("_misses")
+            return None
+        self._count("_hits")
+        return json.loads(row[1])
+
+    def put(self, key: Hashable, result: Dict) -> None:
+        now = self._clock()
+        expires_at = now + self.ttl if self.ttl else float("inf")
+        conn = self._connection()
+        conn.execute(
+            "INSERT OR REPLACE INTO results (key, family, expires_at, created_at, value) VALUES (?, ?, ?, ?, ?)",
+            (self._encode_key(key), str(key[0]), expires_at, now, json.dumps(result)),
+        )
+        with self._stats_lock:
+            self._puts += 1
+            prune = self._puts % self.prune_every == 0
+        if prune:
+            self.prune()
+
+    def prune(self) -> int:
+        """Elimina las entradas expiradas y las más antiguas que excedan `max_entries`."""
+        conn = self._connection()
+        expired = conn.execute("DELETE FROM results WHERE expires_at <= ?", (self._clock(),)).rowcount
+        evicted = conn.execute(
+            "DELETE FROM results WHERE key IN "
+            "(SELECT key FROM results ORDER BY created_at DESC LIMIT -1 OFFSET ?)",
+            (self.max_entries,),
+        ).rowcount
+        self._count("_expirations", expired)
+        self._count("_evictions", evicted)
+        return expired + evicted
+
+    def evict(self, key: Hashable) -> bool:
+        return self._connection().execute("DELETE FROM results WHERE key = ?", (self._encode_key(key),)).rowcount > 0
+
+    def invalidate(self, family: Optional[str] = None) -> int:
+        conn = self._connection()
+        if family is None:
+            removed = conn.execute("DELETE FROM results").rowcount
+        else:
+            removed = conn.execute("DELETE FROM results WHERE family = ?", (family,)).rowcount
+        self._count("_invalidations", removed)
+        return removed
+
+    def model_reloaded(self, family: str) -> int:
+        """
+        No borra nada: la caché es común a todos los workers del host, y cada uno recarga (o
+        arranca, o se detiene) por su cuenta. Las llaves llevan la versión de los artefactos.
+        """
+        return 0
+
+    def __len__(self) -> int:
+        return self._connection().execute("SELECT COUNT(*) FROM results").fetchone()[0]
+
+
+# Backends disponibles por nombre (valor de `result_cache.backend` en config.yaml)
+CACHE_BACKENDS = {
+    MemoryCacheBackend.name: MemoryCacheBackend,
+    SQLiteCacheBackend.name: SQLiteCacheBackend,
+}
+
+
+def create_cache_backend(backend: str = "memory", sqlite_path: Optional[str] = None, **options) -> CacheBackend:
+    """
+    Crea el backend de caché indicado.
+
+    Parámetros:
+        backend (str): "memory" o "sqlite".
+        sqlite_path (str, opcional): Archivo del backend "sqlite" (se ignora en "memory").
+        **options: `max_entries`, `ttl_seconds` y demás parámetros del backend.
+
+    Lanza:
+        ValueError: Si el backend no existe.
+    """
+    if backend not in CACHE_BACKENDS:
+        raise ValueError(f"Backend de caché '{backend}' no soportado. Opciones: {sorted(CACHE_BACKENDS)}")
+    if backend == SQLiteCacheBackend.name:
+        options["path"] = sqlite_path
+    return CACHE_BACKENDS[backend](**options)
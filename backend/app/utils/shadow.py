@@ -0,0 +1,261 @@
+"""
+Evaluación en sombra de una versión candidata de los modelos con tráfico real.
+
+Una muestra (`sample_rate`) de las predicciones individuales se encola y un hilo en segundo
+plano la evalúa con la versión vigente y con la candidata (un `ModelRegistry` aparte que lee
+los artefactos candidatos). La petición solo paga el sorteo y un `put_nowait`: si la cola está
+llena la muestra se descarta. El hilo comparte la CPU del worker, así que `sample_rate` acota
+también el costo de la evaluación.
+
+Ambas versiones se ejecutan con las mismas funciones por lotes que usan las rutas, fijando la
+instantánea de cada una con `ModelRegistry.override`, y alternando el orden para que ninguna se
+beneficie siempre de las cachés calientes. Se registran, por familia:
+
+- predicción: diferencia absoluta y relativa de precio por estimador,
+- segmentación y clusterización: proporción de coincidencias por estimador,
+- latencia de cada versión (promedio, p50, p99) sobre las mismas filas.
+"""
+
+import collections
+import queue
+import random
+import threading
+import time
+from typing import Callable, Dict, Optional
+
+from app.utils.logger import logger
+from app.utils.micro_batcher import _percentile
+from app.utils.model_registry import MODEL_REGISTRY, ModelRegistry
+
+# Número de latencias recientes usadas para calcular percentiles
+LATENCY_SAMPLES = 1024
+
+# Familias cuyos resultados son numéricos (se comparan por diferencia, no por coincidencia)
+NUMERIC_FAMILIES = ("prediction",)
+
+
+class _FamilyStats:
+    """Contadores y comparaciones acumuladas de una familia."""
+
+    def __init__(self):
+        self.samples = 0
+        self.errors = 0
+        self.unknown_rows = 0  # Filas que ninguna de las dos versiones pudo predecir
+        self.coverage_mismatches = 0  # Filas que solo una de las dos versiones pudo predecir
+        self.latency = {"production": collections.deque(maxlen=LATENCY_SAMPLES),
+                        "candidate": collections.deque(maxlen=LATENCY_SAMPLES)}
+        self.latency_total = {"production": 0.0, "candidate": 0.0}
+        self.members: Dict[str, Dict] = {}
+        self.versions = {"production": None, "candidate": None}
+
+
+class ShadowEvaluator:
+    """
+    Compara una versión candidata con la vigente sobre una muestra del tráfico.
+
+    Parámetros:
+        candidate (ModelRegistry): Registro con los artefactos candidatos.
+        sample_rate (float): Proporción de peticiones evaluadas (0 a 1).
+        max_queue (int): Muestras pendientes antes de descartar nuevas.
+        registry (ModelRegistry): Registro de producción (por defecto `MODEL_REGISTRY`).
+        functions (dict, opcional): {familia: función por lotes}; por defecto las de la aplicación.
+    """
+
+    def __init__(self, candidate: ModelRegistry, sample_rate: float = 0.05, max_queue: int = 1000,
+                 registry: ModelRegistry = MODEL_REGISTRY, functions: Optional[Dict[str, Callable]] = None):
+        self.candidate = candidate
+        self.sample_rate = min(max(float(sample_rate), 0.0), 1.0)
+        self.registry = registry
+        self._functions = functions
+        self._queue: queue.Queue = queue.Queue(maxsize=max(int(max_queue), 1))
+        self._lock = threading.Lock()
+        self._stats: Dict[str, _FamilyStats] = {}
+        self._submitted = 0
+        self._dropped = 0
+        self._thread: Optional[threading.Thread] = None
+        self._stopping = threading.Event()
+        self._candidate_error: Optional[str] = None
+
+    @property
+    def functions(self) -> Dict[str, Callable]:
+        if self._functions is None:
+            from app.utils.warmup import default_warmup_functions
+            self._functions = default_warmup_functions()
+        return self._functions
+
+    def submit(self, family: str, car: Dict) -> bool:
+        """
+        Encola una fila para evaluarla en sombra si sale sorteada. Nunca bloquea.
+        Retorna True si la fila quedó encolada.
+        """
+        if self.sample_rate <= 0.0 or random.random() >= self.sample_rate:
+            return False
+        try:
+            self._queue.put_nowait((family, dict(car)))
+        except queue.Full:
+            with self._lock:
+                self._dropped += 1
+            return False
+        with self._lock:
+            self._submitted += 1
+        return True
+
+    def _timed(self, family: str, loaded, car: Dict):
+        with self.registry.override(family, loaded):
+            start = time.perf_counter()
+            output = self.functions[family]([car])[0]
+            return output["result"], time.perf_counter() - start
+
+    def evaluate(self, family: str, car: Dict) -> None:
+        """Evalúa una fila con ambas versiones y acumula la comparación (la usa el hilo en sombra)."""
+        production = self.registry.get(family)
+        candidate = self.candidate.get(family)
+        stats = self._family_stats(family)
+        try:
+            # Alternar el orden para no favorecer siempre a la segunda ejecución
+            if stats.samples % 2:
+                candidate_result, candidate_seconds = self._timed(family, candidate, car)
+                production_result, production_seconds = self._timed(family, production, car)
+            else:
+                production_result, production_seconds = self._timed(family, production, car)
+                candidate_result, candidate_seconds = self._timed(family, candidate, car)
+        except Exception:
+            logger.exception(f"Error en la evaluación en sombra de '{family}'")
+            with self._lock:
+                stats.errors += 1
+            return
+
+        with self._lock:
+            stats.samples += 1
+            stats.versions = {"production": production.version, "candidate": candidate.version}
+            for version, seconds in (("production", production_seconds), ("candidate", candidate_seconds)):
+                stats.latency[version].append(seconds)
+                stats.latency_total[version] += seconds
+            if production_result is None or candidate_result is None:
+                if production_result is None and candidate_result is None:
+                    stats.unknown_rows += 1
+                else:
+                    stats.coverage_mismatches += 1
+                return
+            for member, served in production_result.items():
+                self._compare(family, stats.members.setdefault(member, {"n": 0}), served,
+                              candidate_result.get(member))
+
+    @staticmethod
+    def _compare(family: str, member: Dict, production, candidate) -> None:
+        if candidate is None:
+            return
+        member["n"] += 1
+        if family in NUMERIC_FAMILIES:
+            delta = abs(float(candidate) - float(production))
+            member["abs_total"] = member.get("abs_total", 0.0) + delta
+            member["rel_total"] = member.get("rel_total", 0.0) + (delta / abs(production) if production else 0.0)
+            member["max_abs"] = max(member.get("max_abs", 0.0), delta)
+        else:
+            member["agree"] = member.get("agree", 0) + int(candidate == production)
+
+    def _family_stats(self, family: str) -> _FamilyStats:
+        with self._lock:
+            return self._stats.setdefault(family, _FamilyStats())
+
+    def _run(self) -> None:
+        try:
+            self.candidate.load_all()
+        except Exception as e:
+            logger.exception("No se pudo cargar la versión candidata para la evaluación en sombra")
+            self._candidate_error = str(e)
+        while True:
+            item = self._queue.get()
+            try:
+                if item is None or self._stopping.is_set():
+                    return
+                family, car = item
+                try:
+                    self.evaluate(family, car)
+                except RuntimeError as e:
+                    # La familia candidata no se pudo cargar: la muestra se cuenta como error
+                    self._candidate_error = str(e)
+                    stats = self._family_stats(family)
+                    with self._lock:
+                        stats.errors += 1
+            finally:
+                self._queue.task_done()
+
+    def start(self) -> "ShadowEvaluator":
+        """Carga la versión candidata y empieza a evaluar en un hilo en segundo plano."""
+        if self._thread is None:
+            self._stopping.clear()
+            self._thread = threading.Thread(target=self._run, name="shadow-evaluator", daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        """Detiene el hilo; las muestras aún encoladas se descartan."""
+        if self._thread is not None:
+            self._stopping.set()
+            while True:
+                try:
+                    self._queue.put_nowait(None)
+                    break
+                except queue.Full:
+                    try:
+                        self._queue.get_nowait()
+                        self._queue.task_done()
+                    except queue.Empty:
+                        pass
+            self._thread.join()
+            self._thread = None
+
+    def join(self) -> None:
+        """Espera a que se evalúen todas las muestras encoladas."""
+        self._queue.join()
+
+    @staticmethod
+    def _latency_report(samples, total: float, n: int) -> Dict:
+        samples = list(samples)
+        return {
+            "avg": round(total / n * 1000, 3) if n else 0.0,
+            "p50": round(_percentile(samples, 50) * 1000, 3),
+            "p99": round(_percentile(samples, 99) * 1000, 3),
+        }
+
+    def report(self) -> Dict:
+        """Retorna la comparación acumulada por familia y los contadores de la cola."""
+        with self._lock:
+            families = {}
+            for family, stats in self._stats.items():
+                latency = {version: self._latency_report(stats.latency[version], stats.latency_total[version],
+                                                         stats.samples)
+                           for version in ("production", "candidate")}
+                candidate_avg = latency["candidate"]["avg"]
+                latency["speedup"] = round(latency["production"]["avg"] / candidate_avg, 3) if candidate_avg else None
+                members = {}
+                for member, values in stats.members.items():
+                    n = values["n"]
+                    if not n:
+                        continue
+                    if family in NUMERIC_FAMILIES:
+                        members[member] = {
+                            "mean_abs_delta": round(values["abs_total"] / n, 4),
+                            "mean_rel_delta_pct": round(values["rel_total"] / n * 100, 4),
+                            "max_abs_delta": round(values["max_abs"], 4),
+                        }
+                    else:
+                        members[member] = {"agreement": round(values["agree"] / n, 4)}
+                families[family] = {
+                    "versions": dict(stats.versions),
+                    "samples": stats.samples,
+                    "errors": stats.errors,
+                    "unknown_rows": stats.unknown_rows,
+                    "coverage_mismatches": stats.coverage_mismatches,
+                    "latency_ms": latency,
+                    "members": members,
+                }
+            return {
+                "sample_rate": self.sample_rate,
+                "submitted": self._submitted,
+                "dropped": self._dropped,
+                "pending": self._queue.qsize(),
+                "candidate_error": self._candidate_error,
+                "families": families,
+            }
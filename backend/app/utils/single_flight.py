@@ -0,0 +1,66 @@
+"""
+Deduplicación de llamadas concurrentes idénticas ("single-flight").
+
+Cuando varias peticiones piden el mismo resultado a la vez (p. ej. envíos repetidos desde la
+interfaz), solo la primera ejecuta la llamada; las demás esperan esa misma tarea y reciben su
+resultado o su excepción. La llave se libera al terminar la tarea, así que una petición que
+llega después vuelve a ejecutar (o encuentra el resultado en la caché o en la base de datos).
+
+Funciona dentro del event loop de un worker: cada proceso deduplica sus propias peticiones.
+El resultado se comparte entre todas las peticiones que esperaban: no debe modificarse.
+"""
+
+import asyncio
+import threading
+from typing import Awaitable, Callable, Dict, Hashable
+
+
+class SingleFlight:
+    """
+    Agrupa las llamadas asíncronas concurrentes con la misma llave en una sola ejecución.
+
+    Parámetros:
+        name (str): Nombre usado en las métricas.
+    """
+
+    def __init__(self, name: str):
+        self.name = name
+        self._inflight: Dict[Hashable, asyncio.Future] = {}
+        self._lock = threading.Lock()
+        self._executed = 0
+        self._shared = 0
+
+    async def run(self, key: Hashable, call: Callable[[], Awaitable]):
+        """
+        Ejecuta `call()` si no hay otra llamada en curso con la misma llave; si la hay, espera
+        su resultado. Cancelar una petición no cancela la llamada compartida.
+        """
+        future = self._inflight.get(key)
+        if future is None:
+            future = asyncio.ensure_future(call())
+            self._inflight[key] = future
+            future.add_done_callback(lambda done: self._release(key, done))
+            with self._lock:
+                self._executed += 1
+        else:
+            with self._lock:
+                self._shared += 1
+        return await asyncio.shield(future)
+
+    def _release(self, key: Hashable, future: asyncio.Future) -> None:
+        if self._inflight.get(key) is future:
+            del self._inflight[key]
+        if not future.cancelled():
+            future.exception()  # Marca la excepción como recuperada aunque nadie siga esperando
+
+    def stats(self) -> Dict:
+        """Llamadas ejecutadas, peticiones que reutilizaron una llamada en curso y llamadas en curso."""
+        with self._lock:
+            executed, shared = self._executed, self._shared
+        total = executed + shared
+        return {
+            "executed": executed,
+            "shared": shared,
+            "shared_ratio": round(shared / total, 4) if total else 0.0,
+            "inflight": len(self._inflight),
+        }
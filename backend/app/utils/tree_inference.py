@@ -0,0 +1,270 @@
+"""
+Motor de inferencia para bosques aleatorios sobre arreglos contiguos.
+
+Compila los árboles ajustados de un `RandomForestRegressor` / `RandomForestClassifier`
+en arreglos planos (característica, umbral, hijos, valor) y recorre todos los árboles a la
+vez para todo el lote con operaciones vectorizadas de NumPy, evitando el despacho por árbol
+de sklearn/joblib.
+
+Los arreglos pueden exportarse al entrenar (ver `ModelTrain/handlers/export_weights.py`) como un
+diccionario guardado con joblib sin compresión, para cargarlos mapeados en memoria:
+
+    {
+        "format": "flat-forest/v1",
+        "feature", "threshold", "left", "right", "value", "roots": arrays,
+        "max_depth": int,
+        "classes": array | None,       # solo para clasificación
+    }
+"""
+
+import copy
+import pathlib
+import threading
+from typing import Callable, Dict, Optional
+
+import joblib
+import numpy as np
+
+EXPORT_FORMAT = "flat-forest/v1"
+
+
+class FlatForest:
+    """
+    Bosque compilado en arreglos contiguos.
+
+    Los nodos de todos los árboles se concatenan; `roots[t]` es el índice del nodo raíz del
+    árbol `t`. En las hojas ambos hijos apuntan a la propia hoja, así que el recorrido puede
+    avanzar `max_depth` pasos sin comprobar si cada fila ya llegó a una hoja.
+
+    Atributos:
+        feature (np.ndarray): Característica evaluada en cada nodo.
+        threshold (np.ndarray): Umbral de cada nodo (va a la izquierda si x <= umbral).
+        left, right (np.ndarray): Índice global de los hijos de cada nodo.
+        value (np.ndarray): Valor de cada nodo: predicción (regresión) o probabilidades por clase.
+        roots (np.ndarray): Nodo raíz de cada árbol.
+        max_depth (int): Profundidad máxima entre todos los árboles.
+        classes (np.ndarray | None): Etiquetas de clase (solo clasificación).
+        fallback (opcional): Bosque de sklearn usado para lotes de `fallback_min_rows` filas o más.
+        fallback_loader (callable, opcional): Carga `fallback` la primera vez que se necesita.
+    """
+
+    def __init__(self, feature, threshold, left, right, value, roots, max_depth, classes=None,
+                 fallback=None, fallback_min_rows=None, fallback_loader: Optional[Callable] = None):
+        self.feature = np.ascontiguousarray(feature, dtype=np.intp)
+        self.threshold = np.ascontiguousarray(threshold, dtype=np.float64)
+        self.left = np.ascontiguousarray(left, dtype=np.intp)
+        self.right = np.ascontiguousarray(right, dtype=np.intp)
+        self.value = np.ascontiguousarray(value)
+        self.roots = np.ascontiguousarray(roots, dtype=np.intp)
+        self.max_depth = int(max_depth)
+        self.classes = None if classes is None else np.asarray(classes)
+
+        # Bosque original de sklearn para lotes grandes, donde su recorrido en C es más rápido
+        self.fallback = fallback
+        self.fallback_min_rows = fallback_min_rows
+        self.fallback_loader = fallback_loader
+        self._fallback_lock = threading.Lock()
+
+    @property
+    def n_trees(self) -> int:
+        return len(self.roots)
+
+    @property
+    def n_nodes(self) -> int:
+        return len(self.feature)
+
+    @property
+    def is_classifier(self) -> bool:
+        return self.classes is not None
+
+    @classmethod
+    def from_sklearn(cls, forest) -> "FlatForest":
+        """Compila un `RandomForestRegressor` o `RandomForestClassifier` ajustado (una sola salida)."""
+        is_classifier = hasattr(forest, "classes_")
+        if getattr(forest, "n_outputs_", 1) != 1:
+            raise ValueError("Solo se soportan bosques de una sola salida.")
+
+        features, thresholds, lefts, rights, values, roots = [], [], [], [], [], []
+        offset, max_depth = 0, 0
+        for estimator in forest.estimators_:
+            tree = estimator.tree_
+            n_nodes = tree.node_count
+            node_ids = np.arange(offset, offset + n_nodes)
+            is_leaf = tree.children_left == -1
+
+            features.append(np.where(is_leaf, 0, tree.feature))
+            thresholds.append(np.where(is_leaf, 0.0, tree.threshold))
+            lefts.append(np.where(is_leaf, node_ids, tree.children_left + offset))
+            rights.append(np.where(is_leaf, node_ids, tree.children_right + offset))
+            if is_classifier:
+                # Probabilidades por clase de cada nodo (igual que `DecisionTreeClassifier.predict_proba`)
+                counts = tree.value[:, 0, :]
+                totals = counts.sum(axis=1, keepdims=True)
+                totals[totals == 0.0] = 1.0
+                values.append(counts / totals)
+            else:
+                values.append(tree.value[:, 0, 0])
+            roots.append(offset)
+            offset += n_nodes
+            max_depth = max(max_depth, tree.max_depth)
+
+        return cls(
+            feature=np.concatenate(features),
+            threshold=np.concatenate(thresholds),
+            left=np.concatenate(lefts),
+            right=np.concatenate(rights),
+            value=np.concatenate(values),
+            roots=np.asarray(roots),
+            max_depth=max_depth,
+            classes=forest.classes_ if is_classifier else None,
+        )
+
+    @classmethod
+    def from_export(cls, export: Dict) -> "FlatForest":
+        """Construye el bosque a partir del diccionario exportado (los arreglos no se copian)."""
+        if export.get("format") != EXPORT_FORMAT:
+            raise ValueError(f"Formato de bosque no soportado: {export.get('format')}")
+        return cls(export["feature"], export["threshold"], export["left"], export["right"], export["value"],
+                   export["roots"], export["max_depth"], classes=export.get("classes"))
+
+    def to_export(self) -> Dict:
+        """Retorna el diccionario exportable (ver la documentación del módulo)."""
+        return {
+            "format": EXPORT_FORMAT,
+            "feature": self.feature,
+            "threshold": self.threshold,
+            "left": self.left,
+            "right": self.right,
+            "value": self.value,
+            "roots": self.roots,
+            "max_depth": self.max_depth,
+            "classes": self.classes,
+        }
+
+    def apply(self, X: np.ndarray) -> np.ndarray:
+        """
+        Retorna la hoja alcanzada por cada fila en cada árbol, `(n_arboles, n_filas)`.
+
+        Como sklearn, las características se convierten a float32 antes de compararlas
+        con los umbrales, para que las decisiones sean idénticas.
+        """
+        X32 = np.ascontiguousarray(X, dtype=np.float32)
+        n_rows, n_features = X32.shape
+        flat_X = X32.ravel()
+        row_offsets = (np.arange(n_rows, dtype=np.intp) * n_features)[np.newaxis, :]
+
+        nodes = np.repeat(self.roots[:, np.newaxis], n_rows, axis=1)
+        for _ in range(self.max_depth):
+            go_left = flat_X[row_offsets + self.feature[nodes]] <= self.threshold[nodes]
+            nodes = np.where(go_left, self.left[nodes], self.right[nodes])
+        return nodes
+
+    def _use_fallback(self, X) -> bool:
+        has_fallback = self.fallback is not None or self.fallback_loader is not None
+        return has_fallback and self.fallback_min_rows is not None and len(X) >= self.fallback_min_rows
+
+    def _fallback_forest(self):
+        """Bosque de sklearn para lotes grandes, cargado en el primer uso si hay `fallback_loader`."""
+        if self.fallback is None:
+            with self._fallback_lock:
+                if self.fallback is None:
+                    self.fallback = self.fallback_loader()
+        return self.fallback
+
+    def predict_proba(self, X: np.ndarray) -> np.ndarray:
+        """Promedio de las probabilidades por clase de todos los árboles (solo clasificación)."""
+        if not self.is_classifier:
+            raise AttributeError("predict_proba solo está disponible para clasificadores.")
+        if self._use_fallback(X):
+            return self._fallback_forest().predict_proba(X)
+        return self.value[self.apply(X)].mean(axis=0)
+
+    def predict(self, X: np.ndarray) -> np.ndarray:
+        """
+        Regresión: promedio de las predicciones de los árboles.
+        Clasificación: clase con mayor probabilidad promedio.
+        """
+        if self._use_fallback(X):
+            return self._fallback_forest().predict(X)
+        if self.is_classifier:
+            return self.classes[np.argmax(self.predict_proba(X), axis=1)]
+        return self.value[self.apply(X)].mean(axis=0)
+
+    def to_float32(self) -> "FlatForest":
+        """
+        Copia del bosque con valores float32 e índices int32 (la mitad de memoria).
+
+        Los umbrales se redondean hacia -inf: como las filas ya se comparan en float32,
+        `x <= umbral32` equivale a `x <= umbral64` y las decisiones de cada nodo no cambian.
+        Solo los valores de las hojas pierden precisión. El bosque de sklearn de respaldo
+        (lotes grandes) se conserva tal cual.
+        """
+        if self.n_nodes >= np.iinfo(np.int32).max:
+            return self
+        threshold = self.threshold.astype(np.float32)
+        rounded_up = threshold.astype(np.float64) > self.threshold
+        threshold[rounded_up] = np.nextafter(threshold[rounded_up], np.float32(-np.inf))
+
+        forest = copy.copy(self)
+        forest.feature = self.feature.astype(np.int32)
+        forest.threshold = threshold
+        forest.left = self.left.astype(np.int32)
+        forest.right = self.right.astype(np.int32)
+        forest.value = self.value.astype(np.float32)
+        forest.roots = self.roots.astype(np.int32)
+        forest._fallback_lock = threading.Lock()
+        return forest
+
+    def memory_bytes(self) -> int:
+        """Bytes ocupados por los arreglos del bosque compilado."""
+        return sum(a.nbytes for a in (self.feature, self.threshold, self.left, self.right, self.value, self.roots))
+
+    def summary(self) -> Dict:
+        return {"n_trees": self.n_trees, "n_nodes": self.n_nodes, "max_depth": self.max_depth,
+                "memory_bytes": self.memory_bytes()}
+
+
+def compile_forest(forest, fallback_min_rows=None):
+    """
+    Compila un bosque de sklearn en un `FlatForest` (atajo usado por los cargadores).
+
+    Parámetros:
+        forest: `RandomForestRegressor` o `RandomForestClassifier` ajustado.
+        fallback_min_rows (int, opcional): Si se indica, se conserva el bosque original y los
+            lotes con esa cantidad de filas o más se delegan a su `predict`. Si es None, el bosque
+            de sklearn se descarta y todo se evalúa con los arreglos compilados.
+    """
+    flat = FlatForest.from_sklearn(forest)
+    if fallback_min_rows:
+        flat.fallback = forest
+        flat.fallback_min_rows = int(fallback_min_rows)
+    return flat
+
+
+def load_forest(sklearn_path, flat_path=None, engine: str = "flat", fallback_min_rows=None,
+                load: Callable = joblib.load):
+    """
+    Carga el Random Forest de serving según el motor configurado.
+
+    - `engine="sklearn"`: el bosque de sklearn tal cual.
+    - `engine="flat"` con `flat_path` existente: los arreglos exportados al entrenar (con
+      `load=load_artifact` quedan mapeados en memoria, sin copias). El bosque de sklearn solo
+      se carga si llega un lote de `fallback_min_rows` filas o más.
+    - `engine="flat"` sin arreglos exportados: compila el bosque de sklearn al cargar.
+
+    Parámetros:
+        sklearn_path: Ruta del bosque de sklearn (`.pkl`).
+        flat_path (opcional): Ruta de los arreglos exportados ("flat-forest/v1").
+        engine (str): "flat" o "sklearn".
+        fallback_min_rows (int, opcional): Umbral de lote para delegar en sklearn (ver `compile_forest`).
+        load (callable): Función de carga de artefactos.
+    """
+    if engine != "flat":
+        return load(sklearn_path)
+    if flat_path is not None and pathlib.Path(flat_path).exists():
+        flat = FlatForest.from_export(load(flat_path))
+        if fallback_min_rows:
+            flat.fallback_loader = lambda: load(sklearn_path)
+            flat.fallback_min_rows = int(fallback_min_rows)
+        return flat
+    return compile_forest(load(sklearn_path), fallback_min_rows=fallback_min_rows)
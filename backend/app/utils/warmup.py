@@ -0,0 +1,204 @@
+"""
+Calentamiento de los modelos al iniciar el worker y estado de disponibilidad (readiness).
+
+La primera inferencia de cada familia paga costos únicos: inicialización perezosa de sklearn
+y XGBoost, arranque de los hilos de BLAS/OpenMP, fallos de página de los artefactos mapeados
+en memoria, etc. `run_warmup` ejecuta inferencia sintética con cada familia a varios tamaños
+de lote y registra los tiempos; mientras tanto `READINESS` indica que el worker no está listo,
+para que el balanceador no le envíe tráfico (`GET /api/health/ready`).
+
+Las filas de ejemplo se toman de `car_price_dataset.csv` si está disponible, o de los autos de
+ejemplo incluidos (`SAMPLE_CARS`).
+
+En el modo pre-fork el calentamiento corre en cada worker (desde el `lifespan`), nunca en el
+padre: los pools de hilos de OpenMP creados antes de `fork` no son utilizables en los hijos.
+"""
+
+import csv
+import pathlib
+import threading
+import time
+from typing import Callable, Dict, List, Optional, Sequence
+
+from app.utils.features import FEATURE_COLUMNS
+from app.utils.logger import logger
+from app.utils.model_registry import MODEL_REGISTRY, PATH_DIR
+
+# Autos de ejemplo (filas de car_price_dataset.csv) usados si el dataset no está disponible
+SAMPLE_CARS = [
+    {"Brand": "Kia", "Model": "Rio", "Year": 2020, "Engine_Size": 4.2, "Fuel_Type": "Diesel",
+     "Transmission": "Manual", "Mileage": 289944, "Doors": 3, "Owner_Count": 5},
+    {"Brand": "Chevrolet", "Model": "Malibu", "Year": 2012, "Engine_Size": 2.0, "Fuel_Type": "Hybrid",
+     "Transmission": "Automatic", "Mileage": 5356, "Doors": 2, "Owner_Count": 3},
+    {"Brand": "Mercedes", "Model": "GLA", "Year": 2020, "Engine_Size": 4.2, "Fuel_Type": "Diesel",
+     "Transmission": "Automatic", "Mileage": 231440, "Doors": 4, "Owner_Count": 2},
+    {"Brand": "Audi", "Model": "Q5", "Year": 2023, "Engine_Size": 2.0, "Fuel_Type": "Electric",
+     "Transmission": "Manual", "Mileage": 160971, "Doors": 2, "Owner_Count": 1},
+]
+
+# Conversión de cada columna leída del CSV
+_COLUMN_TYPES = {"Year": int, "Engine_Size": float, "Mileage": int, "Doors": int, "Owner_Count": int}
+
+
+def read_dataset_rows(dataset_path) -> List[Dict]:
+    """
+    Lee todas las filas del dataset con las columnas de entrada de los modelos y sus tipos.
+    Las rutas relativas se resuelven desde la raíz del proyecto.
+
+    Lanza:
+        OSError, KeyError, ValueError: Si el archivo no existe o no tiene el formato esperado.
+    """
+    path = pathlib.Path(dataset_path)
+    path = path if path.is_absolute() else PATH_DIR / path
+    with open(path, "r", encoding="utf-8", newline="") as fs:
+        return [{col: _COLUMN_TYPES.get(col, str)(row[col]) for col in FEATURE_COLUMNS} for row in csv.DictReader(fs)]
+
+
+def load_sample_rows(dataset_path=None, n_rows: int = 64) -> List[Dict]:
+    """
+    Retorna hasta `n_rows` autos repartidos a lo largo del dataset (cada k-ésima fila).
+    Si el archivo no existe o no se puede leer, retorna `SAMPLE_CARS`.
+
+    Parámetros:
+        dataset_path: Ruta del CSV; las rutas relativas se resuelven desde la raíz del proyecto.
+        n_rows (int): Número máximo de filas.
+    """
+    if dataset_path:
+        try:
+            rows = read_dataset_rows(dataset_path)
+            step = max(len(rows) // max(int(n_rows), 1), 1)
+            sample = rows[::step][:n_rows]
+            if sample:
+                return sample
+        except (OSError, KeyError, ValueError) as e:
+            logger.warning(f"No se pudieron leer las filas de calentamiento de {dataset_path}: {e}")
+    return list(SAMPLE_CARS)
+
+
+def _resident_members(family: str) -> Optional[List[str]]:
+    """
+    Estimadores ya residentes de la familia. El calentamiento no carga los perezosos que
+    ninguna petición ha seleccionado (`artifacts.preload_members: false`).
+    Retorna None si todos están residentes y una lista vacía si ninguno lo está.
+    """
+    members = MODEL_REGISTRY.select_members(family)
+    if not members:
+        return None
+    loaded = MODEL_REGISTRY.get(family)
+    resident = [member for member in members if member in loaded.models and loaded.is_resident(member)]
+    return None if len(resident) == len(members) else resident
+
+
+def default_warmup_functions() -> Dict[str, Callable]:
+    """Funciones por lotes de cada familia (las mismas que usan las rutas y los micro-batchers)."""
+    from app.utils import prices_clusterization_batch, prices_prediction_batch, prices_segmentation_batch
+    return {
+        "prediction": prices_prediction_batch,
+        "segmentation": prices_segmentation_batch,
+        "clusterization": prices_clusterization_batch,
+    }
+
+
+def run_warmup(rows: Sequence[Dict], batch_sizes: Sequence[int] = (1, 8, 32), repeats: int = 2,
+               functions: Optional[Dict[str, Callable]] = None) -> Dict:
+    """
+    Ejecuta inferencia sintética con cada familia a cada tamaño de lote.
+
+    Los resultados no pasan por la caché de resultados ni por la base de datos. Un error en una
+    familia se registra en el reporte y no detiene el calentamiento de las demás.
+
+    Parámetros:
+        rows (list): Autos de ejemplo; los lotes se forman repitiéndolos en orden.
+        batch_sizes (list): Tamaños de lote a ejecutar.
+        repeats (int): Ejecuciones por tamaño de lote (la primera es la "fría").
+        functions (dict, opcional): {familia: función por lotes}; por defecto las de la aplicación.
+
+    Retorna:
+        dict: {"seconds": total, "families": {familia: {"timings_ms": {tamaño: [ms, ...]}, "error": ...}}}
+    """
+    functions = functions if functions is not None else default_warmup_functions()
+    rows = list(rows) or list(SAMPLE_CARS)
+    started_at = time.perf_counter()
+    families = {}
+    for family, batch_func in functions.items():
+        report = {"timings_ms": {}, "error": None}
+        try:
+            members = _resident_members(family)
+            if members == []:
+                report["error"] = "Sin estimadores residentes; se calientan en su primer uso."
+                families[family] = report
+                continue
+            for size in batch_sizes:
+                batch = [rows[i % len(rows)] for i in range(int(size))]
+                timings = []
+                for _ in range(max(int(repeats), 1)):
+                    start = time.perf_counter()
+                    if members is None:
+                        batch_func(batch)
+                    else:
+                        batch_func(batch, members)
+                    timings.append(round((time.perf_counter() - start) * 1000, 3))
+                report["timings_ms"][int(size)] = timings
+        except Exception as e:
+            logger.exception(f"Error en el calentamiento de la familia '{family}'")
+            report["error"] = str(e)
+        families[family] = report
+
+    seconds = time.perf_counter() - started_at
+    logger.info(f"Calentamiento completado en {seconds:.3f}s: {families}")
+    return {"seconds": round(seconds, 4), "families": families}
+
+
+class Readiness:
+    """
+    Estado de disponibilidad del worker.
+
+    El worker no está listo hasta que termina el calentamiento, y deja de estarlo al apagarse.
+    """
+
+    def __init__(self):
+        self._ready = threading.Event()
+        self._lock = threading.Lock()
+        self.warmup: Optional[Dict] = None
+        self.started_at = time.time()
+        self.ready_at: Optional[float] = None
+
+    @property
+    def ready(self) -> bool:
+        return self._ready.is_set()
+
+    def mark_ready(self, warmup: Optional[Dict] = None) -> None:
+        with self._lock:
+            self.warmup = warmup
+            self.ready_at = time.time()
+            self._ready.set()
+
+    def mark_not_ready(self) -> None:
+        self._ready.clear()
+
+    def wait(self, timeout: Optional[float] = None) -> bool:
+        """Espera a que el worker esté listo. Retorna False si vence `timeout`."""
+        return self._ready.wait(timeout)
+
+    def status(self) -> Dict:
+        with self._lock:
+            return {
+                "ready": self.ready,
+                "startup_seconds": round(self.ready_at - self.started_at, 4) if self.ready_at else None,
+                "warmup": self.warmup,
+            }
+
+
+# Estado global del worker (lo consultan las rutas /health)
+READINESS = Readiness()
+
+
+def warm_up_and_mark_ready(dataset_path=None, sample_rows: int = 64, batch_sizes: Sequence[int] = (1, 8, 32),
+                           repeats: int = 2) -> Dict:
+    """Ejecuta el calentamiento y marca el worker como listo (aunque alguna familia falle)."""
+    report = None
+    try:
+        report = run_warmup(load_sample_rows(dataset_path, sample_rows), batch_sizes, repeats)
+    finally:
+        READINESS.mark_ready(report)
+    return report
@@ -0,0 +1,95 @@
+"""
+Reporte del modo de inferencia float32 (`inference.precision`) frente a float64.
+
+Carga cada familia en ambas precisiones y reporta:
+
+- memoria: bytes de los arreglos de NumPy de cada modelo en float64 y float32 (los modelos
+  que no se convierten, como `SVC` o XGBoost, aparecen sin cambio),
+- desviación: sobre la partición de prueba de `car_price_dataset.csv` (la misma del
+  entrenamiento: 20 %, `random_state=42`), diferencia absoluta y relativa máxima de precio
+  (predicción) o filas cuya etiqueta cambia (segmentación y clusterización),
+- tiempo total de inferencia de la partición en lotes de `--batch-size` filas.
+
+Los lotes se mantienen por debajo de `inference.flat_forest_max_rows` para evaluar los
+bosques compilados y no su respaldo de sklearn.
+
+Uso (desde la carpeta backend/):
+    python -m benchmarks.bench_float32 [ruta_base_modelos] [--batch-size N]
+"""
+
+import argparse
+import pathlib
+import time
+
+import numpy as np
+from sklearn.model_selection import train_test_split
+
+from app.core.config import settings
+from app.utils import MODEL_REGISTRY
+from app.utils.model_registry import PATH_DIR, ModelRegistry
+from app.utils.precision import array_bytes
+from app.utils.warmup import default_warmup_functions, read_dataset_rows
+
+NUMERIC_FAMILIES = ("prediction",)
+MB = 1024 * 1024
+
+
+def holdout_rows(dataset_path):
+    """Filas de la partición de prueba del entrenamiento (`test_size=0.2`, `random_state=42`)."""
+    rows = read_dataset_rows(dataset_path)
+    _, test_index = train_test_split(np.arange(len(rows)), test_size=0.2, random_state=42)
+    return [rows[i] for i in test_index]
+
+
+def _predict(function, loaded, family, rows, batch_size):
+    results = []
+    start = time.perf_counter()
+    with MODEL_REGISTRY.override(family, loaded):
+        for i in range(0, len(rows), batch_size):
+            results.extend(function(rows[i:i + batch_size]))
+    return results, time.perf_counter() - start
+
+
+def _deviation(family, member, reference, reduced):
+    pairs = [(r["result"][member], f["result"][member]) for r, f in zip(reference, reduced)
+             if r["result"] is not None and f["result"] is not None]
+    if family in NUMERIC_FAMILIES:
+        deltas = [abs(f - r) for r, f in pairs]
+        relative = [abs(f - r) / abs(r) for r, f in pairs if r]
+        return f"max |Δ| {max(deltas):.4f} (máx. {max(relative) * 100:.5f} %)"
+    changed = sum(r != f for r, f in pairs)
+    return f"{changed}/{len(pairs)} etiquetas cambian"
+
+
+def run(base_dir, dataset_path, batch_size):
+    MODEL_REGISTRY.base_dir = pathlib.Path(base_dir)
+    rows = holdout_rows(dataset_path)
+    print(f"Partición de prueba: {len(rows)} filas, lotes de {batch_size}")
+    for family, function in default_warmup_functions().items():
+        loaded, results, seconds = {}, {}, {}
+        for precision in ("float64", "float32"):
+            MODEL_REGISTRY.precision = precision
+            loaded[precision] = MODEL_REGISTRY.load(family)
+            results[precision], seconds[precision] = _predict(function, loaded[precision], family, rows, batch_size)
+
+        before = {key: array_bytes(loaded["float64"][key]) for key in loaded["float64"].models}
+        after = {key: array_bytes(loaded["float32"][key]) for key in loaded["float32"].models}
+        total_before, total_after = sum(before.values()), sum(after.values())
+        print(f"\n{family}: arreglos {total_before / MB:.2f} MB → {total_after / MB:.2f} MB "
+              f"(ahorro {(total_before - total_after) / MB:.2f} MB), "
+              f"inferencia {seconds['float64'] * 1000:.1f} ms → {seconds['float32'] * 1000:.1f} ms")
+        for key in before:
+            if before[key] != after[key]:
+                print(f"  {key:>16}: {before[key] / MB:8.2f} MB → {after[key] / MB:8.2f} MB")
+        for member in ModelRegistry.select_members(family, None):
+            print(f"  {member:>16}: {_deviation(family, member, results['float64'], results['float32'])}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("base_dir", nargs="?", default=PATH_DIR, help="Carpeta que contiene models_cars/")
+    parser.add_argument("--dataset", default=settings.WARMUP_DATASET_PATH or "ModelTrain/data/car_price_dataset.csv",
+                        help="CSV del entrenamiento")
+    parser.add_argument("--batch-size", type=int, default=64, help="Filas por llamada")
+    args = parser.parse_args()
+    run(args.base_dir, args.dataset, args.batch_size)
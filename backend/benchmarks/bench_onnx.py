@@ -0,0 +1,87 @@
+"""
+Benchmark del backend de onnxruntime frente a los estimadores nativos (sklearn, XGBoost, NumPy).
+
+Carga cada familia dos veces, con `inference.backend` en "native" y en "onnx", y ejecuta las
+mismas funciones por lotes que usan las rutas (fijando cada versión con `ModelRegistry.override`)
+sobre filas reales del dataset. Para cada estimador reporta:
+
+- paridad: diferencia absoluta máxima de precio (predicción) o proporción de coincidencias
+  (segmentación y clusterización) entre ambos backends,
+- latencia por llamada de cada backend para varios tamaños de lote.
+
+Los `.onnx` se generan al entrenar (o con `python -m ModelTrain.handlers.export_onnx models_cars`).
+
+Uso (desde la carpeta backend/):
+    python -m benchmarks.bench_onnx [ruta_base_modelos] [--repeat N] [--threads N]
+"""
+
+import argparse
+import pathlib
+import time
+
+import numpy as np
+
+from app.core.config import settings
+from app.utils import MODEL_REGISTRY
+from app.utils.model_registry import PATH_DIR, ModelRegistry
+from app.utils.warmup import default_warmup_functions, load_sample_rows
+
+BATCH_SIZES = (1, 16, 256)
+NUMERIC_FAMILIES = ("prediction",)
+
+
+def _time_per_call(func, rows, repeat):
+    func(rows)  # calentamiento
+    start = time.perf_counter()
+    for _ in range(repeat):
+        func(rows)
+    return (time.perf_counter() - start) / repeat
+
+
+def _load(family, backend):
+    settings.INFERENCE_BACKENDS = {**settings.INFERENCE_BACKENDS, family: backend}
+    return MODEL_REGISTRY.load(family)
+
+
+def _parity(family, native, onnx):
+    pairs = [(n, o) for n, o in zip(native, onnx) if n is not None and o is not None]
+    if family in NUMERIC_FAMILIES:
+        return f"max |Δ| {max(abs(n - o) for n, o in pairs):.4f}"
+    return f"coincidencia {np.mean([n == o for n, o in pairs]):.2%}"
+
+
+def run(base_dir, repeat, dataset_path):
+    MODEL_REGISTRY.base_dir = pathlib.Path(base_dir)
+    rows = load_sample_rows(dataset_path, max(BATCH_SIZES))
+    functions = default_warmup_functions()
+    for family, function in functions.items():
+        loaded = {backend: _load(family, backend) for backend in ("native", "onnx")}
+        print(f"\n{family}: onnxruntime con {settings.ONNX_INTRA_OP_THREADS} hilo(s) intra-op")
+        print(f"{'modelo':>8} {'lote':>6} {'native ms':>10} {'onnx ms':>9} {'speedup':>8}  paridad")
+        for member in ModelRegistry.select_members(family, None):
+            def call(backend, batch):
+                with MODEL_REGISTRY.override(family, loaded[backend]):
+                    return function(batch, [member])
+
+            native_rows = [r["result"] and r["result"][member] for r in call("native", rows)]
+            onnx_rows = [r["result"] and r["result"][member] for r in call("onnx", rows)]
+            parity = _parity(family, native_rows, onnx_rows)
+            for batch_size in BATCH_SIZES:
+                batch = rows[:batch_size]
+                n = max(1, repeat // max(1, batch_size // 16))
+                native_s = _time_per_call(lambda b: call("native", b), batch, n)
+                onnx_s = _time_per_call(lambda b: call("onnx", b), batch, n)
+                print(f"{member:>8} {len(batch):>6} {native_s * 1000:>10.3f} {onnx_s * 1000:>9.3f} "
+                      f"{native_s / onnx_s:>7.1f}x  {parity}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("base_dir", nargs="?", default=PATH_DIR, help="Carpeta que contiene models_cars/")
+    parser.add_argument("--repeat", type=int, default=50, help="Repeticiones por tamaño de lote")
+    parser.add_argument("--threads", type=int, default=None, help="Hilos intra-op de onnxruntime")
+    parser.add_argument("--dataset", default=settings.WARMUP_DATASET_PATH, help="CSV con autos de ejemplo")
+    args = parser.parse_args()
+    if args.threads is not None:
+        settings.ONNX_INTRA_OP_THREADS = args.threads
+    run(args.base_dir, args.repeat, args.dataset)
@@ -0,0 +1,73 @@
+"""
+Verificación de memoria del modo pre-fork (`app/prefork.py`) sin base de datos ni uvicorn.
+
+Carga el registro de modelos en el proceso padre (opcionalmente con `gc.freeze`), hace
+`fork` de N workers que ejecutan inferencia con las tres familias y reporta, con
+`/proc/<pid>/smaps_rollup`, la memoria única y compartida de cada worker.
+
+Uso (desde la carpeta backend/, solo Linux):
+    python -m benchmarks.bench_prefork_memory [ruta_base_modelos] [--workers N] [--no-freeze]
+"""
+
+import argparse
+import gc
+import os
+import pathlib
+import signal
+import time
+
+from app.prefork import fork_worker, load_and_freeze
+from app.utils import MODEL_REGISTRY, prices_clusterization, prices_prediction, prices_segmentation
+from app.utils.model_registry import PATH_DIR
+from app.utils.process_memory import memory_report
+
+CAR = {"Brand": "Toyota", "Model": "RAV4", "Year": 2006, "Engine_Size": 1.3, "Fuel_Type": "Hybrid",
+       "Transmission": "Manual", "Mileage": 195129, "Doors": 4, "Owner_Count": 5}
+
+
+def _worker(ready_fd: int, requests: int) -> None:
+    for _ in range(requests):
+        prices_prediction(CAR)
+        prices_segmentation(CAR)
+        prices_clusterization(CAR)
+    os.write(ready_fd, b"1")
+    time.sleep(3600)  # El padre termina el worker después de medir
+
+
+def run(base_dir, workers, freeze, requests):
+    MODEL_REGISTRY.base_dir = pathlib.Path(base_dir)
+    if freeze:
+        load_and_freeze()
+    else:
+        MODEL_REGISTRY.load_all()
+        gc.collect()
+    loaded_mb = sum(f["memory_mb"] for f in MODEL_REGISTRY.report().values() if f)
+
+    read_fd, write_fd = os.pipe()
+    pids = [fork_worker(lambda: _worker(write_fd, requests)) for _ in range(workers)]
+    for _ in pids:
+        os.read(read_fd, 1)  # Esperar a que cada worker termine su inferencia
+
+    report = memory_report(pids)
+    for pid in pids:
+        os.kill(pid, signal.SIGTERM)
+        os.waitpid(pid, 0)
+
+    print(f"gc.freeze: {freeze} | modelos cargados en el padre: {loaded_mb:.1f} MB | workers: {workers}")
+    print(f"{'pid':>8} {'único MB':>10} {'compartido MB':>14} {'RSS MB':>8} {'PSS MB':>8}")
+    for process in report["processes"]:
+        print(f"{process['pid']:>8} {process['unique_mb']:>10} {process['shared_mb']:>14} "
+              f"{process['rss_mb']:>8} {process['pss_mb']:>8}")
+    print(f"Suma de RSS: {report['total_rss_mb']} MB | PSS real de los workers: {report['total_pss_mb']} MB | "
+          f"único: {report['total_unique_mb']} MB")
+    print(f"Sin compartir, los modelos solos ocuparían ~{loaded_mb * workers:.1f} MB en {workers} workers.")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("base_dir", nargs="?", default=str(PATH_DIR))
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--requests", type=int, default=20)
+    parser.add_argument("--no-freeze", dest="freeze", action="store_false")
+    args = parser.parse_args()
+    run(args.base_dir, args.workers, args.freeze, args.requests)
@@ -0,0 +1,73 @@
+"""
+Benchmark de arranque: tiempo de carga y memoria residente de cada familia de modelos,
+copiando los artefactos al heap (`mmap_mode=None`) o mapeándolos en memoria (`mmap_mode="r"`).
+
+Cada modo se mide en un proceso nuevo para que la memoria de uno no afecte al otro.
+La memoria de las páginas mapeadas cuenta en el RSS pero vive en la caché del sistema y se
+comparte entre todos los procesos que leen el mismo archivo; por eso también se reporta la
+memoria única (privada) del proceso.
+
+Uso (desde la carpeta backend/):
+    python -m benchmarks.bench_startup [ruta_base_modelos]
+"""
+
+import argparse
+import json
+import pathlib
+import subprocess
+import sys
+
+from app.utils.model_registry import PATH_DIR
+
+MODES = (None, "r")
+
+
+def measure(base_dir, mmap_mode):
+    """Carga todas las familias en este proceso y retorna el reporte del registro."""
+    import time
+    from app.utils import MODEL_REGISTRY
+    from app.utils.process_memory import process_memory
+
+    MODEL_REGISTRY.base_dir = pathlib.Path(base_dir)
+    MODEL_REGISTRY.mmap_mode = mmap_mode
+    before = process_memory()
+    start = time.perf_counter()
+    report = MODEL_REGISTRY.load_all()
+    total_seconds = time.perf_counter() - start
+    after = process_memory()
+    return {
+        "families": {name: {"load_seconds": f["load_seconds"], "memory_mb": f["memory_mb"]}
+                     for name, f in report.items() if f},
+        "total_seconds": round(total_seconds, 3),
+        "rss_mb": round(after["rss_mb"] - before["rss_mb"], 1),
+        "unique_mb": round(after["unique_mb"] - before["unique_mb"], 1),
+    }
+
+
+def run(base_dir):
+    results = {}
+    for mode in MODES:
+        output = subprocess.run(
+            [sys.executable, "-m", "benchmarks.bench_startup", str(base_dir), "--measure", json.dumps(mode)],
+            capture_output=True, text=True, check=True,
+        ).stdout
+        results[mode] = json.loads(output.strip().splitlines()[-1])
+
+    print(f"{'familia':>16} " + " ".join(f"{'mmap=' + str(m):>24}" for m in MODES))
+    for family in results[None]["families"]:
+        cells = [f"{results[m]['families'][family]['load_seconds']:>8.3f}s {results[m]['families'][family]['memory_mb']:>9.1f} MB"
+                 for m in MODES]
+        print(f"{family:>16} " + " ".join(f"{c:>24}" for c in cells))
+    for key, label in (("total_seconds", "total s"), ("rss_mb", "RSS MB"), ("unique_mb", "único MB")):
+        print(f"{label:>16} " + " ".join(f"{results[m][key]:>24}" for m in MODES))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("base_dir", nargs="?", default=str(PATH_DIR))
+    parser.add_argument("--measure", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    if args.measure is not None:
+        print(json.dumps(measure(args.base_dir, json.loads(args.measure))))
+    else:
+        run(args.base_dir)
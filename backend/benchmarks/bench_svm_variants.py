@@ -0,0 +1,77 @@
+"""
+Benchmark de las variantes del SVM de segmentación tal como las sirve el backend.
+
+- "exact": `SVC(kernel='rbf')`, una evaluación de kernel por vector de soporte.
+- "approx": mapa de Nystroem + clasificador lineal (`NystroemLinearClassifier`, NumPy).
+
+Mide la latencia por llamada para varios tamaños de lote sobre filas reales del dataset
+(codificadas con el mismo `CompiledFeatureEncoder` de las rutas), la coincidencia entre ambas
+variantes y agrega la exactitud en el conjunto de prueba del entrenamiento
+(`svm_variants_report.json`).
+
+Uso (desde la carpeta backend/):
+    python -m benchmarks.bench_svm_variants [ruta_base_modelos] [--repeat N]
+"""
+
+import argparse
+import json
+import pathlib
+import time
+
+import numpy as np
+
+from app.utils.feature_encoder import CompiledFeatureEncoder
+from app.utils.load_model_prices_segmetation import load_svm
+from app.utils.model_registry import PATH_DIR, load_artifact
+from app.utils.warmup import load_sample_rows
+from app.core.config import settings
+
+SEGMENTATION_DIR = "models_cars/model_car_segmentation"
+BATCH_SIZES = (1, 16, 256)
+VARIANTS = {"exact": "svm_classifier", "approx": "svm_approx_classifier"}
+
+
+def _time_per_call(func, X, repeat):
+    func(X)  # calentamiento
+    start = time.perf_counter()
+    for _ in range(repeat):
+        func(X)
+    return (time.perf_counter() - start) / repeat
+
+
+def run(base_dir, repeat, dataset_path):
+    artifacts_dir = pathlib.Path(base_dir) / SEGMENTATION_DIR
+    report_path = artifacts_dir / "svm_variants_report.json"
+    training = json.loads(report_path.read_text()) if report_path.exists() else {}
+    if not (artifacts_dir / "svm_approx_classifier.pkl").exists():
+        print(f"No se encontró el SVM aproximado en {artifacts_dir}; entrene con svm_approx=True.")
+        return
+
+    encoder = CompiledFeatureEncoder(load_artifact(artifacts_dir / "label_encoders.pkl"),
+                                     load_artifact(artifacts_dir / "scaler_classifier.pkl"))
+    rows = [car for car in load_sample_rows(dataset_path, max(BATCH_SIZES)) if not encoder.unknown(car)]
+    X = encoder.transform(rows)
+    models = {variant: load_svm(artifacts_dir, variant) for variant in VARIANTS}
+    agreement = np.mean(models["exact"].predict(X) == models["approx"].predict(X))
+
+    print(f"{'variante':>8} {'exactitud':>10} {'kernel/fila':>12} "
+          + " ".join(f"{f'lote {b} ms':>11}" for b in BATCH_SIZES))
+    for variant, name in VARIANTS.items():
+        latencies = []
+        for batch_size in BATCH_SIZES:
+            n = max(1, repeat // max(1, batch_size // 16))
+            latencies.append(_time_per_call(models[variant].predict, X[:batch_size], n) * 1000)
+        info = training.get(name, {})
+        print(f"{variant:>8} {info.get('accuracy', float('nan')):>10.4f} "
+              f"{info.get('kernel_evaluations_per_row', '-'):>12} "
+              + " ".join(f"{ms:>11.3f}" for ms in latencies))
+    print(f"\nCoincidencia entre variantes en {len(X)} filas: {agreement:.2%}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("base_dir", nargs="?", default=PATH_DIR, help="Carpeta que contiene models_cars/")
+    parser.add_argument("--repeat", type=int, default=50, help="Repeticiones por tamaño de lote")
+    parser.add_argument("--dataset", default=settings.WARMUP_DATASET_PATH, help="CSV con autos de ejemplo")
+    args = parser.parse_args()
+    run(args.base_dir, args.repeat, args.dataset)
@@ -0,0 +1,68 @@
+"""
+Benchmark del motor de bosques compilados (`FlatForest`) frente a `predict` de sklearn.
+
+Usa los bosques entrenados de predicción (RandomForestRegressor, 100 árboles) y de
+segmentación (RandomForestClassifier, 300 árboles) y mide la latencia por llamada para
+varios tamaños de lote, verificando además que las predicciones coinciden.
+
+Uso (desde la carpeta backend/):
+    python -m benchmarks.bench_tree_inference [ruta_base_modelos] [--repeat N]
+"""
+
+import argparse
+import pathlib
+import time
+
+import joblib
+import numpy as np
+
+from app.utils.tree_inference import FlatForest
+from app.utils.model_registry import PATH_DIR
+
+FORESTS = {
+    "prediction_rf": "models_cars/model_cars_prediction_prices/random_forest_model.pkl",
+    "segmentation_rf": "models_cars/model_car_segmentation/rf_classifier.pkl",
+}
+BATCH_SIZES = (1, 16, 256, 2048)
+
+
+def _time_per_call(func, X, repeat):
+    func(X)  # calentamiento
+    start = time.perf_counter()
+    for _ in range(repeat):
+        func(X)
+    return (time.perf_counter() - start) / repeat
+
+
+def run(base_dir, repeat):
+    rng = np.random.default_rng(0)
+    for name, relative_path in FORESTS.items():
+        path = pathlib.Path(base_dir) / relative_path
+        if not path.exists():
+            print(f"{name}: no se encontró {path}, se omite.")
+            continue
+        forest = joblib.load(path)
+        start = time.perf_counter()
+        flat = FlatForest.from_sklearn(forest)
+        compile_ms = (time.perf_counter() - start) * 1000
+
+        print(f"\n{name}: {flat.summary()} (compilado en {compile_ms:.1f} ms)")
+        print(f"{'lote':>6} {'sklearn ms':>12} {'flat ms':>10} {'speedup':>8} {'paridad':>8}")
+        for batch_size in BATCH_SIZES:
+            X = rng.normal(size=(batch_size, forest.n_features_in_))
+            if flat.is_classifier:
+                parity = np.array_equal(flat.predict(X), forest.predict(X))
+            else:
+                parity = np.allclose(flat.predict(X), forest.predict(X), rtol=1e-12)
+            n = max(1, repeat // max(1, batch_size // 16))
+            sk = _time_per_call(forest.predict, X, n)
+            fl = _time_per_call(flat.predict, X, n)
+            print(f"{batch_size:>6} {sk * 1000:>12.3f} {fl * 1000:>10.3f} {sk / fl:>7.1f}x {str(parity):>8}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("base_dir", nargs="?", default=PATH_DIR, help="Carpeta que contiene models_cars/")
+    parser.add_argument("--repeat", type=int, default=50, help="Repeticiones por tamaño de lote")
+    args = parser.parse_args()
+    run(args.base_dir, args.repeat)
@@ -1,9 +1,11 @@
 import api from "./api"; // Asegúrate de que api.js esté configurado correctamente
 
 const PredictionService = {
-  predictAndSave: async (modelName, userId, predictionData, token) => {
+  // `members` (opcional): estimadores a evaluar, p. ej. ["rf"]; los demás no se ejecutan y llegan como null.
+  predictAndSave: async (modelName, userId, predictionData, token, members = null) => {
     try {
       const response = await api.post(`/predict/save/${modelName}/${userId}`, predictionData, {
+        params: members?.length ? { members: members.join(",") } : undefined,
         headers: {
           "Content-Type": "application/json",
           "Authorization": `Bearer ${token}`
@@ -17,6 +19,25 @@ const PredictionService = {
         error: error.response?.data?.detail || "Error al procesar la predicción"
       };
     }
+  },
+
+  // Predice con los tres modelos (precio, segmentación y clusterización) en una sola petición.
+  // La respuesta trae { model1, model2, model3 } con el resultado guardado de cada uno.
+  predictAllAndSave: async (userId, predictionData, token) => {
+    try {
+      const response = await api.post(`/predict/save/all/${userId}`, predictionData, {
+        headers: {
+          "Content-Type": "application/json",
+          "Authorization": `Bearer ${token}`
+        }
+      });
+      return { success: true, data: response.data };
+    } catch (error) {
+      return {
+        success: false,
+        error: error.response?.data?.detail || "Error al procesar la predicción"
+      };
+    }
   }
 };
 